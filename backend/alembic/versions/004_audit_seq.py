@@ -0,0 +1,36 @@
+"""Add per-loan seq to audit_logs
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("audit_logs", sa.Column("seq", sa.Integer(), nullable=True))
+    # Number existing entries per loan in write order.
+    op.execute("""
+        UPDATE audit_logs SET seq = numbered.seq
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY loan_id ORDER BY timestamp, id) AS seq
+            FROM audit_logs
+            WHERE loan_id IS NOT NULL
+        ) AS numbered
+        WHERE audit_logs.id = numbered.id
+    """)
+    op.create_index("ix_audit_logs_loan_id_seq", "audit_logs", ["loan_id", "seq"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_audit_logs_loan_id_seq", table_name="audit_logs")
+    op.drop_column("audit_logs", "seq")
@@ -0,0 +1,35 @@
+"""Add per-loan seq to agent_memos
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("agent_memos", sa.Column("seq", sa.Integer(), nullable=True))
+    # Number existing memos per loan; created_at ties within a transaction break by id.
+    op.execute("""
+        UPDATE agent_memos SET seq = numbered.seq
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY loan_id ORDER BY created_at, id) AS seq
+            FROM agent_memos
+        ) AS numbered
+        WHERE agent_memos.id = numbered.id
+    """)
+    op.create_index("ix_agent_memos_loan_id_seq", "agent_memos", ["loan_id", "seq"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_agent_memos_loan_id_seq", table_name="agent_memos")
+    op.drop_column("agent_memos", "seq")
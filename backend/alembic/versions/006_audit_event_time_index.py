@@ -0,0 +1,26 @@
+"""Index audit_logs by event type and time
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GET /api/metrics/usage reads one window of usage events.
+    op.create_index(
+        "ix_audit_logs_event_type_timestamp", "audit_logs", ["event_type", "timestamp"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_audit_logs_event_type_timestamp", table_name="audit_logs")
@@ -1,15 +1,18 @@
 # Agents module
 
-from app.agents.schemas import AgentResult
+from app.agents.schemas import AgentResult, PanelResult
 from app.agents.sales_agent import SalesAgent
 from app.agents.risk_agent import RiskAgent
 from app.agents.compliance_agent import ComplianceAgent
 from app.agents.moderator_agent import ModeratorAgent
+from app.agents.panel_agent import PanelAgent
 
 __all__ = [
     "AgentResult",
+    "PanelResult",
     "SalesAgent",
     "RiskAgent",
     "ComplianceAgent",
     "ModeratorAgent",
+    "PanelAgent",
 ]
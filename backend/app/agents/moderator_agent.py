@@ -4,7 +4,10 @@ import json
 from typing import Any
 
 from app.agents.schemas import AgentResult
+from app.config import get_settings
 from app.services.llm_service import LLMService
+from app.services.llm_usage import LLMCall, summarize, usage_scope
+from app.services.prompt_budget import BuiltPrompt, PromptBuilder, SectionPriority, add_memos
 
 
 class ModeratorAgent:
@@ -28,63 +31,78 @@ Your job is to:
 Return ONLY valid JSON:
 {"memo": "<synthesis>", "score": <0-100>, "flags": ["<flag>"], "consensus": true/false}"""
 
-    def __init__(self, llm: LLMService) -> None:
+    def __init__(self, llm: LLMService, prompt_budget: int | None = None) -> None:
         self._llm = llm
+        self._budget = prompt_budget or get_settings().llm_prompt_token_budget
 
-    def evaluate(
+    def _build_prompt(
         self,
         financials: dict[str, Any],
         agent_outputs: dict[str, dict[str, Any]],
-    ) -> AgentResult:
-        """Generate memo, score, flags from financials and prior agent outputs."""
-        prompt = f"""{self.SYSTEM_PROMPT}
-
-Financial data:
-{json.dumps(financials, indent=2)}
-
-Agent outputs (Sales, Risk, Compliance):
-{json.dumps(agent_outputs, indent=2)}
+    ) -> BuiltPrompt:
+        builder = PromptBuilder(self._budget)
+        builder.add("instructions", self.SYSTEM_PROMPT, SectionPriority.INSTRUCTIONS)
+        builder.add(
+            "financials",
+            f"Financial data:\n{json.dumps(financials, indent=2)}",
+            SectionPriority.FINANCIALS,
+        )
+        builder.add(
+            "agent_outputs",
+            f"Agent outputs (Sales, Risk, Compliance):\n{json.dumps(agent_outputs, indent=2)}",
+            SectionPriority.LATEST_MEMOS,
+        )
+        builder.add("footer", "Return JSON only.", SectionPriority.INSTRUCTIONS)
+        return builder.build()
 
-Return JSON only."""
+    def _build_consensus_prompt(
+        self,
+        financials: dict[str, Any],
+        all_memos: list[dict[str, Any]],
+    ) -> BuiltPrompt:
+        """Over budget, earlier rounds are dropped before each agent's latest memo."""
+        builder = PromptBuilder(self._budget)
+        builder.add("instructions", self.CONSENSUS_PROMPT, SectionPriority.INSTRUCTIONS)
+        builder.add(
+            "financials",
+            f"Financial data:\n{json.dumps(financials, indent=2)}",
+            SectionPriority.FINANCIALS,
+        )
+        add_memos(
+            builder,
+            all_memos,
+            "All agent memos (chronological):",
+            lambda m: (
+                f"[Round {m.get('round', '?')} - {m['agent']}] (score {m['score']}): {m['memo']}"
+            ),
+        )
+        builder.add("footer", "Return JSON only.", SectionPriority.INSTRUCTIONS)
+        return builder.build()
 
-        raw = self._llm.complete_json(prompt, max_tokens=800)
+    def _to_result(
+        self, raw: dict[str, Any] | None, calls: list[LLMCall], prompt: BuiltPrompt
+    ) -> AgentResult:
         if raw:
             s = max(0, min(100, float(raw.get("score", 50))))
             return AgentResult(
                 memo=str(raw.get("memo", "")),
                 score=s,
                 flags=list(raw.get("flags", [])),
+                usage=summarize(calls),
+                prompt=prompt.report(),
             )
         return AgentResult(
             memo="Moderator synthesis unavailable.",
             score=50.0,
             flags=[],
+            usage=summarize(calls),
+            prompt=prompt.report(),
+            fallback=True,
         )
 
-    def evaluate_consensus(
-        self,
-        financials: dict[str, Any],
-        all_memos: list[dict[str, Any]],
+    def _to_consensus(
+        self, raw: dict[str, Any] | None, calls: list[LLMCall], prompt: BuiltPrompt
     ) -> tuple[AgentResult, bool]:
-        """Evaluate debate memos and determine if consensus reached.
-
-        Returns (AgentResult, consensus_reached: bool).
-        """
-        memos_text = "\n".join(
-            f"[Round {m.get('round', '?')} - {m['agent']}] (score {m['score']}): {m['memo']}"
-            for m in all_memos
-        )
-        prompt = f"""{self.CONSENSUS_PROMPT}
-
-Financial data:
-{json.dumps(financials, indent=2)}
-
-All agent memos (chronological):
-{memos_text}
-
-Return JSON only."""
-
-        raw = self._llm.complete_json(prompt, max_tokens=800)
         if raw:
             s = max(0, min(100, float(raw.get("score", 50))))
             consensus = bool(raw.get("consensus", False))
@@ -92,9 +110,61 @@ Return JSON only."""
                 memo=str(raw.get("memo", "")),
                 score=s,
                 flags=list(raw.get("flags", [])),
+                usage=summarize(calls),
+                prompt=prompt.report(),
             ), consensus
         return AgentResult(
             memo="Moderator consensus check unavailable.",
             score=50.0,
             flags=[],
+            usage=summarize(calls),
+            prompt=prompt.report(),
+            fallback=True,
         ), False
+
+    def evaluate(
+        self,
+        financials: dict[str, Any],
+        agent_outputs: dict[str, dict[str, Any]],
+    ) -> AgentResult:
+        """Generate memo, score, flags from financials and prior agent outputs."""
+        prompt = self._build_prompt(financials, agent_outputs)
+        with usage_scope() as calls:
+            raw = self._llm.complete_json(prompt.text, route="moderator")
+        return self._to_result(raw, calls, prompt)
+
+    async def aevaluate(
+        self,
+        financials: dict[str, Any],
+        agent_outputs: dict[str, dict[str, Any]],
+    ) -> AgentResult:
+        """Async counterpart of ``evaluate``."""
+        prompt = self._build_prompt(financials, agent_outputs)
+        with usage_scope() as calls:
+            raw = await self._llm.acomplete_json(prompt.text, route="moderator")
+        return self._to_result(raw, calls, prompt)
+
+    def evaluate_consensus(
+        self,
+        financials: dict[str, Any],
+        all_memos: list[dict[str, Any]],
+    ) -> tuple[AgentResult, bool]:
+        """Evaluate debate memos and determine if consensus reached.
+
+        Returns (AgentResult, consensus_reached: bool).
+        """
+        prompt = self._build_consensus_prompt(financials, all_memos)
+        with usage_scope() as calls:
+            raw = self._llm.complete_json(prompt.text, route="moderator")
+        return self._to_consensus(raw, calls, prompt)
+
+    async def aevaluate_consensus(
+        self,
+        financials: dict[str, Any],
+        all_memos: list[dict[str, Any]],
+    ) -> tuple[AgentResult, bool]:
+        """Async counterpart of ``evaluate_consensus``."""
+        prompt = self._build_consensus_prompt(financials, all_memos)
+        with usage_scope() as calls:
+            raw = await self._llm.acomplete_json(prompt.text, route="moderator")
+        return self._to_consensus(raw, calls, prompt)
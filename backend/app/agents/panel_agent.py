@@ -0,0 +1,88 @@
+"""Panel Agent - Sales, Risk and Compliance initial reviews in one LLM call."""
+
+import json
+from typing import Any
+
+from pydantic import ValidationError
+
+from app.agents.compliance_agent import ComplianceAgent
+from app.agents.risk_agent import RiskAgent
+from app.agents.sales_agent import SalesAgent
+from app.agents.schemas import AgentResult, PanelResult
+from app.config import get_settings
+from app.services.llm_service import LLMService
+from app.services.llm_usage import summarize, usage_scope
+from app.services.prompt_budget import BuiltPrompt, PromptBuilder, SectionPriority
+
+
+def _persona(system_prompt: str) -> str:
+    """An agent's system prompt without its single-agent output format."""
+    return "\n".join(
+        line for line in system_prompt.splitlines()
+        if not line.startswith(("Return ONLY", "{"))
+    )
+
+
+class PanelAgent:
+    """Writes the three initial reviews at once, sharing one copy of the financials."""
+
+    AGENTS = {"sales": SalesAgent, "risk": RiskAgent, "compliance": ComplianceAgent}
+
+    PANEL_PROMPT = """You are a loan review panel of three independent agents.
+Write each agent's initial review separately and in that agent's own voice;
+do not let one agent's view influence another's."""
+
+    OUTPUT_PROMPT = """Return ONLY valid JSON in this exact structure:
+{"sales": {"memo": "<memo>", "score": <0-100>, "flags": ["<flag>"]},
+ "risk": {"memo": "<memo>", "score": <0-100>, "flags": ["<flag>"]},
+ "compliance": {"memo": "<memo>", "score": <0-100>, "flags": ["<flag>"]}}"""
+
+    def __init__(self, llm: LLMService, prompt_budget: int | None = None) -> None:
+        self._llm = llm
+        self._budget = prompt_budget or get_settings().llm_prompt_token_budget
+
+    def _build_prompt(self, financials: dict[str, Any]) -> BuiltPrompt:
+        builder = PromptBuilder(self._budget)
+        builder.add("instructions", self.PANEL_PROMPT, SectionPriority.INSTRUCTIONS)
+        for key, agent in self.AGENTS.items():
+            builder.add(
+                f"persona:{key}",
+                f"{key.capitalize()} agent:\n{_persona(agent.SYSTEM_PROMPT)}",
+                SectionPriority.INSTRUCTIONS,
+            )
+        builder.add(
+            "financials",
+            f"Financial data:\n{json.dumps(financials, indent=2)}",
+            SectionPriority.FINANCIALS,
+        )
+        builder.add("output", self.OUTPUT_PROMPT, SectionPriority.INSTRUCTIONS)
+        return builder.build()
+
+    def _validate(self, raw: dict[str, Any] | None) -> dict[str, AgentResult] | None:
+        """One AgentResult per persona, or None if any is missing or invalid."""
+        if not raw:
+            return None
+        try:
+            return {key: AgentResult.model_validate(raw[key]) for key in self.AGENTS}
+        except (KeyError, TypeError, ValidationError):
+            return None
+
+    def evaluate(self, financials: dict[str, Any]) -> PanelResult:
+        """Initial reviews for all three agents. ``results`` is None when the response
+        fails validation and the caller should fall back to per-agent calls.
+        """
+        prompt = self._build_prompt(financials)
+        with usage_scope() as calls:
+            raw = self._llm.complete_json(prompt.text, route="panel")
+        return PanelResult(
+            results=self._validate(raw), usage=summarize(calls), prompt=prompt.report()
+        )
+
+    async def aevaluate(self, financials: dict[str, Any]) -> PanelResult:
+        """Async counterpart of ``evaluate``."""
+        prompt = self._build_prompt(financials)
+        with usage_scope() as calls:
+            raw = await self._llm.acomplete_json(prompt.text, route="panel")
+        return PanelResult(
+            results=self._validate(raw), usage=summarize(calls), prompt=prompt.report()
+        )
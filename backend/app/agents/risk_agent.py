@@ -4,7 +4,10 @@ import json
 from typing import Any
 
 from app.agents.schemas import AgentResult
+from app.config import get_settings
 from app.services.llm_service import LLMService
+from app.services.llm_usage import LLMCall, summarize, usage_scope
+from app.services.prompt_budget import BuiltPrompt, PromptBuilder, SectionPriority, add_memos
 
 
 class RiskAgent:
@@ -24,47 +27,86 @@ Be specific about which agent's points you agree or disagree with.
 Return ONLY valid JSON in this exact structure:
 {"memo": "<your rebuttal/updated memo>", "score": <0-100>, "flags": ["<flag1>"]}"""
 
-    def __init__(self, llm: LLMService) -> None:
+    ROUTE = "risk"  # Settings.llm_routes keys: "risk.initial" / "risk.debate"
+
+    def __init__(self, llm: LLMService, prompt_budget: int | None = None) -> None:
         self._llm = llm
+        self._budget = prompt_budget or get_settings().llm_prompt_token_budget
 
-    def evaluate(
+    def build_prompt(
         self,
         financials: dict[str, Any],
         prior_memos: list[dict[str, Any]] | None = None,
-    ) -> AgentResult:
-        """Generate memo, score, flags. If prior_memos provided, this is a debate round."""
+    ) -> BuiltPrompt:
+        """Initial prompt, or debate prompt when prior_memos are provided.
+
+        Over budget, older debate memos are dropped before each agent's latest one.
+        """
+        builder = PromptBuilder(self._budget)
+        builder.add(
+            "instructions",
+            self.DEBATE_PROMPT if prior_memos else self.SYSTEM_PROMPT,
+            SectionPriority.INSTRUCTIONS,
+        )
+        builder.add(
+            "financials",
+            f"Financial data:\n{json.dumps(financials, indent=2)}",
+            SectionPriority.FINANCIALS,
+        )
         if prior_memos:
-            memos_text = "\n".join(
-                f"[{m['agent']}] (score {m['score']}): {m['memo']}"
-                for m in prior_memos
+            add_memos(
+                builder,
+                prior_memos,
+                "Prior agent memos:",
+                lambda m: f"[{m['agent']}] (score {m['score']}): {m['memo']}",
             )
-            prompt = f"""{self.DEBATE_PROMPT}
-
-Financial data:
-{json.dumps(financials, indent=2)}
-
-Prior agent memos:
-{memos_text}
+        builder.add("footer", "Return JSON only.", SectionPriority.INSTRUCTIONS)
+        return builder.build()
 
-Return JSON only."""
-        else:
-            prompt = f"""{self.SYSTEM_PROMPT}
+    def route(self, prior_memos: list[dict[str, Any]] | None) -> str:
+        """Settings.llm_routes key for an initial or a debate call."""
+        return f"{self.ROUTE}.debate" if prior_memos else f"{self.ROUTE}.initial"
 
-Financial data:
-{json.dumps(financials, indent=2)}
-
-Return JSON only."""
-
-        raw = self._llm.complete_json(prompt, max_tokens=800)
+    def to_result(
+        self, raw: dict[str, Any] | None, calls: list[LLMCall], prompt: BuiltPrompt
+    ) -> AgentResult:
+        """Parsed JSON response to AgentResult; the fallback memo if there is none."""
         if raw:
             s = max(0, min(100, float(raw.get("score", 50))))
             return AgentResult(
                 memo=str(raw.get("memo", "")),
                 score=s,
                 flags=list(raw.get("flags", [])),
+                usage=summarize(calls),
+                prompt=prompt.report(),
             )
         return AgentResult(
             memo="Risk review unavailable.",
             score=50.0,
             flags=[],
+            usage=summarize(calls),
+            prompt=prompt.report(),
+            fallback=True,
         )
+
+    def evaluate(
+        self,
+        financials: dict[str, Any],
+        prior_memos: list[dict[str, Any]] | None = None,
+    ) -> AgentResult:
+        """Generate memo, score, flags. If prior_memos provided, this is a debate round."""
+        prompt = self.build_prompt(financials, prior_memos)
+        with usage_scope() as calls:
+            raw = self._llm.complete_json(prompt.text, route=self.route(prior_memos))
+        return self.to_result(raw, calls, prompt)
+
+    async def aevaluate(
+        self,
+        financials: dict[str, Any],
+        prior_memos: list[dict[str, Any]] | None = None,
+    ) -> AgentResult:
+        """Async counterpart of ``evaluate``."""
+        prompt = self.build_prompt(financials, prior_memos)
+        with usage_scope() as calls:
+            raw = await self._llm.acomplete_json(prompt.text, route=self.route(prior_memos))
+        return self.to_result(raw, calls, prompt)
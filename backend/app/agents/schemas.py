@@ -1,5 +1,7 @@
 """Agent output schemas - structured JSON responses."""
 
+from typing import Any
+
 from pydantic import BaseModel, Field
 
 
@@ -9,3 +11,22 @@ class AgentResult(BaseModel):
     memo: str = Field(description="Agent memo text")
     score: float = Field(ge=0, le=100, description="Score from 0 to 100")
     flags: list[str] = Field(default_factory=list, description="Raised flags")
+    usage: dict[str, Any] | None = Field(
+        default=None, description="LLM token/latency summary for this result (None if no call)"
+    )
+    prompt: dict[str, Any] | None = Field(
+        default=None, description="Prompt budget report: tokens, budget, dropped/truncated sections"
+    )
+    fallback: bool = Field(
+        default=False, description="Placeholder result because the LLM returned nothing"
+    )
+
+
+class PanelResult(BaseModel):
+    """Combined initial review from ``PanelAgent``."""
+
+    results: dict[str, AgentResult] | None = Field(
+        default=None, description="AgentResult per persona; None if the response failed validation"
+    )
+    usage: dict[str, Any] | None = None
+    prompt: dict[str, Any] | None = None
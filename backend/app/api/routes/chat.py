@@ -2,16 +2,20 @@
 
 import uuid
 import json
+from collections.abc import AsyncIterator
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.models.database import get_db
 from app.models.loan_application import LoanApplication
 from app.models.agent_memo import AgentMemo
-from app.services.llm_service import LLMService
+from app.services.llm_admission import Priority
+from app.services.llm_service import get_llm_service
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
@@ -65,17 +69,8 @@ def _build_context(loan: LoanApplication, memos: list[AgentMemo]) -> str:
     return "\n".join(lines)
 
 
-@router.post("/", response_model=ChatResponse)
-def chat_about_loan(
-    req: ChatRequest,
-    db: Session = Depends(get_db),
-) -> ChatResponse:
-    """Chat about a specific loan decision. Uses LLM with loan context."""
-    try:
-        loan_uuid = uuid.UUID(req.loan_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid loan_id")
-
+def _load_loan(db: Session, loan_uuid: uuid.UUID) -> tuple[LoanApplication, list[AgentMemo]]:
+    """Fetch loan and memos (blocking; run in threadpool from async routes)."""
     loan = db.query(LoanApplication).filter(LoanApplication.id == loan_uuid).first()
     if not loan:
         raise HTTPException(status_code=404, detail="Loan not found")
@@ -83,10 +78,14 @@ def chat_about_loan(
     memos = (
         db.query(AgentMemo)
         .filter(AgentMemo.loan_id == loan.id)
-        .order_by(AgentMemo.created_at)
+        .order_by(AgentMemo.seq, AgentMemo.created_at)
         .all()
     )
+    return loan, memos
 
+
+def _build_prompt(req: ChatRequest, loan: LoanApplication, memos: list[AgentMemo]) -> str:
+    """System prompt + loan context + recent history + the new question."""
     context = _build_context(loan, memos)
 
     # Build messages
@@ -104,16 +103,79 @@ def chat_about_loan(
         messages_for_prompt += f"\n{role.upper()}: {content}"
 
     messages_for_prompt += f"\nUSER: {req.message}\nASSISTANT:"
+    return messages_for_prompt
+
+
+def _fallback_reply(loan: LoanApplication) -> str:
+    """Deterministic reply used when no LLM is configured or the call fails."""
+    return (
+        f"Based on the data, {loan.company_name} was **{loan.status}** "
+        f"with a final score of {loan.final_score} "
+        f"(threshold: 20) and confidence of "
+        f"{(loan.confidence_score or 0) * 100:.0f}%."
+    )
 
-    llm = LLMService()
-    reply = llm.complete_text(messages_for_prompt, max_tokens=600)
+
+def _sse(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _parse_loan_id(req: ChatRequest) -> uuid.UUID:
+    try:
+        return uuid.UUID(req.loan_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid loan_id")
+
+
+@router.post("/", response_model=ChatResponse)
+async def chat_about_loan(
+    req: ChatRequest,
+    db: Session = Depends(get_db),
+) -> ChatResponse:
+    """Chat about a specific loan decision. Uses LLM with loan context."""
+    loan_uuid = _parse_loan_id(req)
+    loan, memos = await run_in_threadpool(_load_loan, db, loan_uuid)
+
+    llm = get_llm_service()
+    reply = await llm.acomplete_text(
+        _build_prompt(req, loan, memos), priority=Priority.INTERACTIVE, route="chat"
+    )
 
     if not reply:
-        reply = (
-            f"Based on the data, {loan.company_name} was **{loan.status}** "
-            f"with a final score of {loan.final_score} "
-            f"(threshold: 20) and confidence of "
-            f"{(loan.confidence_score or 0) * 100:.0f}%."
-        )
+        reply = _fallback_reply(loan)
 
     return ChatResponse(reply=reply)
+
+
+@router.post("/stream")
+async def stream_chat_about_loan(
+    req: ChatRequest,
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """Same as ``POST /chat/`` but streams the reply as Server-Sent Events.
+
+    Emits ``token`` events (``{"delta": "..."}``) as the model produces them, then one
+    ``done`` event with the full reply. Without an LLM the deterministic reply is sent
+    as a single token.
+    """
+    loan_uuid = _parse_loan_id(req)
+    loan, memos = await run_in_threadpool(_load_loan, db, loan_uuid)
+    prompt = _build_prompt(req, loan, memos)
+    fallback = _fallback_reply(loan)
+
+    async def events() -> AsyncIterator[str]:
+        parts: list[str] = []
+        llm = get_llm_service()
+        async for delta in llm.astream_text(prompt, priority=Priority.INTERACTIVE, route="chat"):
+            parts.append(delta)
+            yield _sse("token", {"delta": delta})
+        if not parts:
+            parts.append(fallback)
+            yield _sse("token", {"delta": fallback})
+        yield _sse("done", {"reply": "".join(parts).strip()})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
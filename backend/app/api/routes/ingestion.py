@@ -3,41 +3,75 @@
 import os
 from typing import Any
 
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
+from app.audit import write_audit
 from app.models.database import get_db
 from app.models.loan_application import LoanApplication
-from app.models.agent_memo import AgentMemo
+from app.api.routes.jobs import job_priority, job_source
 from app.services.ingestion_service import ingest_pdf
-from app.orchestration import run_workflow
+from app.orchestration import WorkflowState
+from app.services.job_service import JobPriority, get_job_runner
+from app.services.llm_usage import summarize, usage_scope
 
 router = APIRouter(prefix="/ingest", tags=["ingestion"])
 
 
-@router.post("/upload")
-def upload_pdf(
+@router.post("/upload", status_code=202)
+async def upload_pdf(
+    request: Request,
     file: UploadFile = File(...),
+    priority: JobPriority | None = Query(
+        None, description="Lower the scheduling class (standard, bulk); default interactive"
+    ),
     db: Session = Depends(get_db),
 ) -> dict[str, Any]:
-    """Upload PDF → extract financials → create loan → run war-room workflow → return decision."""
+    """Upload PDF → extract financials → create loan → queue the war-room workflow.
+
+    Returns 202 once the loan exists; poll ``status_url`` for the decision. Uploads
+    are scheduled as interactive; backfills should pass ``priority=bulk``.
+    """
     if not file.filename or not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="PDF file required")
 
-    content = file.file.read()
+    content = await file.read()
     if not content:
         raise HTTPException(status_code=400, detail="Empty file")
 
+    # PDF parsing and the DB session are blocking; keep them off the loop.
+    loan = await run_in_threadpool(_create_loan, content, file.filename, db)
+    job = get_job_runner().submit(
+        loan.id, job_priority("interactive", priority), job_source(request)
+    )
+
+    return {
+        "loan_id": str(loan.id),
+        "job_id": str(job.id),
+        "status_url": f"/api/jobs/{job.id}",
+        "priority": job.priority,
+        "company_name": loan.company_name,
+        "status": loan.status,
+        "workflow_state": loan.workflow_state,
+        "compliance_flag": loan.compliance_flag,
+        "extracted_financials": loan.extracted_financials,
+    }
+
+
+def _create_loan(content: bytes, file_name: str, db: Session) -> LoanApplication:
+    """Ingest the PDF and commit a new loan in INGESTED, ready for the workflow."""
     # --- Step 1: existing ingestion (parse PDF, extract, store IngestedDocument) ---
     try:
-        extracted = ingest_pdf(content=content, file_name=file.filename, db=db)
+        with usage_scope() as extraction_calls:
+            extracted = ingest_pdf(content=content, file_name=file_name, db=db)
     except Exception as e:
         raise HTTPException(status_code=422, detail=str(e)) from e
 
     financials = extracted.model_dump()
 
     # --- Step 2: create LoanApplication from extracted data ---
-    company_name = os.path.splitext(file.filename)[0]
+    company_name = os.path.splitext(file_name)[0]
     has_compliance_issues = bool(extracted.compliance_keywords)
 
     loan = LoanApplication(
@@ -46,41 +80,17 @@ def upload_pdf(
         requested_amount=0,  # actual loan amount not in PDF; set after review
         extracted_financials=financials,
         status="Pending",
-        workflow_state="INGESTED",
+        workflow_state=WorkflowState.INGESTED.value,
         compliance_flag=has_compliance_issues,
     )
     db.add(loan)
-    db.flush()  # assign loan.id before workflow
-
-    # --- Step 3: run full agent orchestration workflow ---
-    try:
-        loan = run_workflow(loan, db)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Workflow failed: {e}") from e
-
-    # --- Step 4: build response ---
-    memos = (
-        db.query(AgentMemo)
-        .filter(AgentMemo.loan_id == loan.id)
-        .order_by(AgentMemo.created_at)
-        .all()
-    )
-
-    return {
-        "loan_id": str(loan.id),
-        "company_name": loan.company_name,
-        "status": loan.status,
-        "final_score": loan.final_score,
-        "confidence_score": loan.confidence_score,
-        "compliance_flag": loan.compliance_flag,
-        "workflow_state": loan.workflow_state,
-        "extracted_financials": loan.extracted_financials,
-        "agent_memos": [
-            {
-                "agent_type": m.agent_type,
-                "content": m.content,
-                "risk_score": m.risk_score,
-            }
-            for m in memos
-        ],
-    }
+    db.flush()  # assign loan.id for the audit entry
+    write_audit(db, loan.id, "EXTRACTION", {
+        "agent": "Extraction",
+        "state": WorkflowState.INGESTED.value,
+        "usage": summarize(extraction_calls),
+    })
+    # Committed before the job starts: the workflow runs in its own session.
+    db.commit()
+    db.refresh(loan)
+    return loan
@@ -0,0 +1,71 @@
+"""Jobs API routes - status of upload workflow jobs."""
+
+import uuid
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+
+from app.models.database import get_db
+from app.models.loan_application import LoanApplication
+from app.services.job_service import PRIORITIES, Job, JobPriority, get_job_runner
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+MAX_BULK_IDS = 200
+
+
+def job_source(request: Request) -> str:
+    """Submitter a workflow job is fair-queued under: the client address. Callers are
+    not authenticated, so nothing they send can claim another source's share."""
+    return request.client.host if request.client else "unknown"
+
+
+def job_priority(route_class: JobPriority, requested: JobPriority | None) -> JobPriority:
+    """Scheduling class of a job submitted through a route: the route's class, or a
+    less urgent one if the caller asks for it. Callers cannot raise their own class."""
+    if requested is None:
+        return route_class
+    return max(route_class, requested, key=PRIORITIES.index)
+
+
+def _job_to_dict(job: Job, loan: LoanApplication | None) -> dict[str, Any]:
+    return {
+        "job_id": str(job.id),
+        "loan_id": str(job.loan_id),
+        "state": job.state,
+        "priority": job.priority,
+        "source": job.source,
+        "workflow_state": loan.workflow_state if loan else None,
+        "status": loan.status if loan else None,
+        "error": job.error,
+        "timings": job.timings(),
+    }
+
+
+@router.get("/")
+def bulk_job_status(
+    ids: list[uuid.UUID] = Query(..., description="Job ids; repeat the parameter"),
+    db: Session = Depends(get_db),
+) -> list[dict[str, Any]]:
+    """Status of several jobs in one call. Unknown ids are omitted."""
+    if len(ids) > MAX_BULK_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_IDS} ids per request")
+    runner = get_job_runner()
+    jobs = [job for job in map(runner.get, ids) if job is not None]
+    loans = {
+        loan.id: loan
+        for loan in db.query(LoanApplication).filter(
+            LoanApplication.id.in_([job.loan_id for job in jobs])
+        )
+    } if jobs else {}
+    return [_job_to_dict(job, loans.get(job.loan_id)) for job in jobs]
+
+
+@router.get("/{job_id}")
+def job_status(job_id: uuid.UUID, db: Session = Depends(get_db)) -> dict[str, Any]:
+    """State, current WorkflowState and timings of one upload workflow job."""
+    job = get_job_runner().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_to_dict(job, db.get(LoanApplication, job.loan_id))
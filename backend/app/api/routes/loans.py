@@ -1,17 +1,34 @@
-"""Loans API routes - list and detail."""
+"""Loans API routes - list, detail and live workflow events."""
 
+import asyncio
+import json
 import uuid
+from collections.abc import AsyncIterator
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.models.database import get_db
+from app.api.routes.jobs import job_priority, job_source
+from app.audit import AuditEvent, get_event_bus
+from app.models.database import SessionLocal, get_db
 from app.models.loan_application import LoanApplication
 from app.models.agent_memo import AgentMemo
+from app.models.audit_log import AuditLog
+from app.orchestration import WorkflowState
+from app.services.job_service import JobPriority, LoanBusy, get_job_runner
+from app.services.usage_service import get_loan_usage
 
 router = APIRouter(prefix="/loans", tags=["loans"])
 
+# Workflow states a run can start or resume from.
+RESUMABLE_STATES = (WorkflowState.INGESTED, WorkflowState.INITIAL_REVIEW, WorkflowState.DEBATE)
+
+# Comment line sent when no event arrived for this long, so proxies keep the stream open.
+SSE_KEEPALIVE_SECONDS = 15.0
+
 
 def _loan_to_dict(loan: LoanApplication, memos: list[AgentMemo]) -> dict[str, Any]:
     """Serialise a loan + its memos to a JSON-safe dict."""
@@ -53,7 +70,7 @@ def list_loans(db: Session = Depends(get_db)) -> list[dict[str, Any]]:
         memos = (
             db.query(AgentMemo)
             .filter(AgentMemo.loan_id == loan.id)
-            .order_by(AgentMemo.created_at)
+            .order_by(AgentMemo.seq, AgentMemo.created_at)
             .all()
         )
         result.append(_loan_to_dict(loan, memos))
@@ -70,7 +87,131 @@ def get_loan(loan_id: uuid.UUID, db: Session = Depends(get_db)) -> dict[str, Any
     memos = (
         db.query(AgentMemo)
         .filter(AgentMemo.loan_id == loan.id)
-        .order_by(AgentMemo.created_at)
+        .order_by(AgentMemo.seq, AgentMemo.created_at)
         .all()
     )
     return _loan_to_dict(loan, memos)
+
+
+@router.get("/{loan_id}/usage")
+def get_loan_llm_usage(loan_id: uuid.UUID, db: Session = Depends(get_db)) -> dict[str, Any]:
+    """LLM tokens, latency, cache hits and retries for a loan, by agent, state and round."""
+    loan = db.query(LoanApplication).filter(LoanApplication.id == loan_id).first()
+    if not loan:
+        raise HTTPException(status_code=404, detail="Loan application not found")
+    return get_loan_usage(db, loan.id)
+
+
+@router.post("/{loan_id}/resume", status_code=202)
+def resume_loan_workflow(
+    loan_id: uuid.UUID,
+    request: Request,
+    priority: JobPriority | None = Query(
+        None, description="Lower the scheduling class (bulk); default standard"
+    ),
+    db: Session = Depends(get_db),
+) -> dict[str, Any]:
+    """Queue the workflow of an interrupted loan. Recorded agent results are replayed,
+    so only the missing LLM calls are made. 409 if the loan's workflow is already
+    queued or running."""
+    loan = db.query(LoanApplication).filter(LoanApplication.id == loan_id).first()
+    if not loan:
+        raise HTTPException(status_code=404, detail="Loan application not found")
+    if WorkflowState(loan.workflow_state) not in RESUMABLE_STATES:
+        raise HTTPException(status_code=409, detail=f"Workflow already past {loan.workflow_state}")
+    try:
+        job = get_job_runner().submit(
+            loan.id, job_priority("standard", priority), job_source(request)
+        )
+    except LoanBusy as e:
+        raise HTTPException(
+            status_code=409, detail=f"Workflow already {e.job.state} as job {e.job.id}"
+        ) from e
+    return {
+        "loan_id": str(loan.id),
+        "job_id": str(job.id),
+        "status_url": f"/api/jobs/{job.id}",
+        "priority": job.priority,
+    }
+
+
+def _loan_exists(loan_id: uuid.UUID) -> bool:
+    db = SessionLocal()
+    try:
+        return db.get(LoanApplication, loan_id) is not None
+    finally:
+        db.close()
+
+
+def _committed_events(loan_id: uuid.UUID, after: int) -> list[AuditEvent]:
+    """The loan's committed audit entries with ``seq > after``, in order."""
+    db = SessionLocal()
+    try:
+        entries = (
+            db.query(AuditLog)
+            .filter(AuditLog.loan_id == loan_id, AuditLog.seq > after)
+            .order_by(AuditLog.seq)
+            .all()
+        )
+        return [
+            AuditEvent(e.loan_id, e.seq, e.event_type, e.details, e.timestamp)
+            for e in entries
+        ]
+    finally:
+        db.close()
+
+
+def _sse(event: AuditEvent) -> str:
+    return f"id: {event.seq}\nevent: {event.event_type}\ndata: {json.dumps(event.to_dict())}\n\n"
+
+
+async def _event_stream(loan_id: uuid.UUID, after: int) -> AsyncIterator[str]:
+    """Replay events after the cursor, then follow live ones until the workflow ends."""
+    bus = get_event_bus()
+    with bus.subscribe(loan_id) as sub:  # subscribe first so nothing falls between
+        last = after
+        backlog = await run_in_threadpool(_committed_events, loan_id, after)
+        # Entries of a running workflow are not committed yet; the bus still has them.
+        backlog += bus.recent(loan_id, after=backlog[-1].seq if backlog else after)
+        for event in backlog:
+            if event.seq > last:
+                last = event.seq
+                yield _sse(event)
+        if backlog and backlog[-1].terminal:
+            return
+        while True:
+            try:
+                event = await asyncio.wait_for(sub.get(), SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event.seq <= last:
+                continue
+            last = event.seq
+            yield _sse(event)
+            if event.terminal:
+                return
+
+
+@router.get("/{loan_id}/events")
+async def stream_loan_events(
+    loan_id: uuid.UUID,
+    after: int = 0,
+    last_event_id: int | None = Header(None),
+) -> StreamingResponse:
+    """Server-sent stream of the loan's audit events (STATE_TRANSITION, AGENT_MEMO,
+    DEBATE_ROUND_START, DECISION, ...) as the workflow writes them.
+
+    Each event's id is its ``seq``; a reconnecting client resumes after the
+    ``Last-Event-ID`` it sends (or ``?after=`` on a first connection). The stream
+    ends once the workflow finalizes the loan or fails.
+    """
+    exists = await run_in_threadpool(_loan_exists, loan_id)
+    if not exists:
+        raise HTTPException(status_code=404, detail="Loan application not found")
+    cursor = last_event_id if last_event_id is not None else after
+    return StreamingResponse(
+        _event_stream(loan_id, cursor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
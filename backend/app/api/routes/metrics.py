@@ -0,0 +1,43 @@
+"""Metrics API routes - runtime counters for the LLM layer, workflows and extraction."""
+
+from datetime import datetime
+from typing import Any
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.extraction.extractor import fallback_stats
+from app.models.database import get_db
+from app.services.job_service import get_job_runner
+from app.services.llm_service import get_llm_service
+from app.services.usage_service import get_usage_summary
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/llm")
+def llm_metrics() -> dict[str, Any]:
+    """Cache and admission-queue counters for this worker process."""
+    return get_llm_service().stats()
+
+
+@router.get("/workflows")
+def workflow_metrics() -> dict[str, Any]:
+    """Workflow scheduler queues for this worker process: depth, caps and queue-wait
+    times per priority class."""
+    return get_job_runner().stats()
+
+
+@router.get("/usage")
+def usage_metrics(
+    since: datetime | None = Query(None, description="Start of the window; default 30 days ago"),
+    db: Session = Depends(get_db),
+) -> dict[str, Any]:
+    """LLM usage across loans, aggregated by agent, WorkflowState and debate round."""
+    return get_usage_summary(db, since)
+
+
+@router.get("/extraction")
+def extraction_metrics() -> dict[str, Any]:
+    """LLM extraction fallback counts per field for this worker process."""
+    return fallback_stats()
@@ -1 +1,7 @@
 # Audit module
+
+from app.audit.buffer import WriteBuffer
+from app.audit.events import AuditEvent, EventBus, get_event_bus
+from app.audit.log import write_audit
+
+__all__ = ["AuditEvent", "EventBus", "WriteBuffer", "get_event_bus", "write_audit"]
@@ -0,0 +1,93 @@
+"""Write buffer - batches a workflow's AuditLog and AgentMemo rows into few flushes.
+
+Rows get their id and per-loan ``seq`` when they are buffered, so nothing has to be
+flushed to number or reference them, and ordering never relies on ``func.now()``
+timestamps (which are identical within a Postgres transaction). ``flush`` adds the
+pending rows together; SQLAlchemy sends same-table rows with known primary keys as one
+executemany / insertmanyvalues batch. Audit events are still published to live
+subscribers the moment they are buffered.
+
+Because entries are published before their commit, a rollback can discard seqs that
+subscribers have already received. Audit numbering therefore continues past the
+highest seq on the event bus as well as the database, so the entries written after a
+rollback (WORKFLOW_FAILED, a resumed run) are never dropped as already seen.
+"""
+
+import uuid
+from typing import Any
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.audit.events import AuditEvent, get_event_bus
+from app.models.agent_memo import AgentMemo
+from app.models.audit_log import AuditLog
+
+
+class WriteBuffer:
+    """Pending audit and memo rows for one session, numbered per loan."""
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+        self._pending: list[AuditLog | AgentMemo] = []
+        self._last_seq: dict[tuple[type, uuid.UUID], int] = {}
+
+    def _next_seq(self, model: type[AuditLog] | type[AgentMemo], loan_id: uuid.UUID) -> int:
+        key = (model, loan_id)
+        if key not in self._last_seq:  # one query per loan and table, then counted here
+            self._last_seq[key] = (
+                self.db.query(func.max(model.seq)).filter(model.loan_id == loan_id).scalar() or 0
+            )
+            if model is AuditLog:
+                self._last_seq[key] = max(self._last_seq[key], get_event_bus().last_seq(loan_id))
+        self._last_seq[key] += 1
+        return self._last_seq[key]
+
+    def audit(
+        self,
+        loan_id: uuid.UUID,
+        event_type: str,
+        details: dict[str, Any] | None = None,
+    ) -> AuditLog:
+        """Buffer an AuditLog entry and publish it to the loan's live subscribers."""
+        entry = AuditLog(
+            id=uuid.uuid4(),
+            loan_id=loan_id,
+            seq=self._next_seq(AuditLog, loan_id),
+            event_type=event_type,
+            details=details,
+        )
+        self._pending.append(entry)
+        get_event_bus().publish(AuditEvent(loan_id, entry.seq, event_type, details))
+        return entry
+
+    def memo(
+        self,
+        loan_id: uuid.UUID,
+        agent_type: str,
+        content: str,
+        risk_score: float | None,
+    ) -> AgentMemo:
+        """Buffer an AgentMemo; its id is usable before the flush."""
+        memo = AgentMemo(
+            id=uuid.uuid4(),
+            loan_id=loan_id,
+            seq=self._next_seq(AgentMemo, loan_id),
+            agent_type=agent_type,
+            content=content,
+            risk_score=risk_score,
+        )
+        self._pending.append(memo)
+        return memo
+
+    def flush(self) -> None:
+        """Insert the buffered rows in one flush."""
+        if self._pending:
+            self.db.add_all(self._pending)
+            self._pending.clear()
+            self.db.flush()
+
+    def commit(self) -> None:
+        """Flush the buffered rows and commit the session."""
+        self.flush()
+        self.db.commit()
@@ -0,0 +1,117 @@
+"""Audit event bus - pushes audit entries to live subscribers as they are written.
+
+Every audit entry is published here the moment it is written (buffered), ahead of
+its commit. The workflow commits at checkpoints - after each agent result and on
+entering INITIAL_REVIEW or DEBATE - and the remaining states commit together when the
+loan is finalized, so the database lags the stream by up to one checkpoint. The bus
+keeps each loan's recent events so a reconnecting client can catch up on entries
+that are not committed yet.
+
+Publishing happens on workflow threads; subscribers are async (the SSE endpoint) and
+receive events through an ``asyncio.Queue`` fed with ``call_soon_threadsafe``.
+"""
+
+import asyncio
+import threading
+import uuid
+from collections import OrderedDict, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any
+
+
+@dataclass
+class AuditEvent:
+    loan_id: uuid.UUID
+    seq: int
+    event_type: str
+    details: dict[str, Any] | None
+    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @property
+    def terminal(self) -> bool:
+        """Last event of a workflow run."""
+        return self.event_type in ("WORKFLOW_COMPLETE", "WORKFLOW_FAILED")
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "loan_id": str(self.loan_id),
+            "seq": self.seq,
+            "event_type": self.event_type,
+            "details": self.details,
+            "timestamp": self.timestamp.isoformat(),
+        }
+
+
+class Subscription:
+    """Events for one loan, delivered on the subscriber's event loop."""
+
+    def __init__(self, loan_id: uuid.UUID) -> None:
+        self.loan_id = loan_id
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue[AuditEvent] = asyncio.Queue()
+
+    def _deliver(self, event: AuditEvent) -> None:
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+
+    async def get(self) -> AuditEvent:
+        return await self._queue.get()
+
+
+class EventBus:
+    """Per-loan fan-out of audit events, with the last ``history`` events of the
+    ``max_loans`` most recently active loans kept for catch-up."""
+
+    def __init__(self, history: int = 500, max_loans: int = 1000) -> None:
+        self._history = history
+        self._max_loans = max_loans
+        self._recent: OrderedDict[uuid.UUID, deque[AuditEvent]] = OrderedDict()
+        self._subscribers: dict[uuid.UUID, set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, event: AuditEvent) -> None:
+        with self._lock:
+            recent = self._recent.pop(event.loan_id, None) or deque(maxlen=self._history)
+            recent.append(event)
+            self._recent[event.loan_id] = recent
+            if len(self._recent) > self._max_loans:
+                self._recent.popitem(last=False)
+            subscribers = list(self._subscribers.get(event.loan_id, ()))
+        for sub in subscribers:
+            sub._deliver(event)
+
+    def recent(self, loan_id: uuid.UUID, after: int = 0) -> list[AuditEvent]:
+        """Kept events for a loan with ``seq > after``, oldest first."""
+        with self._lock:
+            return [e for e in self._recent.get(loan_id, ()) if e.seq > after]
+
+    def last_seq(self, loan_id: uuid.UUID) -> int:
+        """Highest ``seq`` published for a loan that is still kept, else 0. Published
+        entries may have been rolled back, so new entries must number past this."""
+        with self._lock:
+            return max((e.seq for e in self._recent.get(loan_id, ())), default=0)
+
+    @contextmanager
+    def subscribe(self, loan_id: uuid.UUID) -> Iterator[Subscription]:
+        """Receive the loan's events published from now on. Must be entered on the
+        event loop that will consume them."""
+        sub = Subscription(loan_id)
+        with self._lock:
+            self._subscribers.setdefault(loan_id, set()).add(sub)
+        try:
+            yield sub
+        finally:
+            with self._lock:
+                subs = self._subscribers.get(loan_id)
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[loan_id]
+
+
+@lru_cache
+def get_event_bus() -> EventBus:
+    """Process-wide audit event bus."""
+    return EventBus()
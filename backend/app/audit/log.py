@@ -0,0 +1,23 @@
+"""Audit log writer for one-off entries outside a workflow's write buffer."""
+
+import uuid
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app.audit.buffer import WriteBuffer
+from app.models.audit_log import AuditLog
+
+
+def write_audit(
+    db: Session,
+    loan_id: uuid.UUID,
+    event_type: str,
+    details: dict[str, Any] | None = None,
+) -> AuditLog:
+    """Add an AuditLog entry with the loan's next ``seq`` and publish it to live
+    subscribers. The entry is flushed, not committed."""
+    buffer = WriteBuffer(db)
+    entry = buffer.audit(loan_id, event_type, details)
+    buffer.flush()
+    return entry
@@ -0,0 +1,17 @@
+# Batch module
+
+from app.batch.backends import (
+    BatchBackend,
+    LocalBatchBackend,
+    OpenAIBatchBackend,
+    build_batch_backend,
+)
+from app.batch.job import BatchJob
+
+__all__ = [
+    "BatchBackend",
+    "LocalBatchBackend",
+    "OpenAIBatchBackend",
+    "build_batch_backend",
+    "BatchJob",
+]
@@ -0,0 +1,39 @@
+"""Run or resume a batch re-evaluation job.
+
+    python -m app.batch reeval-2024q1                    # every loan
+    python -m app.batch reeval-2024q1 --loan-id <uuid>   # selected loans
+    LLM_BATCH_BACKEND=local python -m app.batch smoke    # offline stand-in
+
+Re-running with the same job name resumes it from its last recorded stage.
+"""
+
+import argparse
+import json
+import uuid
+from pathlib import Path
+
+from app.batch import BatchJob, build_batch_backend
+from app.config import get_settings
+from app.models.database import SessionLocal
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("job", help="job name; its files live under LLM_BATCH_DIR/<job>")
+    parser.add_argument("--loan-id", action="append", type=uuid.UUID, dest="loan_ids")
+    parser.add_argument("--poll-seconds", type=float, default=None)
+    parser.add_argument("--max-wait", type=float, default=None, help="give up polling after N seconds")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    job = BatchJob(Path(settings.llm_batch_dir) / args.job, build_batch_backend(settings), settings)
+    db = SessionLocal()
+    try:
+        summary = job.run(db, args.loan_ids, args.poll_seconds, args.max_wait)
+    finally:
+        db.close()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Batch backends - OpenAI Batch API and a local file-based stand-in.
+
+Both take a JSONL file of chat-completion requests in the OpenAI batch input format
+(``{"custom_id", "method", "url", "body"}`` per line) and produce a JSONL file in the
+batch output format (``{"custom_id", "response": {"status_code", "body"}, "error"}``).
+"""
+
+import asyncio
+import json
+import shutil
+import uuid
+from pathlib import Path
+from typing import Protocol
+
+from openai import OpenAI
+
+from app.config import Settings
+from app.services.llm_backends import FakeBackend
+
+# Terminal batch states; anything else means keep polling.
+DONE_STATES = ("completed", "failed", "expired", "cancelled")
+
+
+class BatchBackend(Protocol):
+    name: str
+
+    def submit(self, input_path: Path) -> str: ...
+
+    def status(self, batch_id: str) -> str: ...
+
+    def download(self, batch_id: str, output_path: Path) -> None: ...
+
+
+class OpenAIBatchBackend:
+    """OpenAI Batch API: 24h completion window at batch pricing."""
+
+    name = "openai"
+
+    def __init__(self, settings: Settings) -> None:
+        self._client = OpenAI(api_key=settings.openai_api_key, base_url=settings.llm_base_url)
+
+    def submit(self, input_path: Path) -> str:
+        with input_path.open("rb") as f:
+            upload = self._client.files.create(file=f, purpose="batch")
+        batch = self._client.batches.create(
+            input_file_id=upload.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self._client.batches.retrieve(batch_id).status
+
+    def download(self, batch_id: str, output_path: Path) -> None:
+        batch = self._client.batches.retrieve(batch_id)
+        lines: list[str] = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                lines.extend(self._client.files.content(file_id).text.splitlines())
+        output_path.write_text("\n".join(lines) + "\n")
+
+
+class LocalBatchBackend:
+    """File-based stand-in for tests and offline runs.
+
+    ``submit`` copies the input under ``root/<batch_id>/``; the first ``status`` poll
+    answers every request with ``FakeBackend`` and marks the batch completed.
+    """
+
+    name = "local"
+
+    def __init__(self, root: Path, backend: FakeBackend) -> None:
+        self._root = root
+        self._backend = backend
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "LocalBatchBackend":
+        return cls(Path(settings.llm_batch_dir) / "_local", FakeBackend.from_settings(settings))
+
+    def _dir(self, batch_id: str) -> Path:
+        return self._root / batch_id
+
+    def submit(self, input_path: Path) -> str:
+        batch_id = f"local_batch_{uuid.uuid4().hex[:12]}"
+        self._dir(batch_id).mkdir(parents=True)
+        shutil.copy(input_path, self._dir(batch_id) / "input.jsonl")
+        (self._dir(batch_id) / "status").write_text("in_progress")
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        status_file = self._dir(batch_id) / "status"
+        status = status_file.read_text().strip()
+        if status == "in_progress":
+            asyncio.run(self._process(batch_id))
+            status_file.write_text(status := "completed")
+        return status
+
+    def download(self, batch_id: str, output_path: Path) -> None:
+        shutil.copy(self._dir(batch_id) / "output.jsonl", output_path)
+
+    async def _process(self, batch_id: str) -> None:
+        lines = (self._dir(batch_id) / "input.jsonl").read_text().splitlines()
+        results = await asyncio.gather(*(self._answer(json.loads(line)) for line in lines if line))
+        (self._dir(batch_id) / "output.jsonl").write_text(
+            "".join(json.dumps(r) + "\n" for r in results)
+        )
+
+    async def _answer(self, request: dict) -> dict:
+        body = request["body"]
+        try:
+            completion = await self._backend.create(
+                model=body["model"],
+                prompt="\n".join(m["content"] for m in body["messages"]),
+                max_tokens=body["max_tokens"],
+                temperature=body.get("temperature", 0.0),
+                response_format=body.get("response_format"),
+            )
+        except Exception as exc:
+            return {
+                "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+                "custom_id": request["custom_id"],
+                "response": None,
+                "error": {"code": "server_error", "message": str(exc)},
+            }
+        return {
+            "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+            "custom_id": request["custom_id"],
+            "response": {
+                "status_code": 200,
+                "body": {
+                    "model": completion.model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": completion.content},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {
+                        "prompt_tokens": completion.prompt_tokens,
+                        "completion_tokens": completion.completion_tokens,
+                        "total_tokens": completion.prompt_tokens + completion.completion_tokens,
+                    },
+                },
+            },
+            "error": None,
+        }
+
+
+def build_batch_backend(settings: Settings) -> BatchBackend:
+    """Batch backend selected by ``LLM_BATCH_BACKEND``."""
+    if settings.llm_batch_backend == "local":
+        return LocalBatchBackend.from_settings(settings)
+    return OpenAIBatchBackend(settings)
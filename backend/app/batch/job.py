@@ -0,0 +1,214 @@
+"""Batch re-evaluation job - initial Sales/Risk/Compliance reviews for many loans.
+
+A job lives in one directory and moves through stages recorded in ``manifest.json``:
+
+    prepared   input.jsonl written (one request per loan and agent)
+    submitted  handed to the batch backend
+    downloaded output.jsonl fetched
+    merged     results written back as AgentMemo rows
+
+Re-running a job picks up at its recorded stage. Merging skips results already
+written, which are found by their ``custom_id`` in the AGENT_MEMO audit entries of
+the batch's loans, so an interrupted merge can simply be re-run.
+"""
+
+import json
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app.agents import ComplianceAgent, RiskAgent, SalesAgent
+from app.audit import WriteBuffer
+from app.batch.backends import DONE_STATES, BatchBackend
+from app.config import Settings, get_settings
+from app.models.audit_log import AuditLog
+from app.models.loan_application import LoanApplication
+from app.orchestration.orchestrator import record_result
+from app.orchestration.states import WorkflowState
+from app.services.llm_service import JSON_FORMAT
+from app.services.llm_usage import LLMCall
+
+AGENTS = {"Sales": SalesAgent, "Risk": RiskAgent, "Compliance": ComplianceAgent}
+
+MERGE_COMMIT_EVERY = 100
+MERGE_LOOKUP_CHUNK = 500  # loan ids per query for results already merged
+
+
+def _financials(loan: LoanApplication) -> dict[str, Any]:
+    financials = loan.extracted_financials or {}
+    return {k: v for k, v in financials.items() if v is not None} if isinstance(financials, dict) else {}
+
+
+class BatchJob:
+    """One resumable batch re-evaluation run, persisted under ``directory``."""
+
+    def __init__(
+        self,
+        directory: Path,
+        backend: BatchBackend,
+        settings: Settings | None = None,
+    ) -> None:
+        self.directory = Path(directory)
+        self._backend = backend
+        self._settings = settings or get_settings()
+        self._agents = {name: cls(llm=None) for name, cls in AGENTS.items()}
+        self._manifest_path = self.directory / "manifest.json"
+        self._input = self.directory / "input.jsonl"
+        self._output = self.directory / "output.jsonl"
+
+    @property
+    def manifest(self) -> dict[str, Any] | None:
+        if not self._manifest_path.exists():
+            return None
+        return json.loads(self._manifest_path.read_text())
+
+    def _save(self, **updates: Any) -> dict[str, Any]:
+        manifest = {**(self.manifest or {}), **updates}
+        tmp = self._manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest, indent=2))
+        tmp.replace(self._manifest_path)  # atomic: a crash never leaves half a manifest
+        return manifest
+
+    def run(
+        self,
+        db: Session,
+        loan_ids: list[uuid.UUID] | None = None,
+        poll_seconds: float | None = None,
+        max_wait: float | None = None,
+    ) -> dict[str, Any]:
+        """Run (or resume) every remaining stage and return the merge summary."""
+        if self.manifest is None:
+            self.prepare(db, loan_ids)
+        if self.manifest["stage"] == "prepared":
+            self.submit()
+        if self.manifest["stage"] == "submitted":
+            self.wait(poll_seconds, max_wait)
+        return self.merge(db)
+
+    def prepare(self, db: Session, loan_ids: list[uuid.UUID] | None = None) -> int:
+        """Write input.jsonl: an initial-review request per loan and agent. Returns the count."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        query = db.query(LoanApplication)
+        if loan_ids is not None:
+            query = query.filter(LoanApplication.id.in_(loan_ids))
+        count = 0
+        with self._input.open("w") as f:
+            for loan in query.yield_per(500):
+                financials = _financials(loan)
+                for name, agent in self._agents.items():
+                    f.write(json.dumps(self._request(f"{loan.id}:{name}", agent, financials)) + "\n")
+                    count += 1
+        self._save(stage="prepared", requests=count, batch_id=None, backend=self._backend.name)
+        return count
+
+    def _request(self, custom_id: str, agent: Any, financials: dict[str, Any]) -> dict[str, Any]:
+        route = self._settings.llm_route(agent.route(None))
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": route.model or self._settings.llm_model,
+                "messages": [{"role": "user", "content": agent.build_prompt(financials).text}],
+                "max_tokens": route.max_tokens,
+                "temperature": route.temperature,
+                "response_format": JSON_FORMAT,
+            },
+        }
+
+    def submit(self) -> str:
+        batch_id = self._backend.submit(self._input)
+        self._save(stage="submitted", batch_id=batch_id)
+        return batch_id
+
+    def wait(self, poll_seconds: float | None = None, max_wait: float | None = None) -> str:
+        """Poll until the batch finishes, then download its output."""
+        batch_id = self.manifest["batch_id"]
+        poll = self._settings.llm_batch_poll_seconds if poll_seconds is None else poll_seconds
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        while (status := self._backend.status(batch_id)) not in DONE_STATES:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"batch {batch_id} still {status}; re-run the job to resume")
+            time.sleep(poll)
+        if status == "failed" or status == "cancelled":
+            self._save(status=status)
+            raise RuntimeError(f"batch {batch_id} {status}")
+        self._backend.download(batch_id, self._output)  # expired batches keep partial output
+        self._save(stage="downloaded", status=status)
+        return status
+
+    def _merged_ids(self, db: Session, batch_id: str, loan_ids: list[uuid.UUID]) -> set[str]:
+        """custom_ids of this batch already merged, looked up for its loans only."""
+        done: set[str] = set()
+        for start in range(0, len(loan_ids), MERGE_LOOKUP_CHUNK):
+            entries = db.query(AuditLog.details).filter(
+                AuditLog.loan_id.in_(loan_ids[start:start + MERGE_LOOKUP_CHUNK]),
+                AuditLog.event_type == "AGENT_MEMO",
+            )
+            done.update(
+                details["custom_id"]
+                for (details,) in entries
+                if details and details.get("batch_id") == batch_id
+            )
+        return done
+
+    def merge(self, db: Session) -> dict[str, Any]:
+        """Write every successful result not yet merged as an AgentMemo with its audit entry."""
+        batch_id = self.manifest["batch_id"]
+        items = [json.loads(line) for line in self._output.read_text().splitlines() if line.strip()]
+        loan_ids = list(dict.fromkeys(uuid.UUID(item["custom_id"].split(":")[0]) for item in items))
+        done = self._merged_ids(db, batch_id, loan_ids)
+        merged, failed = 0, []
+        out = WriteBuffer(db)
+        loans: dict[str, LoanApplication | None] = {}
+        for item in items:
+            custom_id = item["custom_id"]
+            if custom_id in done:
+                continue
+            loan_id, name = custom_id.split(":")
+            if loan_id not in loans:
+                loans[loan_id] = db.get(LoanApplication, uuid.UUID(loan_id))
+            loan = loans[loan_id]
+            raw, call = _parse(item)
+            if loan is None or raw is None:
+                failed.append(custom_id)
+                continue
+            agent = self._agents[name]
+            result = agent.to_result(raw, [call], agent.build_prompt(_financials(loan)))
+            record_result(
+                out, loan.id, name, result, WorkflowState(loan.workflow_state),
+                batch_id=batch_id, custom_id=custom_id,
+            )
+            merged += 1
+            if merged % MERGE_COMMIT_EVERY == 0:
+                out.commit()
+        out.commit()
+        self._save(stage="merged", merged=len(done) + merged, failed=failed)
+        return {
+            "batch_id": batch_id,
+            "merged": merged,
+            "already_merged": len(done),
+            "failed": failed,
+        }
+
+
+def _parse(item: dict[str, Any]) -> tuple[dict[str, Any] | None, LLMCall | None]:
+    """Parsed JSON content and usage of one batch output line; (None, None) on error."""
+    response = item.get("response") or {}
+    if item.get("error") or response.get("status_code") != 200:
+        return None, None
+    body = response["body"]
+    usage = body.get("usage") or {}
+    call = LLMCall(
+        model=body.get("model", ""),
+        prompt_tokens=usage.get("prompt_tokens", 0),
+        completion_tokens=usage.get("completion_tokens", 0),
+    )
+    try:
+        raw = json.loads(body["choices"][0]["message"]["content"])
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None, call
+    return (raw if isinstance(raw, dict) else None), call
@@ -1,16 +1,161 @@
 """Application configuration."""
 
+from typing import Literal
+
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
 
+class LLMRoute(BaseModel):
+    """Call parameters for one LLM call site. ``model=None`` means ``llm_model``."""
+
+    model: str | None = None
+    max_tokens: int = 1000
+    temperature: float = 0.0
+    timeout: float | None = None  # None means llm_timeout_seconds
+
+
+def _default_routes() -> dict[str, LLMRoute]:
+    agent = LLMRoute(max_tokens=800)
+    return {
+        "extraction": LLMRoute(max_tokens=1000),  # scaled down by the number of fields asked
+        "sales.initial": agent,
+        "sales.debate": agent,
+        "risk.initial": agent,
+        "risk.debate": agent,
+        "compliance.initial": agent,
+        "compliance.debate": agent,
+        "panel": LLMRoute(max_tokens=1800),
+        "moderator": agent,
+        "chat": LLMRoute(max_tokens=600, temperature=0.3),
+    }
+
+
+# Routes that only run once a debate is triggered; llm_debate_model applies to these.
+DEBATE_ROUTES = ("sales.debate", "risk.debate", "compliance.debate", "moderator")
+
+
 class Settings(BaseSettings):
     database_url: str = "sqlite:///./lendsynthetix.db"
     openai_api_key: str | None = None
 
+    # LLM backend (see app.services.llm_backends): "openai", "http" (any
+    # OpenAI-compatible server at llm_base_url, e.g. the local stub) or "fake"
+    # (in-process, for offline load tests).
+    llm_backend: Literal["openai", "http", "fake"] = "openai"
+    llm_model: str = "gpt-4o-mini"
+    llm_base_url: str | None = None
+    llm_fake_latency_ms: float = 800.0
+    llm_fake_latency_sigma: float = 0.5
+    llm_fake_error_rate: float = 0.0
+    llm_fake_completion_tokens: int = 180
+    llm_fake_seed: int = 0
+
+    # Per-call-site routing: model, max_tokens, temperature and timeout for each
+    # route key (see _default_routes). LLM_ROUTES takes JSON; fields given there
+    # override the defaults for that key. llm_debate_model, if set, escalates
+    # only the debate-round and moderator routes to a larger model.
+    llm_routes: dict[str, LLMRoute] = {}
+    llm_debate_model: str | None = None
+
+    # Shared LLM client connection pool (see app.services.llm_service)
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_expiry: float = 30.0
+
+    # LLM response cache (see app.services.llm_cache). Bump the namespace to
+    # invalidate every entry, e.g. after a prompt change.
+    llm_cache_enabled: bool = True
+    llm_cache_path: str | None = "./llm_cache.sqlite3"
+    llm_cache_memory_entries: int = 1024
+    llm_cache_ttl_seconds: float = 7 * 24 * 3600
+    llm_cache_namespace: str = "v1"
+
+    # LLM admission control, shared by every caller in the process
+    # (see app.services.llm_admission). Size these to the account's rate limits
+    # divided by the number of uvicorn workers.
+    llm_max_in_flight: int = 16
+    llm_requests_per_minute: int = 500
+    llm_tokens_per_minute: int = 200_000
+
+    # LLM call resilience (see app.services.llm_resilience). The timeout is the
+    # whole-call deadline, including queueing and retries.
+    llm_timeout_seconds: float = 30.0
+    llm_max_attempts: int = 3
+    llm_retry_base_delay: float = 0.5
+    llm_retry_max_delay: float = 8.0
+    llm_hedging_enabled: bool = False
+    llm_hedge_min_samples: int = 20
+    llm_breaker_failure_threshold: int = 5
+    llm_breaker_reset_seconds: float = 30.0
+
+    # INITIAL_REVIEW: "per_agent" makes one call per agent; "combined" asks one
+    # call for all three reviews and falls back to per-agent calls if it fails
+    # validation (see app.agents.panel_agent); "staged" runs the keyword check
+    # and Compliance agent first and calls Sales and Risk only if neither vetoes.
+    initial_review_mode: Literal["per_agent", "combined", "staged"] = "per_agent"
+
+    # DEBATE rounds: "sequential" agents rebut in turn, each seeing this round's
+    # earlier rebuttals; "simultaneous" agents rebut the previous rounds
+    # concurrently, then the moderator follows.
+    debate_mode: Literal["sequential", "simultaneous"] = "sequential"
+
+    # Numeric debate convergence, checked after each round's rebuttals (opt-in: it
+    # can change decisions). The debate ends in consensus without a moderator call
+    # when |Sales - Risk| is at or under debate_converge_spread and, if
+    # debate_converge_epsilon is set, no agent's score moved more than that since
+    # the previous round. None (the default) leaves every round to the moderator.
+    debate_converge_spread: float | None = None
+    debate_converge_epsilon: float | None = None
+
+    # Offline batch re-evaluation (see app.batch): "openai" submits through the
+    # Batch API, "local" is a file-based stand-in answered by FakeBackend.
+    llm_batch_backend: Literal["openai", "local"] = "openai"
+    llm_batch_dir: str = "./batch_jobs"
+    llm_batch_poll_seconds: float = 30.0
+
+    # Prompt token budgets (see app.services.prompt_budget). Agent and moderator
+    # prompts drop older debate memos first; extraction truncates the document.
+    llm_prompt_token_budget: int = 6000
+    llm_extraction_token_budget: int = 3500
+    # Debate prompts carry each agent's latest memo plus a summary of earlier rounds
+    # (see app.orchestration.transcript) of at most this many tokens.
+    llm_debate_summary_token_budget: int = 400
+
+    # Relevance-windowed LLM extraction (see app.extraction.windowing): characters
+    # of context kept around each matched term, and the most windows sent.
+    extraction_window_chars: int = 400
+    extraction_max_windows: int = 12
+
+    # Upload workflow jobs (see app.services.job_service): threads running
+    # workflows after upload, and finished jobs kept for GET /api/jobs/{id}.
+    workflow_workers: int = 4
+    workflow_job_history: int = 1000
+    # Workflow scheduling: concurrent workflows per priority class (interactive,
+    # standard, bulk; dispatched in that order), and relative shares of the sources
+    # (client addresses) submitting within a class (weight 1 unless listed).
+    workflow_class_caps: dict[str, int] = {"interactive": 4, "standard": 4, "bulk": 2}
+    workflow_source_weights: dict[str, float] = {}
+
+    # Workflow stages that call agents (see app.orchestration.workflow): seconds
+    # per attempt (None = no limit) and extra attempts after a failure or timeout.
+    workflow_stage_timeout_seconds: float | None = 180.0
+    workflow_stage_retries: int = 1
+
     class Config:
         env_file = ".env"
 
+    def llm_route(self, name: str) -> LLMRoute:
+        """Route for a call site: the default entry, overlaid with any fields set in
+        ``llm_routes``."""
+        route = _default_routes().get(name) or LLMRoute()
+        if name in self.llm_routes:
+            route = route.model_copy(update=self.llm_routes[name].model_dump(exclude_unset=True))
+        if self.llm_debate_model and name in DEBATE_ROUTES and not route.model:
+            route = route.model_copy(update={"model": self.llm_debate_model})
+        return route
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -1,35 +1,60 @@
 """Orchestrates extraction: regex first, LLM fallback for missing fields."""
 
+import threading
+from collections import Counter
+from typing import Any
+
 from app.extraction.schemas import ExtractionResult
 from app.extraction.regex_extractor import extract_with_regex
 from app.extraction.llm_extractor import extract_with_llm
-from app.services.llm_service import LLMService
+from app.services.llm_service import LLMService, get_llm_service
+
+# A missing figure triggers the LLM fallback, which is asked for just the missing ones.
+FALLBACK_FIELDS = ("revenue", "debt", "dscr")
+# Asked for as well when the regex pass found nothing for them: LLM-detected keywords
+# feed compliance_flag and the auto-reject veto, and cost only a few tokens.
+FLAG_FIELDS = ("collateral_present", "compliance_keywords")
+
+_lock = threading.Lock()
+_fallbacks: Counter[str] = Counter()  # fallback calls by number of fields requested
+_requested: Counter[str] = Counter()  # per field: asked of the LLM
+_recovered: Counter[str] = Counter()  # per field: LLM returned a value
+
+
+def fallback_stats() -> dict[str, Any]:
+    """Per-field LLM fallback counters for this worker process."""
+    with _lock:
+        return {
+            "calls": sum(_fallbacks.values()),
+            "by_field_count": dict(_fallbacks),
+            "requested": dict(_requested),
+            "recovered": dict(_recovered),
+        }
+
+
+def _found(result: ExtractionResult, field: str) -> bool:
+    """A figure is found when set; collateral and keywords when true / non-empty."""
+    value = getattr(result, field)
+    return bool(value) if field in FLAG_FIELDS else value is not None
 
 
 def extract(text: str, llm: LLMService | None = None) -> ExtractionResult:
-    """Extract using regex, then LLM fallback for missing fields."""
+    """Extract using regex, then LLM fallback for just the missing fields."""
     result = extract_with_regex(text)
 
     # LLM fallback if fields missing and LLM available
     if llm is None:
-        llm = LLMService()
-    needs_fallback = (
-        result.revenue is None
-        or result.debt is None
-        or result.dscr is None
-    )
-    if needs_fallback and llm:
-        llm_result = extract_with_llm(text, llm)
-        if llm_result:
-            if result.revenue is None and llm_result.revenue is not None:
-                result.revenue = llm_result.revenue
-            if result.debt is None and llm_result.debt is not None:
-                result.debt = llm_result.debt
-            if result.dscr is None and llm_result.dscr is not None:
-                result.dscr = llm_result.dscr
-            if not result.collateral_present and llm_result.collateral_present:
-                result.collateral_present = llm_result.collateral_present
-            if not result.compliance_keywords and llm_result.compliance_keywords:
-                result.compliance_keywords = llm_result.compliance_keywords
+        llm = get_llm_service()
+    missing = [f for f in FALLBACK_FIELDS if not _found(result, f)]
+    if missing and llm and llm.available:
+        missing += [f for f in FLAG_FIELDS if not _found(result, f)]
+        llm_result = extract_with_llm(text, llm, missing)
+        recovered = [f for f in missing if llm_result and _found(llm_result, f)]
+        for field in recovered:
+            setattr(result, field, getattr(llm_result, field))
+        with _lock:
+            _fallbacks[str(len(missing))] += 1
+            _requested.update(missing)
+            _recovered.update(recovered)
 
     return result
@@ -1,29 +1,84 @@
 """LLM-based extraction fallback when regex misses fields."""
 
+from collections.abc import Sequence
+
+from app.config import get_settings
 from app.extraction.schemas import ExtractionResult
+from app.extraction.windowing import find_windows
 from app.services.llm_service import LLMService
+from app.services.prompt_budget import BuiltPrompt, PromptBuilder, SectionPriority
+
+# JSON schema line per field; the prompt asks only for the fields the regex pass missed.
+FIELD_SCHEMAS = {
+    "revenue": '"revenue": <number or null>',
+    "debt": '"debt": <number or null>',
+    "dscr": '"dscr": <number or null>',
+    "collateral_present": '"collateral_present": <true/false>',
+    "compliance_keywords": '"compliance_keywords": ["keyword1", "keyword2"]',
+}
+ALL_FIELDS = tuple(FIELD_SCHEMAS)
+MONEY_FIELDS = ("revenue", "debt")
+
+
+def _instructions(fields: Sequence[str]) -> str:
+    return (
+        f"Extract the following from this financial document: {', '.join(fields)}. "
+        "Return ONLY valid JSON, no markdown."
+    )
+
+
+def _schema(fields: Sequence[str]) -> str:
+    lines = ",\n".join(f"  {FIELD_SCHEMAS[f]}" for f in fields)
+    notes = ["Use null for any figure that is not stated."]
+    if "collateral_present" in fields:
+        notes.append("Use false for collateral_present if not mentioned.")
+    if "compliance_keywords" in fields:
+        notes.append(
+            "Use an empty list for compliance_keywords if none. Search for: offshore, grey list, "
+            "gray list, AML, anti-money laundering, sanctions, PEP, politically exposed."
+        )
+    if any(f in MONEY_FIELDS for f in fields):
+        notes.append("Numbers should be in base units (e.g. 12.5 for $12.5M).")
+    return "Return this exact JSON structure:\n{\n" + lines + "\n}\n\n" + "\n".join(notes)
 
 
-def extract_with_llm(text: str, llm: LLMService) -> ExtractionResult | None:
-    """Use LLM to extract when API key is available."""
-    prompt = f"""Extract the following from this financial document. Return ONLY valid JSON, no markdown.
+def build_prompt(
+    text: str, fields: Sequence[str] = ALL_FIELDS, budget: int | None = None
+) -> BuiltPrompt:
+    """Extraction prompt built from the document's relevant windows, with page markers.
 
-Text:
-{text[:12000]}
+    Falls back to the (truncated) document head when nothing relevant is found.
+    """
+    settings = get_settings()
+    builder = PromptBuilder(budget or settings.llm_extraction_token_budget)
+    builder.add("instructions", _instructions(fields), SectionPriority.INSTRUCTIONS)
+    windows = find_windows(
+        text, radius=settings.extraction_window_chars, max_windows=settings.extraction_max_windows
+    )
+    if windows:
+        for w in windows:
+            builder.add(
+                f"page:{w.page}:{w.start}",
+                f"[Page {w.page}]\n{w.text}\n",
+                SectionPriority.DOCUMENT,
+                header="Relevant excerpts:",
+            )
+    else:
+        builder.add("document", text, SectionPriority.DOCUMENT, truncate=True, header="Text:")
+    builder.add("schema", _schema(fields), SectionPriority.INSTRUCTIONS)
+    return builder.build()
 
-Return this exact JSON structure (use null for missing numeric fields, false for collateral_present if not mentioned, empty list for compliance_keywords if none):
-{{
-  "revenue": <number or null>,
-  "debt": <number or null>,
-  "dscr": <number or null>,
-  "collateral_present": <true/false>,
-  "compliance_keywords": ["keyword1", "keyword2"]
-}}
 
-Search for: offshore, grey list, gray list, AML, anti-money laundering, sanctions, PEP, politically exposed.
-Numbers should be in base units (e.g. 12.5 for $12.5M).
-"""
-    response = llm.complete(prompt)
+def extract_with_llm(
+    text: str, llm: LLMService, fields: Sequence[str] = ALL_FIELDS
+) -> ExtractionResult | None:
+    """Use LLM to extract ``fields`` when API key is available. Fields not asked for
+    keep their ExtractionResult defaults.
+    """
+    prompt = build_prompt(text, fields).text
+    # The route's max_tokens covers all fields; scale it to the fields asked for.
+    max_tokens = get_settings().llm_route("extraction").max_tokens * len(fields) // len(ALL_FIELDS)
+    response = llm.complete(prompt, max_tokens=max(1, max_tokens), route="extraction")
     if not response:
         return None
     try:
@@ -0,0 +1,77 @@
+"""Relevance windows - the passages of a long document worth sending to the LLM.
+
+Financial figures rarely sit on the cover pages, so instead of the document head the
+LLM fallback gets short windows around numbers near revenue/debt/DSCR terms, plus
+collateral and compliance mentions, each tagged with its page.
+"""
+
+import re
+from dataclasses import dataclass
+
+from app.extraction.regex_extractor import COLLATERAL_PATTERNS, COMPLIANCE_KEYWORDS
+from app.ingestion.pdf_parser import PAGE_BREAK
+
+# Terms that only matter when a figure is close by.
+FIGURE_TERMS = re.compile(
+    r"\b(?:revenue|sales|top\s*line|turnover|"
+    r"debt|liabilities|borrowings?|loans?\s+payable|"
+    r"dscr|debt\s+service\s+coverage|coverage\s+ratio)\b",
+    re.IGNORECASE,
+)
+# Terms that matter on their own.
+MENTION_TERMS = re.compile(
+    "|".join(COLLATERAL_PATTERNS + [rf"\b{re.escape(kw)}\b" for kw in COMPLIANCE_KEYWORDS]),
+    re.IGNORECASE,
+)
+NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+@dataclass
+class Window:
+    page: int  # 1-based
+    start: int
+    end: int
+    text: str
+    hits: int
+
+
+def _snap(page: str, start: int, end: int) -> tuple[int, int]:
+    """Widen a span to whole lines."""
+    start = page.rfind("\n", 0, start) + 1
+    newline = page.find("\n", end)
+    return start, len(page) if newline == -1 else newline
+
+
+def _page_windows(page: str, page_no: int, radius: int) -> list[Window]:
+    spans: list[tuple[int, int]] = []
+    for m in FIGURE_TERMS.finditer(page):
+        lo, hi = max(0, m.start() - radius), min(len(page), m.end() + radius)
+        if NUMBER.search(page, lo, hi):
+            spans.append((lo, hi))
+    for m in MENTION_TERMS.finditer(page):
+        spans.append((max(0, m.start() - radius), min(len(page), m.end() + radius)))
+
+    windows: list[Window] = []
+    for lo, hi in sorted(_snap(page, lo, hi) for lo, hi in spans):
+        if windows and lo <= windows[-1].end:
+            last = windows[-1]
+            last.end = max(last.end, hi)
+            last.hits += 1
+        else:
+            windows.append(Window(page_no, lo, hi, "", 1))
+    for w in windows:
+        w.text = page[w.start:w.end].strip()
+    return windows
+
+
+def find_windows(text: str, radius: int = 400, max_windows: int = 12) -> list[Window]:
+    """Relevant windows in document order, keeping the ``max_windows`` with most hits."""
+    windows = [
+        w
+        for page_no, page in enumerate(text.split(PAGE_BREAK), start=1)
+        for w in _page_windows(page, page_no, radius)
+    ]
+    if len(windows) > max_windows:
+        keep = sorted(windows, key=lambda w: -w.hits)[:max_windows]
+        windows = sorted(keep, key=lambda w: (w.page, w.start))
+    return windows
@@ -2,6 +2,9 @@
 
 import fitz  # PyMuPDF
 
+# Pages are separated by a form feed so downstream code can recover page numbers.
+PAGE_BREAK = "\f"
+
 
 def extract_text_from_pdf(content: bytes) -> str:
     """Extract raw text from PDF bytes."""
@@ -10,4 +13,4 @@ def extract_text_from_pdf(content: bytes) -> str:
     for page in doc:
         parts.append(page.get_text())
     doc.close()
-    return "\n".join(parts).strip()
+    return PAGE_BREAK.join(parts).strip()
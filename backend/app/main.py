@@ -1,5 +1,9 @@
 """FastAPI application entry point."""
 
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -8,8 +12,24 @@ from app.api.routes.scoring import router as scoring_router
 from app.api.routes.decision import router as decision_router
 from app.api.routes.loans import router as loans_router
 from app.api.routes.chat import router as chat_router
+from app.api.routes.metrics import router as metrics_router
+from app.api.routes.jobs import router as jobs_router
+from app.services.job_service import get_job_runner, shutdown_job_runner
+from app.services.llm_service import get_llm_service, shutdown_llm_service
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Create the shared LLM client and workflow job runner on startup; on shutdown
+    let running workflows finish before closing the client's pool."""
+    get_llm_service()
+    get_job_runner()
+    yield
+    await asyncio.to_thread(shutdown_job_runner)
+    await shutdown_llm_service()
+
 
-app = FastAPI(title="LendSynthetix", version="0.1.0")
+app = FastAPI(title="LendSynthetix", version="0.1.0", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -22,3 +42,5 @@ app.include_router(scoring_router, prefix="/api")
 app.include_router(decision_router, prefix="/api")
 app.include_router(loans_router, prefix="/api")
 app.include_router(chat_router, prefix="/api")
+app.include_router(metrics_router, prefix="/api")
+app.include_router(jobs_router, prefix="/api")
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime
-from sqlalchemy import DateTime, Float, ForeignKey, String, Text, func
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -13,6 +13,7 @@ from app.models.base import Base
 
 class AgentMemo(Base):
     __tablename__ = "agent_memos"
+    __table_args__ = (Index("ix_agent_memos_loan_id_seq", "loan_id", "seq"),)
 
     id: Mapped[uuid.UUID] = mapped_column(
         PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -25,6 +26,8 @@ class AgentMemo(Base):
     agent_type: Mapped[str] = mapped_column(
         String(20), nullable=False
     )  # Sales / Risk / Compliance / Moderator
+    # Per-loan memo number in write order; order memos by this, not created_at.
+    seq: Mapped[int | None] = mapped_column(Integer, nullable=True)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     risk_score: Mapped[float | None] = mapped_column(Float, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
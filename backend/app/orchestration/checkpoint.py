@@ -0,0 +1,76 @@
+"""Workflow checkpoints - agent results already recorded for a loan.
+
+``run_workflow`` commits after every agent result, so an interrupted run leaves its
+finished steps in the database: each AGENT_MEMO audit entry carries the ``memo_id`` of
+its AgentMemo. A resumed run loads them here and calls the LLM only for the rest.
+Placeholder results recorded during an LLM outage (``fallback`` in the audit details)
+are not loaded, so a resume asks the LLM for them again - except initial reviews once
+the loan is in DEBATE: the debate was built on them, and a redone review that vetoes
+could not leave DEBATE.
+"""
+
+import uuid
+from dataclasses import dataclass, field
+
+from sqlalchemy.orm import Session
+
+from app.agents.schemas import AgentResult
+from app.models.agent_memo import AgentMemo
+from app.models.audit_log import AuditLog
+from app.orchestration.states import WorkflowState
+
+
+@dataclass
+class Checkpoint:
+    # (agent, debate round or None for the initial review) -> result
+    results: dict[tuple[str, int | None], AgentResult] = field(default_factory=dict)
+    # debate round -> whether the moderator found consensus
+    consensus: dict[int, bool] = field(default_factory=dict)
+    # a combined panel call already failed validation; go straight to per-agent calls
+    panel_failed: bool = False
+
+    def result(self, agent: str, debate_round: int | None = None) -> AgentResult | None:
+        return self.results.get((agent, debate_round))
+
+    def started(self, debate_round: int) -> bool:
+        """Whether any result of this debate round is recorded."""
+        return any(r == debate_round for _, r in self.results)
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    @classmethod
+    def load(
+        cls, db: Session, loan_id: uuid.UUID, state: WorkflowState = WorkflowState.INITIAL_REVIEW
+    ) -> "Checkpoint":
+        """Results recorded by earlier runs of the loan's workflow (batch re-evaluations
+        are not part of a run and are ignored) for a loan resuming in ``state``."""
+        entries = (
+            db.query(AuditLog)
+            .filter(
+                AuditLog.loan_id == loan_id,
+                AuditLog.event_type.in_(("AGENT_MEMO", "PANEL_REVIEW")),
+            )
+            .order_by(AuditLog.seq)
+        )
+        memos = {
+            str(m.id): m for m in db.query(AgentMemo).filter(AgentMemo.loan_id == loan_id)
+        }
+        checkpoint = cls()
+        for entry in entries:
+            details = entry.details or {}
+            if entry.event_type == "PANEL_REVIEW":
+                checkpoint.panel_failed = not details.get("valid")
+                continue
+            memo = memos.get(details.get("memo_id"))
+            if memo is None or "batch_id" in details:
+                continue
+            debate_round = details.get("round")
+            if details.get("fallback") and (debate_round is not None or state != WorkflowState.DEBATE):
+                continue
+            checkpoint.results[(details["agent"], debate_round)] = AgentResult(
+                memo=memo.content, score=details["score"], flags=details.get("flags") or []
+            )
+            if details["agent"] == "Moderator" and debate_round is not None:
+                checkpoint.consensus[debate_round] = bool(details.get("consensus"))
+        return checkpoint
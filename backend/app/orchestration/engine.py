@@ -0,0 +1,154 @@
+"""Stage-graph engine - runs a workflow declared as stages with inputs and outputs.
+
+A stage runs once every value it reads is available. Stages that are ready at the
+same time run concurrently on one event loop, so side effects in a stage (recording
+to the DB session) never overlap with another stage's. A stage whose ``when``
+condition is false is skipped and its outputs are set to None.
+
+Each stage may belong to a WorkflowState. Entering a later state goes through
+``VALID_TRANSITIONS`` and waits for the running stages of the current state to finish;
+stages of the current or an earlier state (replayed on resume) run without a transition.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from app.orchestration.states import WorkflowState, can_transition
+
+logger = logging.getLogger(__name__)
+
+STATE_ORDER = list(WorkflowState)
+
+# Called when the graph moves the workflow to a new state: (from, to, stage, values).
+TransitionHook = Callable[[WorkflowState, WorkflowState, "Stage", dict[str, Any]], None]
+
+
+class InvalidTransition(RuntimeError):
+    """A stage would move the workflow along an edge not in VALID_TRANSITIONS."""
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    run: Callable[..., Awaitable[dict[str, Any]]]  # called with its inputs as keywords
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+    state: WorkflowState | None = None
+    when: Callable[..., bool] | None = None  # called with its inputs; False skips
+    timeout: float | None = None  # seconds per attempt
+    retries: int = 0  # extra attempts after an exception or timeout
+
+
+class StageGraph:
+    """A validated set of stages; ``run`` schedules them until none are left."""
+
+    def __init__(self, stages: list[Stage], provided: tuple[str, ...] = ()) -> None:
+        self.stages = {s.name: s for s in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("duplicate stage names")
+        producers: dict[str, str] = {}
+        for stage in stages:
+            for key in stage.outputs:
+                if key in producers or key in provided:
+                    raise ValueError(f"{key!r} produced twice ({stage.name})")
+                producers[key] = stage.name
+        available = set(provided)
+        remaining = list(stages)
+        while remaining:  # every input must be reachable, without cycles
+            ready = [s for s in remaining if all(k in available for k in s.inputs)]
+            if not ready:
+                names = ", ".join(s.name for s in remaining)
+                raise ValueError(f"unsatisfiable or cyclic inputs: {names}")
+            for stage in ready:
+                available.update(stage.outputs)
+                remaining.remove(stage)
+        self.provided = provided
+
+    async def run(
+        self,
+        values: dict[str, Any],
+        state: WorkflowState,
+        on_transition: TransitionHook | None = None,
+    ) -> tuple[dict[str, Any], WorkflowState]:
+        """Run every stage from ``values`` (which must hold ``provided``) starting in
+        ``state``. Returns all values and the final state. After a stage fails, the
+        stages already running finish and the first failure is raised."""
+        values = dict(values)
+        pending = dict(self.stages)
+        running: dict[asyncio.Task, Stage] = {}
+
+        def start_ready() -> None:
+            nonlocal state
+            progress = True
+            while progress:  # a skip can make further stages ready
+                progress = False
+                for stage in list(pending.values()):
+                    if not all(k in values for k in stage.inputs):
+                        continue
+                    inputs = {k: values[k] for k in stage.inputs}
+                    if stage.when is not None and not stage.when(**inputs):
+                        del pending[stage.name]
+                        values.update(dict.fromkeys(stage.outputs))
+                        progress = True
+                        continue
+                    if self._enters_later_state(stage, state):
+                        if running:
+                            continue  # let the current state's stages finish first
+                        if not can_transition(state, stage.state):
+                            raise InvalidTransition(
+                                f"{stage.name}: {state.value} -> {stage.state.value}"
+                            )
+                        if on_transition:
+                            on_transition(state, stage.state, stage, values)
+                        state = stage.state
+                    del pending[stage.name]
+                    running[asyncio.create_task(self._attempt(stage, inputs))] = stage
+
+        error: BaseException | None = None
+        try:
+            start_ready()
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    del running[task]
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                    else:
+                        values.update(task.result())
+                if error is None:
+                    start_ready()
+                # After a failure, stages already running finish (and record their
+                # results) so a resumed run does not repeat them; nothing new starts.
+        finally:
+            for task in running:
+                task.cancel()
+        if error is not None:
+            raise error
+        if pending:
+            raise InvalidTransition(f"stuck in {state.value}: {', '.join(pending)}")
+        return values, state
+
+    @staticmethod
+    def _enters_later_state(stage: Stage, state: WorkflowState) -> bool:
+        return stage.state is not None and STATE_ORDER.index(stage.state) > STATE_ORDER.index(state)
+
+    @staticmethod
+    async def _attempt(stage: Stage, inputs: dict[str, Any]) -> dict[str, Any]:
+        for attempt in range(stage.retries + 1):
+            try:
+                result = await asyncio.wait_for(stage.run(**inputs), stage.timeout)
+            except Exception as e:
+                if attempt == stage.retries:
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise TimeoutError(f"stage {stage.name} timed out after {stage.timeout}s") from e
+                    raise
+                logger.warning("Stage %s failed (attempt %d), retrying: %s", stage.name, attempt + 1, e)
+                continue
+            missing = set(stage.outputs) - result.keys()
+            if missing:
+                raise ValueError(f"stage {stage.name} did not produce {sorted(missing)}")
+            return {k: result[k] for k in stage.outputs}
+        raise AssertionError("unreachable")
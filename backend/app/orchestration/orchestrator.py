@@ -5,293 +5,186 @@ from typing import Any
 
 from sqlalchemy.orm import Session
 
+from app.audit import WriteBuffer
+from app.config import get_settings
 from app.models.loan_application import LoanApplication
 from app.models.agent_memo import AgentMemo
-from app.models.audit_log import AuditLog
+from app.orchestration.checkpoint import Checkpoint
 from app.orchestration.states import WorkflowState
-from app.agents import SalesAgent, RiskAgent, ComplianceAgent, ModeratorAgent
-from app.agents.schemas import AgentResult
-from app.services.llm_service import LLMService
+from app.agents import SalesAgent, RiskAgent, ComplianceAgent, ModeratorAgent, PanelAgent
+from app.agents.schemas import AgentResult, PanelResult
+from app.orchestration.workflow import WorkflowContext, run_graph
+from app.services.llm_service import LLMService, get_llm_service
+from app.services.llm_usage import LLMCall, usage_scope
 
 
 def _audit(
-    db: Session,
+    out: WriteBuffer,
     loan_id: uuid.UUID,
     event_type: str,
     details: dict[str, Any] | None = None,
 ) -> None:
-    """Log step to AuditLog."""
-    entry = AuditLog(loan_id=loan_id, event_type=event_type, details=details)
-    db.add(entry)
-    db.flush()
+    """Log step to AuditLog (and to live subscribers of the loan's events)."""
+    out.audit(loan_id, event_type, details)
 
 
-def _set_state(loan: LoanApplication, state: WorkflowState) -> None:
-    loan.workflow_state = state.value
+def _save_memo(
+    out: WriteBuffer,
+    loan_id: uuid.UUID,
+    agent_type: str,
+    result: AgentResult,
+) -> AgentMemo:
+    """Persist agent memo."""
+    return out.memo(loan_id, agent_type, result.memo, result.score)
 
 
-def _save_memo(
-    db: Session,
+def record_result(
+    out: WriteBuffer,
     loan_id: uuid.UUID,
     agent_type: str,
     result: AgentResult,
+    state: WorkflowState,
+    debate_round: int | None = None,
+    **extra: Any,
 ) -> None:
-    """Persist agent memo."""
-    memo = AgentMemo(
-        loan_id=loan_id,
-        agent_type=agent_type,
-        content=result.memo,
-        risk_score=result.score,
+    """Persist an agent memo and its AGENT_MEMO audit entry (with LLM usage, the
+    prompt budget report when sections had to be dropped, and ``fallback`` when the
+    result is a placeholder for a failed LLM call). Both are buffered in
+    ``out`` until its next flush or commit."""
+    memo = _save_memo(out, loan_id, agent_type, result)
+    details: dict[str, Any] = {"agent": agent_type, "memo_id": str(memo.id)}
+    if debate_round is not None:
+        details["round"] = debate_round
+    details.update(
+        score=result.score,
+        flags=result.flags,
+        **extra,
+        state=state.value,
+        usage=result.usage,
     )
-    db.add(memo)
-    db.flush()
+    if result.prompt and (result.prompt["dropped"] or result.prompt["truncated"]):
+        details["prompt"] = result.prompt
+    if result.fallback:
+        details["fallback"] = True  # placeholder from an LLM outage; a resume redoes it
+    _audit(out, loan_id, "AGENT_MEMO", details)
 
 
-def _confidence_from_variance(sales_score: float, risk_score: float) -> float:
-    """Compute confidence (0-1) from Sales vs Risk score variance.
+class LLMAgents:
+    """Agent results from the LLM agents (the workflow's ``AgentSource``)."""
 
-    Confidence reflects consensus strength between Sales and Risk agents.
-    Higher variance (disagreement) produces lower confidence.
+    def __init__(self, llm: LLMService) -> None:
+        self._agents = {
+            "Sales": SalesAgent(llm), "Risk": RiskAgent(llm), "Compliance": ComplianceAgent(llm),
+        }
+        self._panel = PanelAgent(llm)
+        self._moderator = ModeratorAgent(llm)
 
-    Mapping:
-        variance  0-10  → 90-100% confidence
-        variance 10-20  → 70-90%  confidence
-        variance 20-40  → 50-70%  confidence
-        variance  >40   → <50%    confidence (floor at 10%)
-    """
-    variance = abs(sales_score - risk_score)
+    async def panel(self, financials: dict[str, Any]) -> PanelResult:
+        return await self._panel.aevaluate(financials)
+
+    async def review(self, agent_type: str, financials: dict[str, Any]) -> AgentResult:
+        return await self._agents[agent_type].aevaluate(financials)
 
-    if variance <= 10:
-        # Linear interpolation: 0 → 1.0, 10 → 0.9
-        confidence = 1.0 - 0.01 * variance
-    elif variance <= 20:
-        # Linear interpolation: 10 → 0.9, 20 → 0.7
-        confidence = 0.9 - 0.02 * (variance - 10)
-    elif variance <= 40:
-        # Linear interpolation: 20 → 0.7, 40 → 0.5
-        confidence = 0.7 - 0.01 * (variance - 20)
-    else:
-        # Linear decay below 50%, floor at 10%
-        confidence = max(0.1, 0.5 - 0.005 * (variance - 40))
+    async def rebut(
+        self, agent_type: str, financials: dict[str, Any], transcript: list[dict[str, Any]]
+    ) -> AgentResult:
+        return await self._agents[agent_type].aevaluate(financials, prior_memos=transcript)
 
-    return round(confidence, 2)
+    async def moderate(
+        self, financials: dict[str, Any], transcript: list[dict[str, Any]]
+    ) -> tuple[AgentResult | None, bool]:
+        return await self._moderator.aevaluate_consensus(financials, transcript)
+
+
+class DbRecorder:
+    """Buffers a run's audit trail and memos; ``checkpoint`` commits them."""
+
+    def __init__(self, out: WriteBuffer, loan_id: uuid.UUID) -> None:
+        self.out = out
+        self.loan_id = loan_id
+
+    def audit(self, event_type: str, details: dict[str, Any] | None = None) -> None:
+        _audit(self.out, self.loan_id, event_type, details)
+
+    def record(
+        self,
+        agent_type: str,
+        result: AgentResult,
+        state: WorkflowState,
+        debate_round: int | None = None,
+        **extra: Any,
+    ) -> None:
+        record_result(self.out, self.loan_id, agent_type, result, state, debate_round, **extra)
+
+    def checkpoint(self) -> None:
+        self.out.commit()
 
 
 def run_workflow(loan: LoanApplication, db: Session) -> LoanApplication:
     """
     Run state machine from current state to FINALIZED.
     Flow:
-    1. All 3 agents generate initial memos (INITIAL_REVIEW).
-    2. If compliance agent flags issues -> auto reject.
-    3. If |Sales - Risk| > 20 -> multi-round DEBATE with Moderator.
+    1. All 3 agents generate initial memos concurrently (INITIAL_REVIEW); they are
+       recorded in Sales, Risk, Compliance order whichever finishes first.
+    2. If compliance agent flags issues -> auto reject. In "staged" initial_review_mode
+       the keyword flag and Compliance agent run first and Sales/Risk are skipped on a veto.
+    3. If |Sales - Risk| > 20 -> multi-round DEBATE with Moderator. Agents rebut in
+       turn, or concurrently against the previous round in "simultaneous" debate_mode.
+       Each call reads every agent's latest memo plus a bounded summary of earlier
+       rounds (``app.orchestration.transcript``). With debate convergence enabled,
+       a round whose Sales/Risk spread is small (and, optionally, whose scores
+       stopped moving) ends the debate without a moderator call; the skipped calls
+       are audited.
     4. final_score:
        - no moderator: 0.4*sales - 0.4*risk
        - with moderator: 0.3*sales - 0.3*risk + 0.2*(mod-50)
     5. >20 = Approved, else = Rejected
     6. confidence_score from sales-risk variance.
+    7. LLM usage for the whole run is rolled up into the final audit event.
+
+    Every agent result and state transition is committed as it happens. Running a loan
+    left in INITIAL_REVIEW or DEBATE replays the recorded results (see
+    ``app.orchestration.checkpoint``) and calls the LLM only for the missing steps.
+    The steps are stages of ``app.orchestration.workflow``; independent ones run
+    concurrently, and each agent stage has a timeout and retries (settings
+    ``workflow_stage_timeout_seconds`` / ``workflow_stage_retries``).
     """
-    llm = LLMService()
-    sales_agent = SalesAgent(llm)
-    risk_agent = RiskAgent(llm)
-    compliance_agent = ComplianceAgent(llm)
-    moderator_agent = ModeratorAgent(llm)
-
-    financials: dict[str, Any] = (loan.extracted_financials or {})
-    if isinstance(financials, dict):
-        financials = {k: v for k, v in financials.items() if v is not None}
-    else:
-        financials = {}
-
-    # Start from INGESTED or current state
-    state = WorkflowState(loan.workflow_state)
-    _audit(db, loan.id, "WORKFLOW_START", {"state": state.value})
-
-    # --- INITIAL_REVIEW: run 3 agents ---
-    if state in (WorkflowState.INGESTED, WorkflowState.INITIAL_REVIEW):
-        _set_state(loan, WorkflowState.INITIAL_REVIEW)
-        _audit(db, loan.id, "STATE_TRANSITION", {"from": state.value, "to": "INITIAL_REVIEW"})
-        state = WorkflowState.INITIAL_REVIEW
+    with usage_scope() as calls:
+        return _run_workflow(loan, db, calls)
 
-        sales_result = sales_agent.evaluate(financials)
-        _save_memo(db, loan.id, "Sales", sales_result)
-        _audit(db, loan.id, "AGENT_MEMO", {"agent": "Sales", "score": sales_result.score, "flags": sales_result.flags})
 
-        risk_result = risk_agent.evaluate(financials)
-        _save_memo(db, loan.id, "Risk", risk_result)
-        _audit(db, loan.id, "AGENT_MEMO", {"agent": "Risk", "score": risk_result.score, "flags": risk_result.flags})
-
-        compliance_result = compliance_agent.evaluate(financials)
-        _save_memo(db, loan.id, "Compliance", compliance_result)
-        _audit(db, loan.id, "AGENT_MEMO", {
-            "agent": "Compliance",
-            "score": compliance_result.score,
-            "flags": compliance_result.flags,
-        })
-
-        # 2. Compliance veto — use AGENT output, not just keyword flag
-        compliance_veto = (
-            loan.compliance_flag
-            or compliance_result.score < 30
-            or any(
-                kw in f.lower()
-                for f in compliance_result.flags
-                for kw in ("aml", "grey list", "offshore", "sanction", "blocked")
-            )
-        )
-
-        if compliance_veto:
-            _set_state(loan, WorkflowState.FINALIZED)
-            loan.status = "Rejected"
-            loan.final_score = 0.0
-            loan.confidence_score = 1.0
-            loan.compliance_flag = True  # ensure persisted
-            _audit(db, loan.id, "AUTO_REJECT", {
-                "reason": "compliance_veto",
-                "keyword_flag": loan.compliance_flag,
-                "agent_score": compliance_result.score,
-                "agent_flags": compliance_result.flags,
-            })
-            _audit(db, loan.id, "STATE_TRANSITION", {"to": "FINALIZED"})
-            db.commit()
-            return loan
-
-        # -----------------------------------------------------------------
-        # 3. DEBATE phase — multi-round argumentation (up to 2 rounds)
-        # -----------------------------------------------------------------
-        # Collect every memo across rounds for the full debate transcript.
-        all_memos: list[dict[str, Any]] = [
-            {"round": 0, "agent": "Sales", "score": sales_result.score,
-             "memo": sales_result.memo, "flags": sales_result.flags},
-            {"round": 0, "agent": "Risk", "score": risk_result.score,
-             "memo": risk_result.memo, "flags": risk_result.flags},
-            {"round": 0, "agent": "Compliance", "score": compliance_result.score,
-             "memo": compliance_result.memo, "flags": compliance_result.flags},
-        ]
-
-        MAX_DEBATE_ROUNDS = 2
-        moderator_result = None
-
-        if abs(sales_result.score - risk_result.score) > 20:
-            _set_state(loan, WorkflowState.DEBATE)
-            _audit(db, loan.id, "STATE_TRANSITION", {
-                "to": "DEBATE",
-                "reason": "sales_risk_diff",
-                "diff": abs(sales_result.score - risk_result.score),
-            })
-            state = WorkflowState.DEBATE
-
-            for debate_round in range(1, MAX_DEBATE_ROUNDS + 1):
-                _audit(db, loan.id, "DEBATE_ROUND_START", {"round": debate_round})
-
-                # Each agent sees ALL prior memos and rebuts
-                sales_result = sales_agent.evaluate(financials, prior_memos=all_memos)
-                _save_memo(db, loan.id, "Sales", sales_result)
-                _audit(db, loan.id, "AGENT_MEMO", {
-                    "agent": "Sales", "round": debate_round,
-                    "score": sales_result.score, "flags": sales_result.flags,
-                })
-                all_memos.append({
-                    "round": debate_round, "agent": "Sales",
-                    "score": sales_result.score, "memo": sales_result.memo,
-                    "flags": sales_result.flags,
-                })
-
-                risk_result = risk_agent.evaluate(financials, prior_memos=all_memos)
-                _save_memo(db, loan.id, "Risk", risk_result)
-                _audit(db, loan.id, "AGENT_MEMO", {
-                    "agent": "Risk", "round": debate_round,
-                    "score": risk_result.score, "flags": risk_result.flags,
-                })
-                all_memos.append({
-                    "round": debate_round, "agent": "Risk",
-                    "score": risk_result.score, "memo": risk_result.memo,
-                    "flags": risk_result.flags,
-                })
-
-                compliance_result = compliance_agent.evaluate(financials, prior_memos=all_memos)
-                _save_memo(db, loan.id, "Compliance", compliance_result)
-                _audit(db, loan.id, "AGENT_MEMO", {
-                    "agent": "Compliance", "round": debate_round,
-                    "score": compliance_result.score, "flags": compliance_result.flags,
-                })
-                all_memos.append({
-                    "round": debate_round, "agent": "Compliance",
-                    "score": compliance_result.score, "memo": compliance_result.memo,
-                    "flags": compliance_result.flags,
-                })
-
-                # Moderator evaluates consensus
-                moderator_result, consensus_reached = \
-                    moderator_agent.evaluate_consensus(financials, all_memos)
-                _save_memo(db, loan.id, "Moderator", moderator_result)
-                _audit(db, loan.id, "AGENT_MEMO", {
-                    "agent": "Moderator", "round": debate_round,
-                    "score": moderator_result.score,
-                    "flags": moderator_result.flags,
-                    "consensus": consensus_reached,
-                })
-                all_memos.append({
-                    "round": debate_round, "agent": "Moderator",
-                    "score": moderator_result.score, "memo": moderator_result.memo,
-                    "flags": moderator_result.flags,
-                })
-
-                _audit(db, loan.id, "DEBATE_ROUND_END", {
-                    "round": debate_round,
-                    "consensus": consensus_reached,
-                    "score_spread": abs(sales_result.score - risk_result.score),
-                })
-
-                if consensus_reached:
-                    _audit(db, loan.id, "CONSENSUS_REACHED", {"round": debate_round})
-                    break
-
-        # --- CONSENSUS ---
-        _set_state(loan, WorkflowState.CONSENSUS)
-        _audit(db, loan.id, "STATE_TRANSITION", {"to": "CONSENSUS"})
-
-        # 4. Final score calculation
-        #    Without moderator: 0.4*sales - 0.4*risk
-        #    With moderator:    0.3*sales - 0.3*risk + 0.2*(moderator - 50)
-        #    Moderator score is centred at 50 so a neutral moderator adds 0.
-        if moderator_result is not None:
-            final_score = (
-                0.3 * sales_result.score
-                - 0.3 * risk_result.score
-                + 0.2 * (moderator_result.score - 50)
-            )
-            formula = "0.3*sales - 0.3*risk + 0.2*(mod-50)"
-        else:
-            final_score = 0.4 * sales_result.score - 0.4 * risk_result.score
-            formula = "0.4*sales - 0.4*risk"
-
-        loan.final_score = round(final_score, 2)
-        _audit(db, loan.id, "FINAL_SCORE_CALC", {
-            "formula": formula,
-            "sales": sales_result.score,
-            "risk": risk_result.score,
-            "moderator": moderator_result.score if moderator_result else None,
-            "final_score": loan.final_score,
-        })
-
-        # 5. Decision: >20 = Approved, else = Rejected
-        loan.status = "Approved" if loan.final_score > 20 else "Rejected"
-        _audit(db, loan.id, "DECISION", {"threshold": 20, "status": loan.status})
-
-        # 6. confidence_score from sales-risk variance (consensus strength)
-        variance = abs(sales_result.score - risk_result.score)
-        loan.confidence_score = _confidence_from_variance(sales_result.score, risk_result.score)
-        _audit(db, loan.id, "CONFIDENCE_CALC", {
-            "sales_score": sales_result.score,
-            "risk_score": risk_result.score,
-            "variance": variance,
-            "confidence": loan.confidence_score,
-        })
-
-        # --- FINALIZED ---
-        _set_state(loan, WorkflowState.FINALIZED)
-        _audit(db, loan.id, "STATE_TRANSITION", {"to": "FINALIZED"})
-        _audit(db, loan.id, "WORKFLOW_COMPLETE", {"status": loan.status, "final_score": loan.final_score})
+def _run_workflow(
+    loan: LoanApplication,
+    db: Session,
+    calls: list[LLMCall],
+) -> LoanApplication:
+    settings = get_settings()
+    out = WriteBuffer(db)  # audit and memo rows go out in batches, at each commit
+    loan_id = loan.id  # read once: checkpoint commits expire the loan's attributes
 
-    db.commit()
+    # Start from INGESTED or current state, replaying an interrupted run's results
+    state = WorkflowState(loan.workflow_state)
+    resuming = state in (WorkflowState.INITIAL_REVIEW, WorkflowState.DEBATE)
+    done = Checkpoint.load(db, loan_id, state) if resuming else Checkpoint()
+    _audit(out, loan_id, "WORKFLOW_START", {
+        "state": state.value, **({"replayed": len(done)} if resuming else {}),
+    })
+    if state in (WorkflowState.CONSENSUS, WorkflowState.FINALIZED):
+        out.commit()
+        return loan
+
+    run_graph(WorkflowContext(
+        loan=loan,
+        agents=LLMAgents(get_llm_service()),
+        recorder=DbRecorder(out, loan_id),
+        done=done,
+        calls=calls,
+        initial_review_mode=settings.initial_review_mode,
+        debate_mode=settings.debate_mode,
+        stage_timeout=settings.workflow_stage_timeout_seconds,
+        stage_retries=settings.workflow_stage_retries,
+        summary_budget=settings.llm_debate_summary_token_budget,
+        converge_spread=settings.debate_converge_spread,
+        converge_epsilon=settings.debate_converge_epsilon,
+    ))
     return loan
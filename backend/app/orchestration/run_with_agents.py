@@ -4,35 +4,39 @@ Run workflow with explicit agent results (for deterministic testing).
 
 from typing import Any
 
+from app.config import get_settings
 from app.models.loan_application import LoanApplication
-from app.orchestration.states import WorkflowState
-from app.agents.schemas import AgentResult
+from app.orchestration.workflow import WorkflowContext, run_graph
+from app.agents.schemas import AgentResult, PanelResult
 
 
-def _confidence_from_variance(sales_score: float, risk_score: float) -> float:
-    """Compute confidence (0-1) from Sales vs Risk score variance.
+class FixedAgents:
+    """Pre-computed agent results (the workflow's ``AgentSource``). Initial results
+    stand through any debate; the moderator, if given, reaches consensus at once."""
 
-    Confidence reflects consensus strength between Sales and Risk agents.
-    Higher variance (disagreement) produces lower confidence.
+    def __init__(
+        self,
+        results: dict[str, AgentResult],
+        moderator_result: AgentResult | None = None,
+    ) -> None:
+        self._results = results
+        self._moderator = moderator_result
 
-    Mapping:
-        variance  0-10  → 90-100% confidence
-        variance 10-20  → 70-90%  confidence
-        variance 20-40  → 50-70%  confidence
-        variance  >40   → <50%    confidence (floor at 10%)
-    """
-    variance = abs(sales_score - risk_score)
+    async def panel(self, financials: dict[str, Any]) -> PanelResult:
+        return PanelResult(results={k.lower(): r for k, r in self._results.items()})
+
+    async def review(self, agent_type: str, financials: dict[str, Any]) -> AgentResult:
+        return self._results[agent_type]
 
-    if variance <= 10:
-        confidence = 1.0 - 0.01 * variance
-    elif variance <= 20:
-        confidence = 0.9 - 0.02 * (variance - 10)
-    elif variance <= 40:
-        confidence = 0.7 - 0.01 * (variance - 20)
-    else:
-        confidence = max(0.1, 0.5 - 0.005 * (variance - 40))
+    async def rebut(
+        self, agent_type: str, financials: dict[str, Any], transcript: list[dict[str, Any]]
+    ) -> AgentResult:
+        return self._results[agent_type]
 
-    return round(confidence, 2)
+    async def moderate(
+        self, financials: dict[str, Any], transcript: list[dict[str, Any]]
+    ) -> tuple[AgentResult | None, bool]:
+        return self._moderator, True
 
 
 def run_workflow_with_results(
@@ -61,51 +65,22 @@ def run_workflow_with_results(
         "auto_rejected": False,
     }
 
-    # Compliance veto: keyword flag OR agent score < 30 OR agent flagged keywords
-    compliance_veto = (
-        loan.compliance_flag
-        or compliance_result.score < 30
-        or any(
-            kw in f.lower()
-            for f in compliance_result.flags
-            for kw in ("aml", "grey list", "offshore", "sanction", "blocked")
-        )
+    agents = FixedAgents(
+        {"Sales": sales_result, "Risk": risk_result, "Compliance": compliance_result},
+        moderator_result,
     )
-
-    if compliance_veto:
-        loan.status = "Rejected"
-        loan.final_score = 0.0
-        loan.confidence_score = 1.0
-        loan.compliance_flag = True
-        loan.workflow_state = WorkflowState.FINALIZED.value
-        output["final_score"] = 0.0
-        output["final_decision"] = "Rejected"
-        output["confidence_score"] = 1.0
-        output["auto_rejected"] = True
-        return loan, output
-
-    diff = abs(sales_result.score - risk_result.score)
-    output["moderator_triggered"] = diff > 20
-
-    if moderator_result and diff > 20:
-        output["moderator_score"] = moderator_result.score
-
-    # Final score: blend moderator when triggered
-    if moderator_result and diff > 20:
-        final_score = (
-            0.3 * sales_result.score
-            - 0.3 * risk_result.score
-            + 0.2 * (moderator_result.score - 50)
-        )
-    else:
-        final_score = 0.4 * sales_result.score - 0.4 * risk_result.score
-    loan.final_score = round(final_score, 2)
-    loan.status = "Approved" if loan.final_score > 20 else "Rejected"
-
-    loan.confidence_score = _confidence_from_variance(sales_result.score, risk_result.score)
-
-    loan.workflow_state = WorkflowState.FINALIZED.value
-
+    settings = get_settings()
+    values = run_graph(WorkflowContext(
+        loan=loan,
+        agents=agents,
+        converge_spread=settings.debate_converge_spread,
+        converge_epsilon=settings.debate_converge_epsilon,
+    ))
+
+    output["auto_rejected"] = values["veto"]
+    output["moderator_triggered"] = values["debate.1"] is not None
+    if values["decision"] and values["decision"]["moderator"]:
+        output["moderator_score"] = values["decision"]["moderator"].score
     output["final_score"] = loan.final_score
     output["final_decision"] = loan.status
     output["confidence_score"] = loan.confidence_score
@@ -0,0 +1,52 @@
+"""Debate transcript compaction - what agents and the moderator read each round.
+
+The full transcript grows by four memos a round. Prompts instead get each agent's
+latest memo in full plus one summary entry for everything older: every agent's score
+history, then a short gist of each superseded memo, newest round first, cut to a
+token budget. The summary is built once at the start of a round and shared by all of
+its calls, so prompt size stays flat however many rounds run.
+"""
+
+from typing import Any
+
+from app.services.prompt_budget import count_tokens, truncate_tokens
+
+GIST_TOKENS = 48  # per superseded memo in the summary
+
+
+def _is_latest(memos: list[dict[str, Any]]) -> list[bool]:
+    latest = {m["agent"]: i for i, m in enumerate(memos)}
+    return [latest[m["agent"]] == i for i, m in enumerate(memos)]
+
+
+def latest_per_agent(memos: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Each agent's most recent memo, in transcript order."""
+    return [m for m, latest in zip(memos, _is_latest(memos)) if latest]
+
+
+def summarize_rounds(memos: list[dict[str, Any]], budget: int) -> dict[str, Any] | None:
+    """One transcript entry summarizing the memos superseded by a later memo of the
+    same agent; None if there are none. At most ``budget`` tokens."""
+    older = [m for m, latest in zip(memos, _is_latest(memos)) if not latest]
+    if not older:
+        return None
+
+    history: dict[str, list[str]] = {}
+    for m in memos:
+        history.setdefault(m["agent"], []).append(f"{m['score']:g}")
+    lines = ["Score history: " + "; ".join(
+        f"{agent} {' -> '.join(scores)}" for agent, scores in history.items()
+    )]
+    for m in reversed(older):
+        gist = truncate_tokens(" ".join(m["memo"].split()), GIST_TOKENS)
+        flags = f" [flags: {', '.join(m['flags'])}]" if m.get("flags") else ""
+        lines.append(f"Round {m.get('round', '?')} - {m['agent']} ({m['score']:g}): {gist}{flags}")
+    text = "\n".join(lines)
+    if count_tokens(text) > budget:
+        text = truncate_tokens(text, budget)
+    return {"agent": "Summary", "summary": True, "memos": len(older), "memo": text}
+
+
+def compact(summary: dict[str, Any] | None, memos: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """The transcript a call sees: the round's summary, then each agent's latest memo."""
+    return ([summary] if summary else []) + latest_per_agent(memos)
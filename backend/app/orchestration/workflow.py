@@ -0,0 +1,551 @@
+"""Loan workflow - the war-room stages as a graph, shared by both entry points.
+
+``run_workflow`` (LLM agents, audit trail, checkpoints) and ``run_workflow_with_results``
+(given agent results, no DB) run the same graph and differ only in the ``AgentSource``
+that produces results and the ``Recorder`` that keeps them:
+
+    ingestion -> reviews (Sales, Risk, Compliance; or one panel call) -> compliance gate
+      -> auto reject                                                   (veto)
+      -> debate round 1 -> moderator 1 -> debate round 2 -> moderator 2 (Sales/Risk split)
+      -> scoring -> finalize
+
+Independent stages (the three reviews, or Sales and Risk after a staged Compliance
+check) run concurrently; see ``app.orchestration.engine``.
+"""
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+from app.agents.schemas import AgentResult, PanelResult
+from app.models.loan_application import LoanApplication
+from app.orchestration.checkpoint import Checkpoint
+from app.orchestration.engine import Stage, StageGraph
+from app.orchestration.states import WorkflowState
+from app.orchestration.transcript import compact, summarize_rounds
+from app.services.llm_usage import LLMCall, summarize
+
+AGENT_TYPES = ("Sales", "Risk", "Compliance")
+MAX_DEBATE_ROUNDS = 2
+DEBATE_SPREAD = 20  # |Sales - Risk| above this starts a debate
+APPROVAL_THRESHOLD = 20
+VETO_FLAGS = ("aml", "grey list", "offshore", "sanction", "blocked")
+
+
+class AgentSource(Protocol):
+    """Produces agent results; the graph decides when each is needed."""
+
+    async def panel(self, financials: dict[str, Any]) -> PanelResult: ...
+
+    async def review(self, agent_type: str, financials: dict[str, Any]) -> AgentResult: ...
+
+    async def rebut(
+        self, agent_type: str, financials: dict[str, Any], transcript: list[dict[str, Any]]
+    ) -> AgentResult: ...
+
+    async def moderate(
+        self, financials: dict[str, Any], transcript: list[dict[str, Any]]
+    ) -> tuple[AgentResult | None, bool]: ...
+
+
+class Recorder(Protocol):
+    """Keeps the audit trail and agent memos of a run."""
+
+    def audit(self, event_type: str, details: dict[str, Any] | None = None) -> None: ...
+
+    def record(
+        self,
+        agent_type: str,
+        result: AgentResult,
+        state: WorkflowState,
+        debate_round: int | None = None,
+        **extra: Any,
+    ) -> None: ...
+
+    def checkpoint(self) -> None: ...
+
+
+class NullRecorder:
+    """Keeps nothing; for runs without a database."""
+
+    def audit(self, event_type: str, details: dict[str, Any] | None = None) -> None:
+        pass
+
+    def record(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def checkpoint(self) -> None:
+        pass
+
+
+@dataclass
+class WorkflowContext:
+    loan: LoanApplication
+    agents: AgentSource
+    recorder: Recorder = field(default_factory=NullRecorder)
+    done: Checkpoint = field(default_factory=Checkpoint)
+    calls: list[LLMCall] = field(default_factory=list)
+    initial_review_mode: str = "per_agent"
+    debate_mode: str = "sequential"
+    stage_timeout: float | None = None  # per attempt, for stages that call agents
+    stage_retries: int = 0
+    summary_budget: int = 400  # tokens for the summary of earlier debate rounds
+    # numeric debate convergence (see _converged); off unless converge_spread is set
+    converge_spread: float | None = None
+    converge_epsilon: float | None = None
+
+    # finished initial reviews waiting for the reviews before them to be recorded
+    held: dict[str, AgentResult] = field(default_factory=dict)
+    # debate rounds whose start this run audited; a retried stage must not repeat it
+    rounds_started: set[int] = field(default_factory=set)
+
+    def keep(
+        self,
+        agent_type: str,
+        result: AgentResult,
+        state: WorkflowState,
+        debate_round: int | None = None,
+        **extra: Any,
+    ) -> None:
+        """Record a new result and remember it, so a retried stage replays it."""
+        self.recorder.record(agent_type, result, state, debate_round, **extra)
+        self.done.results[(agent_type, debate_round)] = result
+
+    def keep_review(self, agent_type: str, result: AgentResult, order: tuple[str, ...]) -> None:
+        """Record an initial review once the reviews before it in ``order`` are recorded,
+        then checkpoint, so concurrent reviews are recorded in a fixed order."""
+        self.held[agent_type] = result
+        kept = False
+        for agent in order:
+            if self.done.result(agent) is not None:
+                continue
+            if agent not in self.held:
+                break
+            self.keep(agent, self.held.pop(agent), WorkflowState.INITIAL_REVIEW)
+            kept = True
+        if kept:
+            self.recorder.checkpoint()
+
+    def release_held(self) -> None:
+        """Record the reviews still held behind one that failed, so a resumed run does
+        not repeat them."""
+        for agent in AGENT_TYPES:
+            if agent in self.held:
+                self.keep(agent, self.held.pop(agent), WorkflowState.INITIAL_REVIEW)
+        self.recorder.checkpoint()
+
+
+def _confidence_from_variance(sales_score: float, risk_score: float) -> float:
+    """Compute confidence (0-1) from Sales vs Risk score variance.
+
+    Confidence reflects consensus strength between Sales and Risk agents.
+    Higher variance (disagreement) produces lower confidence.
+
+    Mapping:
+        variance  0-10  → 90-100% confidence
+        variance 10-20  → 70-90%  confidence
+        variance 20-40  → 50-70%  confidence
+        variance  >40   → <50%    confidence (floor at 10%)
+    """
+    variance = abs(sales_score - risk_score)
+
+    if variance <= 10:
+        # Linear interpolation: 0 → 1.0, 10 → 0.9
+        confidence = 1.0 - 0.01 * variance
+    elif variance <= 20:
+        # Linear interpolation: 10 → 0.9, 20 → 0.7
+        confidence = 0.9 - 0.02 * (variance - 10)
+    elif variance <= 40:
+        # Linear interpolation: 20 → 0.7, 40 → 0.5
+        confidence = 0.7 - 0.01 * (variance - 20)
+    else:
+        # Linear decay below 50%, floor at 10%
+        confidence = max(0.1, 0.5 - 0.005 * (variance - 40))
+
+    return round(confidence, 2)
+
+
+def _compliance_veto(keyword_flag: bool, compliance_result: AgentResult | None) -> bool:
+    """Keyword flag from ingestion, or a Compliance agent score/flags that block the loan."""
+    if keyword_flag:
+        return True
+    if compliance_result is None:
+        return False
+    return compliance_result.score < 30 or any(
+        kw in f.lower() for f in compliance_result.flags for kw in VETO_FLAGS
+    )
+
+
+def _converged(
+    before: dict[str, AgentResult],
+    after: dict[str, AgentResult],
+    spread_limit: float | None,
+    epsilon: float | None,
+) -> dict[str, Any] | None:
+    """Whether a debate round settled without the moderator: the Sales/Risk spread is
+    at or under ``spread_limit`` and, if ``epsilon`` is set, no agent's score moved
+    more than ``epsilon`` since the previous round. Scores that stopped moving while
+    still far apart are a deadlock for the moderator, not a consensus. None if the
+    round did not settle (always, without a ``spread_limit``), else the audit details."""
+    if spread_limit is None:
+        return None
+    spread = abs(after["Sales"].score - after["Risk"].score)
+    movement = max(abs(after[a].score - before[a].score) for a in AGENT_TYPES)
+    if spread > spread_limit or (epsilon is not None and movement > epsilon):
+        return None
+    return {"reason": "spread" if epsilon is None else "stable", "spread": spread, "movement": movement}
+
+
+def _transcript_entry(debate_round: int, agent_type: str, result: AgentResult) -> dict[str, Any]:
+    """One memo in the debate transcript that agents and the moderator read."""
+    return {
+        "round": debate_round, "agent": agent_type,
+        "score": result.score, "memo": result.memo, "flags": result.flags,
+    }
+
+
+def build_graph(ctx: WorkflowContext) -> StageGraph:
+    """The workflow's stages for the context's review and debate modes."""
+    loan, rec, done = ctx.loan, ctx.recorder, ctx.done
+    review_state, debate_state = WorkflowState.INITIAL_REVIEW, WorkflowState.DEBATE
+    agent_stage = {"timeout": ctx.stage_timeout, "retries": ctx.stage_retries}
+    staged = ctx.initial_review_mode == "staged"
+    combined = ctx.initial_review_mode == "combined"
+    stages: list[Stage] = []
+
+    async def ingestion() -> dict[str, Any]:
+        financials = loan.extracted_financials or {}
+        if isinstance(financials, dict):
+            financials = {k: v for k, v in financials.items() if v is not None}
+        else:
+            financials = {}
+        return {"financials": financials, "keyword_flag": bool(loan.compliance_flag)}
+
+    stages.append(Stage("ingestion", ingestion, outputs=("financials", "keyword_flag")))
+
+    # --- INITIAL_REVIEW ---
+    if combined:
+        async def panel(financials: dict[str, Any]) -> dict[str, Any]:
+            result = await ctx.agents.panel(financials)
+            rec.audit("PANEL_REVIEW", {
+                "agent": "Panel",
+                "valid": result.results is not None,
+                "state": review_state.value,
+                "usage": result.usage,
+            })
+            if result.results:
+                for agent_type in AGENT_TYPES:
+                    ctx.keep(agent_type, result.results[agent_type.lower()], review_state, combined=True)
+            rec.checkpoint()
+            return {"panel": result.results}
+
+        # A resumed run with reviews recorded, or whose panel call already failed
+        # validation, goes straight to the per-agent calls for what is missing.
+        stages.append(Stage(
+            "review.panel", panel, inputs=("financials",), outputs=("panel",),
+            state=review_state, when=lambda financials: not done.panel_failed and not len(done),
+            **agent_stage,
+        ))
+
+    # Reviews finish in any order but are recorded in this one (Compliance runs first
+    # when staged).
+    review_order = ("Compliance", "Sales", "Risk") if staged else AGENT_TYPES
+
+    def review(agent_type: str) -> Callable[..., Any]:
+        async def run(financials: dict[str, Any], **_: Any) -> dict[str, Any]:
+            result = done.result(agent_type)
+            if result is None:
+                result = await ctx.agents.review(agent_type, financials)
+                ctx.keep_review(agent_type, result, review_order)
+            return {agent_type.lower(): result}
+        return run
+
+    for agent_type in AGENT_TYPES:
+        inputs: tuple[str, ...] = ("financials",)
+        when = None
+        if combined:
+            inputs += ("panel",)
+        if staged and agent_type == "Compliance":
+            # Staged mode: cheapest veto first; Sales and Risk only run if it passes.
+            inputs += ("keyword_flag",)
+            when = lambda financials, keyword_flag: not keyword_flag  # noqa: E731
+        elif staged:
+            inputs += ("veto",)
+            when = lambda financials, veto: not veto  # noqa: E731
+        stages.append(Stage(
+            f"review.{agent_type.lower()}", review(agent_type), inputs=inputs,
+            outputs=(agent_type.lower(),), state=review_state, when=when, **agent_stage,
+        ))
+
+    async def compliance_gate(compliance: AgentResult | None, keyword_flag: bool) -> dict[str, Any]:
+        # 2. Compliance veto — use AGENT output, not just keyword flag
+        veto = _compliance_veto(keyword_flag, compliance)
+        if veto and staged:
+            reason = "keyword_flag" if keyword_flag else "compliance_veto"
+            skipped_stages = ["Sales", "Risk"] if compliance else ["Compliance", "Sales", "Risk"]
+            for skipped in skipped_stages:
+                rec.audit("STAGE_SKIPPED", {
+                    "stage": skipped, "reason": reason, "state": review_state.value,
+                })
+        return {"veto": veto}
+
+    stages.append(Stage(
+        "compliance_gate", compliance_gate, inputs=("compliance", "keyword_flag"),
+        outputs=("veto",), state=review_state,
+    ))
+
+    async def auto_reject(veto: bool, compliance: AgentResult | None, keyword_flag: bool) -> dict[str, Any]:
+        loan.status = "Rejected"
+        loan.final_score = 0.0
+        loan.confidence_score = 1.0
+        loan.compliance_flag = True  # ensure persisted
+        rec.audit("AUTO_REJECT", {
+            "reason": "compliance_veto",
+            "keyword_flag": keyword_flag,
+            "agent_score": compliance.score if compliance else None,
+            "agent_flags": compliance.flags if compliance else [],
+            "usage": summarize(ctx.calls),
+        })
+        return {"rejection": {"status": loan.status, "final_score": loan.final_score}}
+
+    stages.append(Stage(
+        "auto_reject", auto_reject, inputs=("veto", "compliance", "keyword_flag"),
+        outputs=("rejection",), state=review_state, when=lambda veto, **_: veto,
+    ))
+
+    # --- DEBATE: multi-round argumentation, a moderator after each round ---
+    def debate(debate_round: int) -> Callable[..., Any]:
+        async def run(financials: dict[str, Any], **prev: Any) -> dict[str, Any]:
+            if debate_round == 1:
+                before = {a: prev[a.lower()] for a in AGENT_TYPES}
+                transcript = [_transcript_entry(0, a, before[a]) for a in AGENT_TYPES]
+            else:
+                moderated = prev[f"moderator.{debate_round - 1}"]
+                before, transcript = moderated["results"], list(moderated["transcript"])
+            # Memos superseded before this round are summarized once for all its calls.
+            summary = summarize_rounds(transcript, ctx.summary_budget)
+            if debate_round not in ctx.rounds_started and not done.started(debate_round):
+                rec.audit("DEBATE_ROUND_START", {
+                    "round": debate_round, "summarized": summary["memos"] if summary else 0,
+                })
+            ctx.rounds_started.add(debate_round)
+
+            results: dict[str, AgentResult] = {}
+            if ctx.debate_mode == "simultaneous":
+                # All three rebut the previous rounds' transcript concurrently.
+                snapshot = compact(summary, transcript)
+                missing = [a for a in AGENT_TYPES if done.result(a, debate_round) is None]
+                fresh = await asyncio.gather(
+                    *(ctx.agents.rebut(a, financials, snapshot) for a in missing),
+                    return_exceptions=True,
+                )
+                errors = [r for r in fresh if isinstance(r, BaseException)]
+                for agent_type, result in zip(missing, fresh):
+                    if not isinstance(result, BaseException):
+                        ctx.keep(agent_type, result, debate_state, debate_round)
+                rec.checkpoint()  # keep the rebuttals that succeeded
+                if errors:
+                    raise errors[0]
+                for agent_type in AGENT_TYPES:
+                    results[agent_type] = done.result(agent_type, debate_round)
+                    transcript.append(_transcript_entry(debate_round, agent_type, results[agent_type]))
+            else:
+                # Each agent sees the latest memos, including this round's, and rebuts
+                for agent_type in AGENT_TYPES:
+                    result = done.result(agent_type, debate_round)
+                    if result is None:
+                        result = await ctx.agents.rebut(
+                            agent_type, financials, compact(summary, transcript)
+                        )
+                        ctx.keep(agent_type, result, debate_state, debate_round)
+                        rec.checkpoint()
+                    results[agent_type] = result
+                    transcript.append(_transcript_entry(debate_round, agent_type, result))
+            return {f"debate.{debate_round}": {
+                "results": results, "before": before, "transcript": transcript, "summary": summary,
+            }}
+        return run
+
+    async def moderator(debate_round: int, financials: dict[str, Any], rebuttals: dict[str, Any]) -> dict[str, Any]:
+        results, transcript = rebuttals["results"], list(rebuttals["transcript"])
+        result = done.result("Moderator", debate_round)
+        converged = None if result is not None else _converged(
+            rebuttals["before"], results, ctx.converge_spread, ctx.converge_epsilon
+        )
+        if converged is not None:
+            # Settled on the numbers alone: no moderator call, and no further rounds.
+            consensus = True
+            rec.audit("DEBATE_ROUND_END", {
+                "round": debate_round, "consensus": True, "converged": converged["reason"],
+                "score_spread": converged["spread"],
+            })
+            rec.audit("CONSENSUS_REACHED", {"round": debate_round, "method": "numeric", **converged})
+            rec.audit("STAGE_SKIPPED", {
+                "stage": "Moderator", "round": debate_round, "reason": "converged",
+                "state": debate_state.value, "calls": 1,
+            })
+            for later in range(debate_round + 1, MAX_DEBATE_ROUNDS + 1):
+                rec.audit("STAGE_SKIPPED", {
+                    "stage": "Debate", "round": later, "reason": "converged",
+                    "state": debate_state.value, "calls": len(AGENT_TYPES) + 1,
+                })
+        elif result is not None:
+            consensus = done.consensus[debate_round]
+        else:
+            result, consensus = await ctx.agents.moderate(
+                financials, compact(rebuttals["summary"], transcript)
+            )
+            if result is not None:
+                ctx.keep("Moderator", result, debate_state, debate_round, consensus=consensus)
+            rec.audit("DEBATE_ROUND_END", {
+                "round": debate_round,
+                "consensus": consensus,
+                "score_spread": abs(results["Sales"].score - results["Risk"].score),
+            })
+            if consensus:
+                rec.audit("CONSENSUS_REACHED", {"round": debate_round, "method": "moderator"})
+            rec.checkpoint()
+        if result is not None:
+            transcript.append(_transcript_entry(debate_round, "Moderator", result))
+        return {f"moderator.{debate_round}": {
+            "result": result, "consensus": consensus, "results": results, "transcript": transcript,
+        }}
+
+    def moderator_stage(debate_round: int) -> Callable[..., Any]:
+        async def run(financials: dict[str, Any], **prev: Any) -> dict[str, Any]:
+            return await moderator(debate_round, financials, prev[f"debate.{debate_round}"])
+        return run
+
+    for debate_round in range(1, MAX_DEBATE_ROUNDS + 1):
+        if debate_round == 1:
+            inputs = ("financials", "veto", "sales", "risk", "compliance")
+            when = lambda financials, veto, sales, risk, compliance: (  # noqa: E731
+                not veto and abs(sales.score - risk.score) > DEBATE_SPREAD
+            )
+        else:
+            prev = f"moderator.{debate_round - 1}"
+            inputs = ("financials", prev)
+            when = _no_consensus(prev)
+        stages.append(Stage(
+            f"debate.{debate_round}", debate(debate_round), inputs=inputs,
+            outputs=(f"debate.{debate_round}",), state=debate_state, when=when, **agent_stage,
+        ))
+        stages.append(Stage(
+            f"moderator.{debate_round}", moderator_stage(debate_round),
+            inputs=("financials", f"debate.{debate_round}"),
+            outputs=(f"moderator.{debate_round}",), state=debate_state,
+            when=_present(f"debate.{debate_round}"), **agent_stage,
+        ))
+
+    # --- CONSENSUS: score, decide, confidence ---
+    rounds = tuple(f"moderator.{r}" for r in range(1, MAX_DEBATE_ROUNDS + 1))
+
+    async def scoring(sales: AgentResult, risk: AgentResult, **moderated: Any) -> dict[str, Any]:
+        held = [moderated[k] for k in rounds if moderated[k] is not None]
+        if held:  # the latest rebuttals stand in for the initial reviews
+            sales, risk = held[-1]["results"]["Sales"], held[-1]["results"]["Risk"]
+        # the latest moderator that was called (a numerically converged round has none)
+        moderator_result = next((m["result"] for m in reversed(held) if m["result"]), None)
+
+        # 4. Final score calculation
+        #    Without moderator: 0.4*sales - 0.4*risk
+        #    With moderator:    0.3*sales - 0.3*risk + 0.2*(moderator - 50)
+        #    Moderator score is centred at 50 so a neutral moderator adds 0.
+        if moderator_result is not None:
+            final_score = 0.3 * sales.score - 0.3 * risk.score + 0.2 * (moderator_result.score - 50)
+            formula = "0.3*sales - 0.3*risk + 0.2*(mod-50)"
+        else:
+            final_score = 0.4 * sales.score - 0.4 * risk.score
+            formula = "0.4*sales - 0.4*risk"
+
+        loan.final_score = round(final_score, 2)
+        rec.audit("FINAL_SCORE_CALC", {
+            "formula": formula,
+            "sales": sales.score,
+            "risk": risk.score,
+            "moderator": moderator_result.score if moderator_result else None,
+            "final_score": loan.final_score,
+        })
+
+        # 5. Decision: >20 = Approved, else = Rejected
+        loan.status = "Approved" if loan.final_score > APPROVAL_THRESHOLD else "Rejected"
+        rec.audit("DECISION", {"threshold": APPROVAL_THRESHOLD, "status": loan.status})
+
+        # 6. confidence_score from sales-risk variance (consensus strength)
+        loan.confidence_score = _confidence_from_variance(sales.score, risk.score)
+        rec.audit("CONFIDENCE_CALC", {
+            "sales_score": sales.score,
+            "risk_score": risk.score,
+            "variance": abs(sales.score - risk.score),
+            "confidence": loan.confidence_score,
+        })
+        return {"decision": {
+            "status": loan.status,
+            "final_score": loan.final_score,
+            "moderator": moderator_result,
+        }}
+
+    stages.append(Stage(
+        "scoring", scoring, inputs=("veto", "sales", "risk", *rounds), outputs=("decision",),
+        state=WorkflowState.CONSENSUS, when=lambda veto, **_: not veto,
+    ))
+
+    # --- FINALIZED ---
+    async def finalize(decision: dict[str, Any] | None, rejection: dict[str, Any] | None) -> dict[str, Any]:
+        outcome = decision or rejection
+        rec.audit("WORKFLOW_COMPLETE", {
+            "status": outcome["status"],
+            "final_score": outcome["final_score"],
+            "usage": summarize(ctx.calls),
+        })
+        rec.checkpoint()
+        return {"outcome": outcome}
+
+    stages.append(Stage(
+        "finalize", finalize, inputs=("decision", "rejection"), outputs=("outcome",),
+        state=WorkflowState.FINALIZED,
+    ))
+    return StageGraph(stages)
+
+
+def _present(key: str) -> Callable[..., bool]:
+    """``when`` condition: the stage producing ``key`` ran."""
+    return lambda **values: values[key] is not None
+
+
+def _no_consensus(moderated: str) -> Callable[..., bool]:
+    """``when`` condition: the previous round was moderated without consensus."""
+    return lambda **values: values[moderated] is not None and not values[moderated]["consensus"]
+
+
+def on_transition(ctx: WorkflowContext) -> Callable[..., None]:
+    """Engine hook: move the loan to the new state and audit it."""
+    def transition(
+        from_state: WorkflowState, to_state: WorkflowState, stage: Stage, values: dict[str, Any]
+    ) -> None:
+        ctx.loan.workflow_state = to_state.value
+        details: dict[str, Any] = {"from": from_state.value, "to": to_state.value}
+        if to_state == WorkflowState.DEBATE:
+            details.update(
+                reason="sales_risk_diff",
+                diff=abs(values["sales"].score - values["risk"].score),
+                mode=ctx.debate_mode,
+            )
+        ctx.recorder.audit("STATE_TRANSITION", details)
+        if to_state in (WorkflowState.INITIAL_REVIEW, WorkflowState.DEBATE):
+            ctx.recorder.checkpoint()  # resumable; later states commit when finalized
+    return transition
+
+
+def run_graph(ctx: WorkflowContext) -> dict[str, Any]:
+    """Run the workflow graph from the loan's current state to FINALIZED."""
+    graph = build_graph(ctx)
+    state = WorkflowState(ctx.loan.workflow_state or WorkflowState.INGESTED)
+    try:
+        values, _ = asyncio.run(graph.run({}, state, on_transition(ctx)))
+    except BaseException:
+        if ctx.held:
+            ctx.release_held()
+        raise
+    return values
@@ -6,7 +6,7 @@ from app.models.ingested_document import IngestedDocument
 from app.ingestion.pdf_parser import extract_text_from_pdf
 from app.extraction.extractor import extract
 from app.extraction.schemas import ExtractionResult
-from app.services.llm_service import LLMService
+from app.services.llm_service import get_llm_service
 
 
 def ingest_pdf(
@@ -16,7 +16,7 @@ def ingest_pdf(
 ) -> ExtractionResult:
     """Parse PDF, store raw text, extract financials, return structured result."""
     raw_text = extract_text_from_pdf(content)
-    llm = LLMService()
+    llm = get_llm_service()
     extracted = extract(raw_text, llm=llm)
     doc = IngestedDocument(
         raw_text=raw_text,
@@ -0,0 +1,311 @@
+"""Workflow jobs - runs the war-room workflow for uploaded loans off the request path.
+
+``POST /api/ingest/upload`` ingests the PDF, creates the loan and hands it to the
+process-wide ``JobRunner``, which runs ``run_workflow`` on a small thread pool with a
+session of its own. Jobs are kept in memory for this worker process only; the loan's
+``workflow_state`` in the database remains the durable record of progress.
+
+Jobs wait in one queue per priority class. A free worker takes the next job of the
+most urgent class that is under its concurrency cap, so a bulk backfill capped at a
+few workers cannot starve live uploads. Within a class, jobs are interleaved across
+the sources that submitted them by self-clocked weighted fair queuing: each job gets
+a virtual finish tag of ``max(class clock, source's last tag) + 1 / weight`` and the
+smallest tag goes first. A source's 5,000 queued documents therefore do not delay
+another source's single upload by more than one job per turn. Each workflow's LLM
+calls also run at the matching admission priority (``app.services.llm_admission``).
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Literal
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.audit import write_audit
+from app.config import get_settings
+from app.models.loan_application import LoanApplication
+from app.orchestration import run_workflow
+from app.services.llm_admission import Priority, priority_scope
+
+logger = logging.getLogger(__name__)
+
+JobState = Literal["queued", "running", "succeeded", "failed"]
+JobPriority = Literal["interactive", "standard", "bulk"]
+
+PRIORITIES: tuple[JobPriority, ...] = ("interactive", "standard", "bulk")  # dispatch order
+_LLM_PRIORITY: dict[str, Priority] = {
+    "interactive": Priority.INTERACTIVE, "standard": Priority.WORKFLOW, "bulk": Priority.BULK,
+}
+
+
+@dataclass
+class Job:
+    loan_id: uuid.UUID
+    priority: JobPriority = "standard"
+    source: str = "default"
+    id: uuid.UUID = field(default_factory=uuid.uuid4)
+    state: JobState = "queued"
+    error: str | None = None
+    submitted_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    # Monotonic clock readings for the durations; the datetimes are for display.
+    _submitted: float = field(default_factory=time.monotonic, repr=False)
+    _started: float | None = field(default=None, repr=False)
+    _finished: float | None = field(default=None, repr=False)
+    _tag: float = field(default=0.0, repr=False)  # virtual finish tag in its class queue
+
+    @property
+    def done(self) -> bool:
+        return self.state in ("succeeded", "failed")
+
+    def timings(self) -> dict[str, Any]:
+        now = time.monotonic()
+        started = self._started if self._started is not None else now
+        finished = self._finished if self._finished is not None else now
+        return {
+            "submitted_at": self.submitted_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "queued_seconds": round(started - self._submitted, 3),
+            "run_seconds": round(finished - started, 3) if self._started is not None else None,
+        }
+
+
+class LoanBusy(RuntimeError):
+    """The loan already has a queued or running job; a second run would duplicate its
+    memos and audit entries."""
+
+    def __init__(self, job: Job) -> None:
+        super().__init__(f"loan {job.loan_id} already has {job.state} job {job.id}")
+        self.job = job
+
+
+class _ClassQueue:
+    """Queued jobs of one priority class, weighted-fair across sources. Guarded by the
+    runner's lock."""
+
+    def __init__(self, cap: int, weights: dict[str, float]) -> None:
+        self.cap = cap
+        self.running = 0
+        self._weights = weights
+        self._sources: dict[str, deque[Job]] = {}
+        self._last_tag: dict[str, float] = {}
+        self._clock = 0.0  # tag of the last dispatched job
+        self._dispatched = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def push(self, job: Job) -> None:
+        start = max(self._clock, self._last_tag.get(job.source, 0.0))
+        job._tag = start + 1.0 / self._weights.get(job.source, 1.0)
+        self._last_tag[job.source] = job._tag
+        self._sources.setdefault(job.source, deque()).append(job)
+
+    def pop(self) -> Job | None:
+        """The job with the smallest tag, unless the class is at its cap."""
+        if not self._sources or self.running >= self.cap:
+            return None
+        source = min(self._sources, key=lambda s: self._sources[s][0]._tag)
+        queue = self._sources[source]
+        job = queue.popleft()
+        if not queue:
+            del self._sources[source]
+        self._clock = job._tag
+        # Idle sources whose tags the clock has passed start afresh when they return.
+        self._last_tag = {
+            s: t for s, t in self._last_tag.items() if t > self._clock or s in self._sources
+        }
+        self.running += 1
+        wait = time.monotonic() - job._submitted
+        self._dispatched += 1
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+        return job
+
+    def __len__(self) -> int:
+        return sum(len(q) for q in self._sources.values())
+
+    def stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        oldest = min((q[0]._submitted for q in self._sources.values()), default=None)
+        return {
+            "cap": self.cap,
+            "running": self.running,
+            "queued": len(self),
+            "queued_by_source": {s: len(q) for s, q in self._sources.items()},
+            "dispatched": self._dispatched,
+            "avg_wait_seconds": round(self._wait_total / self._dispatched, 4) if self._dispatched else 0.0,
+            "max_wait_seconds": round(self._wait_max, 4),
+            "oldest_queued_seconds": round(now - oldest, 4) if oldest is not None else None,
+        }
+
+
+class JobRunner:
+    """Schedules loan workflows onto a thread pool and tracks their jobs by id. A loan
+    has at most one queued or running job at a time.
+
+    ``caps`` limits the concurrent workflows per priority class (default: all
+    workers); ``weights`` gives sources a larger share within their class (default 1).
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        history: int,
+        session_factory: sessionmaker,
+        workflow: Callable[[LoanApplication, Session], Any] = run_workflow,
+        caps: dict[str, int] | None = None,
+        weights: dict[str, float] | None = None,
+    ) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="workflow")
+        self._max_workers = max_workers
+        self._history = history
+        self._session_factory = session_factory
+        self._workflow = workflow
+        self._jobs: OrderedDict[uuid.UUID, Job] = OrderedDict()
+        self._active: dict[uuid.UUID, Job] = {}  # loan id -> its queued or running job
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        caps = caps or {}
+        self._queues = {p: _ClassQueue(caps.get(p, max_workers), weights or {}) for p in PRIORITIES}
+        self._running = 0
+        self._closed = False
+
+    def submit(
+        self,
+        loan_id: uuid.UUID,
+        priority: JobPriority = "standard",
+        source: str = "default",
+    ) -> Job:
+        """Queue the loan's workflow. Raises ``LoanBusy`` if the loan already has a job
+        that has not finished."""
+        job = Job(loan_id=loan_id, priority=priority, source=source)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("job runner is shut down")
+            if (active := self._active.get(loan_id)) is not None:
+                raise LoanBusy(active)
+            self._active[loan_id] = job
+            self._jobs[job.id] = job
+            self._evict()
+            self._queues[priority].push(job)
+            self._dispatch()
+        return job
+
+    def get(self, job_id: uuid.UUID) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _evict(self) -> None:
+        """Forget the oldest finished jobs beyond ``history``; pending jobs are kept."""
+        excess = len(self._jobs) - self._history
+        for job_id in [j.id for j in self._jobs.values() if j.done][:max(excess, 0)]:
+            del self._jobs[job_id]
+
+    def _dispatch(self) -> None:
+        """Start queued jobs while workers are free (lock held)."""
+        while self._running < self._max_workers:
+            job = next((j for q in self._queues.values() if (j := q.pop()) is not None), None)
+            if job is None:
+                return
+            self._running += 1
+            self._pool.submit(self._run, job)
+
+    def _finish(self, job: Job) -> None:
+        with self._lock:
+            del self._active[job.loan_id]
+            self._running -= 1
+            self._queues[job.priority].running -= 1
+            if not self._closed:
+                self._dispatch()
+            if not self._running:
+                self._idle.notify_all()
+
+    def _run(self, job: Job) -> None:
+        try:
+            self._execute(job)
+        finally:
+            self._finish(job)
+
+    def _execute(self, job: Job) -> None:
+        job._started = time.monotonic()
+        job.started_at = datetime.now(timezone.utc)
+        job.state = "running"
+        state: JobState
+        db = self._session_factory()
+        try:
+            loan = db.get(LoanApplication, job.loan_id)
+            if loan is None:
+                raise LookupError(f"loan {job.loan_id} not found")
+            with priority_scope(_LLM_PRIORITY[job.priority]):
+                self._workflow(loan, db)
+            state = "succeeded"
+        except Exception as e:
+            db.rollback()
+            logger.exception("Workflow job %s for loan %s failed", job.id, job.loan_id)
+            state, job.error = "failed", str(e)
+            self._record_failure(db, job)
+        finally:
+            db.close()
+        # Timings first: a poller that sees a finished state also sees when it finished.
+        job._finished = time.monotonic()
+        job.finished_at = datetime.now(timezone.utc)
+        job.state = state
+
+    def _record_failure(self, db: Session, job: Job) -> None:
+        """Audit the failure so event-stream subscribers stop waiting for the loan."""
+        try:
+            write_audit(db, job.loan_id, "WORKFLOW_FAILED", {"job_id": str(job.id), "error": job.error})
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Could not audit failed workflow job %s", job.id)
+
+    def stats(self) -> dict[str, Any]:
+        """Workers in use, and queue depth, caps and queue-wait times per class."""
+        with self._lock:
+            return {
+                "workers": self._max_workers,
+                "running": self._running,
+                "classes": {p: q.stats() for p, q in self._queues.items()},
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop taking and dispatching jobs. Queued jobs are dropped (their loans stay
+        resumable); running ones finish, and with ``wait`` this returns once they have."""
+        with self._lock:
+            self._closed = True
+            if wait:
+                self._idle.wait_for(lambda: not self._running)
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+
+@lru_cache
+def get_job_runner() -> JobRunner:
+    """Process-wide workflow job runner."""
+    from app.models.database import SessionLocal  # connects and creates tables on import
+
+    settings = get_settings()
+    return JobRunner(
+        settings.workflow_workers,
+        settings.workflow_job_history,
+        SessionLocal,
+        caps=settings.workflow_class_caps,
+        weights=settings.workflow_source_weights,
+    )
+
+
+def shutdown_job_runner() -> None:
+    """Finish running jobs and stop the pool. Called from the application lifespan."""
+    if get_job_runner.cache_info().currsize:
+        get_job_runner().shutdown(wait=True)
+        get_job_runner.cache_clear()
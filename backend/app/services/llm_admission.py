@@ -0,0 +1,184 @@
+"""LLM admission control - in-flight limit, RPM/TPM budgets and a priority queue."""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any
+
+
+class Priority(IntEnum):
+    """Lower value is admitted first."""
+
+    INTERACTIVE = 0  # analyst chat
+    WORKFLOW = 1  # upload extraction and agent workflows
+    BULK = 2  # backfills and re-evaluation jobs
+
+
+_current_priority: ContextVar[Priority] = ContextVar("llm_priority", default=Priority.WORKFLOW)
+
+
+@contextmanager
+def priority_scope(priority: Priority) -> Iterator[None]:
+    """Run every LLM call made in this context at the given priority."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _current_priority.get()
+
+
+def estimate_tokens(prompt: str, max_tokens: int) -> int:
+    """Worst-case token cost of a call: ~4 chars per prompt token plus the completion cap."""
+    return len(prompt) // 4 + max_tokens
+
+
+class TokenBucket:
+    """Per-minute budget that refills continuously."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.capacity = float(per_minute)
+        self._tokens = float(per_minute)
+        self._rate = per_minute / 60.0
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` is available (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self._tokens >= amount:
+            return 0.0
+        return (amount - self._tokens) / self._rate
+
+    def take(self, amount: float) -> None:
+        self._tokens -= min(amount, self.capacity)
+
+    @property
+    def available(self) -> float:
+        """Current budget, computed without refilling: safe to read from other threads."""
+        tokens, updated = self._tokens, self._updated
+        return min(self.capacity, tokens + (time.monotonic() - updated) * self._rate)
+
+
+class AdmissionController:
+    """Gate for upstream calls. Lives on the LLM service loop, so it needs no locks;
+    ``stats`` only reads, from copies, so the metrics endpoint may call it from any thread.
+
+    Waiters queue by (priority, arrival). The head of the queue is admitted once an
+    in-flight slot is free and both the request and token buckets can cover it;
+    lower-priority waiters never jump ahead of a blocked higher-priority one.
+    """
+
+    def __init__(self, max_in_flight: int, requests_per_minute: int, tokens_per_minute: int) -> None:
+        self._max_in_flight = max_in_flight
+        self._rpm = TokenBucket(requests_per_minute)
+        self._tpm = TokenBucket(tokens_per_minute)
+        self._in_flight = 0
+        self._queue: list[tuple[int, int, int, asyncio.Future[None]]] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._admitted = {p.name.lower(): 0 for p in Priority}
+        self._wait_total = {p.name.lower(): 0.0 for p in Priority}
+        self._wait_max = {p.name.lower(): 0.0 for p in Priority}
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority, tokens: int) -> AsyncIterator[None]:
+        """Hold an in-flight slot for the duration of one upstream call."""
+        await self.acquire(priority, tokens)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: Priority, tokens: int) -> None:
+        started = time.monotonic()
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (int(priority), next(self._seq), tokens, fut))
+        self._pump()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Admitted in the same tick we were cancelled: give the slot back.
+                self.release()
+            raise
+        waited = time.monotonic() - started
+        name = priority.name.lower()
+        self._admitted[name] += 1
+        self._wait_total[name] += waited
+        self._wait_max[name] = max(self._wait_max[name], waited)
+
+    def try_acquire(self, tokens: int) -> bool:
+        """Take a slot only if one is free now and nobody is queued (used for hedges)."""
+        if self._queue or self._in_flight >= self._max_in_flight:
+            return False
+        if self._rpm.wait_time(1) > 0 or self._tpm.wait_time(tokens) > 0:
+            return False
+        self._rpm.take(1)
+        self._tpm.take(tokens)
+        self._in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._pump()
+
+    def _pump(self) -> None:
+        """Admit waiters from the head of the queue while capacity allows."""
+        while self._queue:
+            _, _, tokens, fut = self._queue[0]
+            if fut.cancelled():
+                heapq.heappop(self._queue)
+                continue
+            if self._in_flight >= self._max_in_flight:
+                return  # release() will pump again
+            wait = max(self._rpm.wait_time(1), self._tpm.wait_time(tokens))
+            if wait > 0:
+                self._schedule(wait)
+                return
+            heapq.heappop(self._queue)
+            self._rpm.take(1)
+            self._tpm.take(tokens)
+            self._in_flight += 1
+            fut.set_result(None)
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._pump()
+
+    def stats(self) -> dict[str, Any]:
+        depth = {p.name.lower(): 0 for p in Priority}
+        for prio, _, _, fut in list(self._queue):  # the loop may push while we read
+            if not fut.done():
+                depth[Priority(prio).name.lower()] += 1
+        return {
+            "in_flight": self._in_flight,
+            "max_in_flight": self._max_in_flight,
+            "queue_depth": depth,
+            "admitted": dict(self._admitted),
+            "avg_wait_seconds": {
+                k: round(self._wait_total[k] / n, 4) if (n := self._admitted[k]) else 0.0
+                for k in self._admitted
+            },
+            "max_wait_seconds": {k: round(v, 4) for k, v in self._wait_max.items()},
+            "requests_available": round(self._rpm.available, 1),
+            "tokens_available": round(self._tpm.available, 1),
+        }
@@ -0,0 +1,387 @@
+"""LLM backends - OpenAI, any OpenAI-compatible HTTP server, and an in-process fake.
+
+``LLMService`` only talks to the ``LLMBackend`` protocol, so the same admission,
+cache and resilience layers sit in front of every backend.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from app.config import Settings
+from app.services.llm_resilience import TransientError
+
+
+@dataclass
+class Completion:
+    """One upstream response. Token counts are 0 when the backend does not report them."""
+
+    content: str | None
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class LLMBackend(Protocol):
+    name: str
+
+    async def create(
+        self,
+        *,
+        model: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        response_format: dict[str, str] | None = None,
+    ) -> Completion: ...
+
+    def stream(
+        self,
+        *,
+        model: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        usage: Completion | None = None,  # filled from the usage the server reports at the end
+    ) -> AsyncIterator[str]: ...
+
+    async def aclose(self) -> None: ...
+
+
+def _limits(settings: Settings) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.llm_max_connections,
+        max_keepalive_connections=settings.llm_max_keepalive_connections,
+        keepalive_expiry=settings.llm_keepalive_expiry,
+    )
+
+
+class OpenAIBackend:
+    """OpenAI (or Azure/OpenAI-compatible via ``base_url``) through the official SDK."""
+
+    name = "openai"
+
+    def __init__(self, settings: Settings) -> None:
+        self._client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            base_url=settings.llm_base_url,
+            max_retries=0,  # retries, backoff and deadlines are handled by LLMService
+            http_client=DefaultAsyncHttpxClient(limits=_limits(settings)),
+        )
+
+    async def create(
+        self,
+        *,
+        model: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        response_format: dict[str, str] | None = None,
+    ) -> Completion:
+        extra: dict[str, Any] = {}
+        if response_format:
+            extra["response_format"] = response_format
+        resp = await self._client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **extra,
+        )
+        usage = resp.usage
+        return Completion(
+            content=resp.choices[0].message.content if resp.choices else None,
+            model=resp.model or model,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+        )
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        usage: Completion | None = None,
+    ) -> AsyncIterator[str]:
+        stream = await self._client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for chunk in stream:
+            if chunk.usage and usage is not None:  # final chunk, no choices
+                usage.model = chunk.model or model
+                usage.prompt_tokens = chunk.usage.prompt_tokens
+                usage.completion_tokens = chunk.usage.completion_tokens
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def aclose(self) -> None:
+        await self._client.close()
+
+
+class HTTPBackend:
+    """Plain-httpx client for a local OpenAI-compatible server (e.g. ``llm_stub_server``).
+
+    Avoids the SDK so load tests exercise only our own pooling and retry code.
+    """
+
+    name = "http"
+
+    def __init__(self, settings: Settings) -> None:
+        headers = {}
+        if settings.openai_api_key:
+            headers["Authorization"] = f"Bearer {settings.openai_api_key}"
+        self._client = httpx.AsyncClient(
+            base_url=str(settings.llm_base_url).rstrip("/"),
+            headers=headers,
+            limits=_limits(settings),
+            timeout=httpx.Timeout(None),  # deadlines are enforced by LLMService
+        )
+
+    @staticmethod
+    def _raise_for_status(resp: httpx.Response) -> None:
+        if resp.status_code == 429 or resp.status_code >= 500:
+            raise TransientError(f"upstream returned {resp.status_code}", response=resp)
+        resp.raise_for_status()
+
+    async def create(
+        self,
+        *,
+        model: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        response_format: dict[str, str] | None = None,
+    ) -> Completion:
+        body: dict[str, Any] = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        if response_format:
+            body["response_format"] = response_format
+        resp = await self._client.post("/chat/completions", json=body)
+        self._raise_for_status(resp)
+        data = resp.json()
+        usage = data.get("usage") or {}
+        choices = data.get("choices") or []
+        return Completion(
+            content=choices[0]["message"]["content"] if choices else None,
+            model=data.get("model", model),
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+        )
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        usage: Completion | None = None,
+    ) -> AsyncIterator[str]:
+        body = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+        async with self._client.stream("POST", "/chat/completions", json=body) as resp:
+            self._raise_for_status(resp)
+            async for line in resp.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                payload = line[len("data:"):].strip()
+                if payload == "[DONE]":
+                    return
+                chunk = json.loads(payload)
+                if chunk.get("usage") and usage is not None:
+                    usage.model = chunk.get("model", model)
+                    usage.prompt_tokens = chunk["usage"].get("prompt_tokens", 0)
+                    usage.completion_tokens = chunk["usage"].get("completion_tokens", 0)
+                choices = chunk.get("choices") or []
+                delta = choices[0].get("delta", {}).get("content") if choices else None
+                if delta:
+                    yield delta
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class FakeBackend:
+    """In-process stand-in that returns schema-valid JSON with realistic timing.
+
+    Responses are a deterministic function of (seed, prompt): the same prompt always
+    gets the same content, latency and token counts, so runs are reproducible. Latency
+    is log-normal around ``median_latency_ms``; ``error_rate`` of calls raise a
+    transient 503 after the sampled latency.
+    """
+
+    name = "fake"
+
+    # Score ranges per persona, chosen so that Sales/Risk disagree often enough to
+    # exercise the debate path.
+    _SCORE_RANGES = {
+        "sales": (60, 92),
+        "risk": (25, 75),
+        "compliance": (55, 98),
+        "moderator": (35, 75),
+    }
+
+    def __init__(
+        self,
+        median_latency_ms: float = 800.0,
+        latency_sigma: float = 0.5,
+        error_rate: float = 0.0,
+        completion_tokens: int = 180,
+        seed: int = 0,
+    ) -> None:
+        self._median = median_latency_ms / 1000
+        self._sigma = latency_sigma
+        self._error_rate = error_rate
+        self._completion_tokens = completion_tokens
+        self._seed = seed
+        # Failures are drawn per call, not per prompt, so a retry can succeed.
+        self._failures = random.Random(seed)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "FakeBackend":
+        return cls(
+            median_latency_ms=settings.llm_fake_latency_ms,
+            latency_sigma=settings.llm_fake_latency_sigma,
+            error_rate=settings.llm_fake_error_rate,
+            completion_tokens=settings.llm_fake_completion_tokens,
+            seed=settings.llm_fake_seed,
+        )
+
+    def _rng(self, prompt: str) -> random.Random:
+        digest = hashlib.sha256(f"{self._seed}:{prompt}".encode()).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def _latency(self, rng: random.Random) -> float:
+        return self._median * math.exp(rng.gauss(0, self._sigma)) if self._median > 0 else 0.0
+
+    def _persona(self, prompt: str) -> str:
+        head = prompt[:200].lower()
+        for persona in self._SCORE_RANGES:
+            if f"{persona} agent" in head:
+                return persona
+        return "moderator"
+
+    def _agent_payload(
+        self, prompt: str, rng: random.Random, words: int, persona: str | None = None
+    ) -> dict[str, Any]:
+        persona = persona or self._persona(prompt)
+        lo, hi = self._SCORE_RANGES[persona]
+        payload: dict[str, Any] = {
+            "memo": f"[{persona} assessment] " + " ".join(rng.choice(_WORDS) for _ in range(words)),
+            "score": rng.randint(lo, hi),
+            "flags": [],
+        }
+        if '"consensus"' in prompt:
+            payload["consensus"] = rng.random() < 0.5
+        return payload
+
+    def _extraction_payload(self, prompt: str, rng: random.Random) -> dict[str, Any]:
+        fields = {
+            "revenue": lambda: round(rng.uniform(1, 80), 1) * 1_000_000,
+            "debt": lambda: round(rng.uniform(0.5, 30), 1) * 1_000_000,
+            "dscr": lambda: round(rng.uniform(0.7, 2.2), 2),
+            "collateral_present": lambda: rng.random() < 0.6,
+            "compliance_keywords": lambda: [],
+        }
+        return {name: make() for name, make in fields.items() if f'"{name}"' in prompt}
+
+    def _content(self, prompt: str, rng: random.Random, completion_tokens: int) -> str:
+        words = max(5, int(completion_tokens * 0.75))
+        if '"compliance": {"memo"' in prompt:  # combined initial review (PanelAgent)
+            return json.dumps({
+                persona: self._agent_payload(prompt, rng, words // 3, persona)
+                for persona in ("sales", "risk", "compliance")
+            })
+        if '"memo"' in prompt:
+            return json.dumps(self._agent_payload(prompt, rng, words))
+        if prompt.lstrip().lower().startswith("extract"):
+            return json.dumps(self._extraction_payload(prompt, rng))
+        return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+    async def create(
+        self,
+        *,
+        model: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        response_format: dict[str, str] | None = None,
+    ) -> Completion:
+        rng = self._rng(prompt)
+        await asyncio.sleep(self._latency(rng))
+        if self._failures.random() < self._error_rate:
+            raise TransientError("fake upstream error (503)")
+        completion_tokens = min(
+            max_tokens, max(1, int(rng.gauss(self._completion_tokens, self._completion_tokens / 4)))
+        )
+        return Completion(
+            content=self._content(prompt, rng, completion_tokens),
+            model=model,
+            prompt_tokens=len(prompt) // 4,
+            completion_tokens=completion_tokens,
+        )
+
+    async def stream(
+        self,
+        *,
+        model: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        usage: Completion | None = None,
+    ) -> AsyncIterator[str]:
+        completion = await self.create(
+            model=model, prompt=prompt, max_tokens=max_tokens, temperature=temperature
+        )
+        if usage is not None:
+            usage.model = completion.model
+            usage.prompt_tokens = completion.prompt_tokens
+            usage.completion_tokens = completion.completion_tokens
+        words = (completion.content or "").split(" ")
+        for i, word in enumerate(words):
+            await asyncio.sleep(0.02)
+            yield word if i == 0 else " " + word
+
+    async def aclose(self) -> None:
+        pass
+
+
+_WORDS = (
+    "revenue cash flow coverage leverage collateral covenant growth margin liquidity "
+    "exposure sector outlook repayment capacity debt service ratio stable volatile "
+    "strong weak adequate concentration guarantee compliance review"
+).split()
+
+
+def build_backend(settings: Settings) -> LLMBackend | None:
+    """Backend selected by ``LLM_BACKEND``. None means no LLM (agents use fallbacks)."""
+    if settings.llm_backend == "fake":
+        return FakeBackend.from_settings(settings)
+    if settings.llm_backend == "http":
+        return HTTPBackend(settings) if settings.llm_base_url else None
+    return OpenAIBackend(settings) if settings.openai_api_key else None
@@ -0,0 +1,166 @@
+"""LLM response cache - bounded in-memory LRU in front of a shared SQLite file.
+
+``aget`` / ``aset`` are for the LLM service loop: the memory tier is read and written
+inline, the SQLite tier in a worker thread, so a locked or fsyncing cache file never
+stalls the other calls on the loop.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class LLMCache:
+    """Content-addressed cache for deterministic (temperature=0) completions.
+
+    Keys hash (namespace, model, prompt, max_tokens, response_format), so bumping the
+    namespace invalidates every entry at once. The memory tier is per process; the
+    SQLite tier is a single file that every uvicorn worker opens (WAL mode).
+    """
+
+    def __init__(
+        self,
+        path: str | None,
+        max_entries: int = 1024,
+        ttl_seconds: float = 7 * 24 * 3600,
+        namespace: str = "v1",
+    ) -> None:
+        self.namespace = namespace
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()  # memory tier and stats
+        self._db_lock = threading.Lock()  # SQLite tier; may be held for a slow commit
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._db: sqlite3.Connection | None = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+
+    def key(
+        self,
+        model: str,
+        prompt: str,
+        max_tokens: int,
+        response_format: dict[str, Any] | None = None,
+    ) -> str:
+        """Stable hash of everything that determines a temperature=0 response."""
+        payload = json.dumps(
+            [self.namespace, model, prompt, max_tokens, response_format],
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return f"{self.namespace}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+    def get(self, key: str) -> str | None:
+        """Return cached content, checking memory then disk. None on miss or expiry."""
+        hit = self._get_memory(key)
+        return hit if hit is not None else self._get_disk(key)
+
+    async def aget(self, key: str) -> str | None:
+        """``get`` with the disk lookup in a worker thread."""
+        hit = self._get_memory(key)
+        if hit is not None or self._db is None:
+            return hit if hit is not None else self._get_disk(key)
+        return await asyncio.to_thread(self._get_disk, key)
+
+    def set(self, key: str, value: str) -> None:
+        """Store content in both tiers."""
+        expires_at = self._set_memory(key, value)
+        self._set_disk(key, value, expires_at)
+
+    async def aset(self, key: str, value: str) -> None:
+        """``set`` with the disk write in a worker thread."""
+        expires_at = self._set_memory(key, value)
+        if self._db is not None:
+            await asyncio.to_thread(self._set_disk, key, value, expires_at)
+
+    def _get_memory(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[0] >= now:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return entry[1]
+            if entry:
+                del self._memory[key]
+            return None
+
+    def _get_disk(self, key: str) -> str | None:
+        """Disk lookup after a memory miss; counts the miss if it is not there either."""
+        row = None
+        with self._db_lock:
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM llm_cache WHERE key = ? AND expires_at >= ?",
+                    (key, time.time()),
+                ).fetchone()
+        with self._lock:
+            if row:
+                self._remember(key, row[0], row[1])
+                self._stats["disk_hits"] += 1
+                return row[0]
+            self._stats["misses"] += 1
+            return None
+
+    def _set_memory(self, key: str, value: str) -> float:
+        expires_at = time.time() + self._ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+            self._stats["writes"] += 1
+        return expires_at
+
+    def _set_disk(self, key: str, value: str, expires_at: float) -> None:
+        with self._db_lock:
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, expires_at),
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, value: str, expires_at: float) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters for this process."""
+        with self._lock:
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                **self._stats,
+                "namespace": self.namespace,
+                "memory_entries": len(self._memory),
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
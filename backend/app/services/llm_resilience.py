@@ -0,0 +1,131 @@
+"""LLM call resilience - retry policy, circuit breaker and latency tracking for hedging."""
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any
+
+import httpx
+import openai
+
+
+class TransientError(Exception):
+    """Raised by non-SDK backends for 429/5xx responses."""
+
+    def __init__(self, message: str, response: httpx.Response | None = None) -> None:
+        super().__init__(message)
+        self.response = response
+
+
+# Errors worth another attempt: the request may succeed if simply re-sent.
+TRANSIENT_ERRORS: tuple[type[BaseException], ...] = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+    httpx.TransportError,
+    TransientError,
+    asyncio.TimeoutError,
+)
+
+
+def is_transient(exc: BaseException) -> bool:
+    return isinstance(exc, TRANSIENT_ERRORS)
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Server-suggested delay from a 429/503 ``Retry-After`` header, if any."""
+    response = getattr(exc, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self._base = base_delay
+        self._max = max_delay
+
+    def delay(self, attempt: int, exc: BaseException | None = None) -> float:
+        """Seconds to sleep after the given (1-based) failed attempt."""
+        backoff = random.uniform(0, min(self._max, self._base * 2 ** (attempt - 1)))
+        hint = retry_after(exc) if exc is not None else None
+        return max(backoff, min(hint, self._max)) if hint else backoff
+
+
+class CircuitBreaker:
+    """Opens after consecutive transient failures so callers fail fast to their fallback.
+
+    While open, ``allow()`` rejects calls. After ``reset_timeout`` one probe is let
+    through (half-open); its success closes the breaker, its failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self._threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._half_open = False
+        self._trips = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "half_open" if self._half_open else "open"
+
+    def allow(self) -> bool:
+        if self._opened_at is None:
+            return True
+        now = time.monotonic()
+        if now - self._opened_at >= self._reset_timeout:
+            # Let one probe through; everyone else waits out another window.
+            self._opened_at = now
+            self._half_open = True
+            return True
+        self._rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._half_open = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._half_open or (self._opened_at is None and self._failures >= self._threshold):
+            self._trips += 1
+            self._opened_at = time.monotonic()
+            self._half_open = False
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "trips": self._trips,
+            "rejected": self._rejected,
+        }
+
+
+class LatencyTracker:
+    """Sliding window of successful upstream latencies."""
+
+    def __init__(self, window: int = 200) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
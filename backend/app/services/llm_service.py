@@ -1,72 +1,633 @@
-"""LLM service abstraction - OpenAI integration."""
+"""LLM service abstraction - shared backend, cache, admission and resilience."""
 
+import asyncio
 import json
-from typing import Any
-
-from openai import OpenAI
+import threading
+import time
+from collections.abc import AsyncIterator, Coroutine
+from functools import lru_cache
+from typing import Any, TypeVar
 
 from app.config import get_settings
+from app.services.llm_admission import (
+    AdmissionController,
+    Priority,
+    current_priority,
+    estimate_tokens,
+)
+from app.services.llm_backends import Completion, LLMBackend, build_backend
+from app.services.llm_cache import LLMCache
+from app.services.llm_resilience import (
+    CircuitBreaker,
+    LatencyTracker,
+    RetryPolicy,
+    is_transient,
+)
+from app.services.llm_usage import LLMCall, record
+from app.services.prompt_budget import count_tokens
+
+T = TypeVar("T")
+
+JSON_FORMAT = {"type": "json_object"}
 
 
 class LLMService:
-    """Abstracts OpenAI API for extraction and other LLM use cases."""
+    """Abstracts the LLM backend for extraction and other LLM use cases.
+
+    One instance is shared process-wide (see ``get_llm_service``). It owns a single
+    backend (see ``llm_backends``) with a keep-alive connection pool, driven by a private
+    event loop on a daemon thread. Sync methods block the calling thread on that loop; the
+    ``a``-prefixed methods await it without holding a worker thread.
+    """
 
     def __init__(self) -> None:
         settings = get_settings()
-        self._client: OpenAI | None = (
-            OpenAI(api_key=settings.openai_api_key)
-            if settings.openai_api_key
+        self._settings = settings
+        self._backend: LLMBackend | None = build_backend(settings)
+        self._model = settings.llm_model
+        self._cache: LLMCache | None = (
+            LLMCache(
+                path=settings.llm_cache_path,
+                max_entries=settings.llm_cache_memory_entries,
+                ttl_seconds=settings.llm_cache_ttl_seconds,
+                namespace=settings.llm_cache_namespace,
+            )
+            if settings.llm_cache_enabled and self._backend
             else None
         )
+        self._admission = AdmissionController(
+            max_in_flight=settings.llm_max_in_flight,
+            requests_per_minute=settings.llm_requests_per_minute,
+            tokens_per_minute=settings.llm_tokens_per_minute,
+        )
+        self._timeout = settings.llm_timeout_seconds
+        self._retry = RetryPolicy(
+            max_attempts=settings.llm_max_attempts,
+            base_delay=settings.llm_retry_base_delay,
+            max_delay=settings.llm_retry_max_delay,
+        )
+        self._breaker = CircuitBreaker(
+            failure_threshold=settings.llm_breaker_failure_threshold,
+            reset_timeout=settings.llm_breaker_reset_seconds,
+        )
+        self._hedging = settings.llm_hedging_enabled
+        self._hedge_min_samples = settings.llm_hedge_min_samples
+        self._latency = LatencyTracker()
+        self._counters = {
+            "retries": 0,
+            "errors": 0,
+            "deadline_exceeded": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "coalesced": 0,
+            "coalesced_tokens_saved": 0,
+        }
+        # Single-flight: identical requests in progress, with the priority they run at.
+        self._in_flight: dict[tuple, tuple[asyncio.Future, Priority]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
 
-    def complete(self, prompt: str, max_tokens: int = 1000) -> str | None:
-        """Run completion and return content or None if unavailable."""
-        if not self._client:
-            return None
+    # ------------------------------------------------------------------
+    # Event loop plumbing
+    # ------------------------------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the service loop on first use."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="llm-service", daemon=True
+                )
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def _run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run a coroutine on the service loop, blocking the calling thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    async def _arun(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run a coroutine on the service loop from any other event loop."""
+        loop = self._ensure_loop()
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    async def aclose(self) -> None:
+        """Close pooled connections and stop the service loop."""
+        if self._loop is None:
+            if self._backend:
+                await self._backend.aclose()
+            return
+        if self._backend:
+            await self._arun(self._backend.aclose())
+        loop, thread = self._loop, self._thread
+        loop.call_soon_threadsafe(loop.stop)
+        if thread:
+            thread.join()
+        loop.close()
+        self._loop = self._thread = None
+        if self._cache:
+            self._cache.close()
+
+    @property
+    def available(self) -> bool:
+        """False when no backend is configured (every call returns None)."""
+        return self._backend is not None
+
+    def stats(self) -> dict[str, Any]:
+        """Runtime counters for the metrics endpoint."""
+        return {
+            "available": self.available,
+            "backend": self._backend.name if self._backend else None,
+            "model": self._model,
+            "cache": self._cache.stats() if self._cache else None,
+            "admission": self._admission.stats(),
+            "breaker": self._breaker.stats(),
+            "latency_p95_seconds": round(self._latency.percentile(0.95), 4),
+            **self._counters,
+        }
+
+    # ------------------------------------------------------------------
+    # Completions
+    # ------------------------------------------------------------------
+
+    async def _complete(
+        self,
+        prompt: str,
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        priority: Priority,
+        timeout: float | None,
+        response_format: dict[str, str] | None = None,
+    ) -> tuple[str | None, LLMCall]:
+        """Single-flight wrapper around ``_fetch``.
+
+        Every call runs on the service loop, so identical requests from any thread or
+        event loop meet here. A request identical to one already in flight awaits that
+        result instead of calling upstream, unless the in-flight one was queued at a
+        lower priority. The upstream call is its own task, so a cancelled caller does not
+        fail the others waiting on it.
+        """
+        key = (model, prompt, max_tokens, temperature, json.dumps(response_format, sort_keys=True))
+        flight = self._in_flight.get(key)
+        if flight is not None and flight[1] <= priority:
+            return await self._follow(flight[0], model, timeout)
+
+        task = asyncio.ensure_future(
+            self._fetch(prompt, model, max_tokens, temperature, priority, timeout, response_format)
+        )
+        self._in_flight[key] = (task, priority)
+
+        def _land(_: asyncio.Future) -> None:
+            if self._in_flight.get(key, (None,))[0] is task:
+                del self._in_flight[key]
+
+        task.add_done_callback(_land)
+        return await asyncio.shield(task)
+
+    async def _follow(
+        self,
+        leader: "asyncio.Future[tuple[str | None, LLMCall]]",
+        model: str,
+        timeout: float | None,
+    ) -> tuple[str | None, LLMCall]:
+        """Await an in-flight identical request. Only the leader's usage counts as spent."""
+        started = time.monotonic()
+        self._counters["coalesced"] += 1
         try:
-            resp = self._client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=max_tokens,
-                temperature=0,
-            )
-            if resp.choices:
-                return resp.choices[0].message.content
-        except Exception:
-            pass
+            async with asyncio.timeout(timeout or self._timeout):
+                content, leader_call = await asyncio.shield(leader)
+        except TimeoutError:
+            self._counters["deadline_exceeded"] += 1
+            return None, LLMCall(model=model, coalesced=True)
+        self._counters["coalesced_tokens_saved"] += (
+            leader_call.prompt_tokens + leader_call.completion_tokens
+        )
+        return content, LLMCall(
+            model=leader_call.model,
+            latency_ms=round((time.monotonic() - started) * 1000, 1),
+            cache_hit=leader_call.cache_hit,
+            coalesced=True,
+        )
+
+    async def _fetch(
+        self,
+        prompt: str,
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        priority: Priority,
+        timeout: float | None,
+        response_format: dict[str, str] | None = None,
+    ) -> tuple[str | None, LLMCall]:
+        """Cached, admission-controlled completion with a deadline and retries.
+
+        Only temperature=0 calls are deterministic enough to reuse. Cache hits never
+        touch the admission budgets. Content is None once the deadline passes, retries
+        are exhausted or the circuit breaker is open, so agents take their fallback path.
+        """
+        started = time.monotonic()
+        call = LLMCall(model=model)
+        key = None
+        if self._cache and temperature == 0:
+            key = self._cache.key(model, prompt, max_tokens, response_format)
+            hit = await self._cache.aget(key)
+            if hit is not None:
+                call.cache_hit = True
+                return hit, call
+        if not self._breaker.allow():
+            return None, call
+        completion = None
+        try:
+            async with asyncio.timeout(timeout or self._timeout):
+                completion = await self._call_with_retries(
+                    prompt, model, max_tokens, temperature, priority, response_format, call
+                )
+        except TimeoutError:
+            self._counters["deadline_exceeded"] += 1
+            self._breaker.record_failure()
+        call.latency_ms = round((time.monotonic() - started) * 1000, 1)
+        if completion is None:
+            return None, call
+        call.model = completion.model
+        call.prompt_tokens = completion.prompt_tokens
+        call.completion_tokens = completion.completion_tokens
+        content = completion.content
+        if key and content and _is_complete(content, response_format):
+            await self._cache.aset(key, content)
+        return content, call
+
+    async def _call_with_retries(
+        self,
+        prompt: str,
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        priority: Priority,
+        response_format: dict[str, str] | None,
+        call: LLMCall,
+    ) -> Completion | None:
+        """Retry transient failures with jittered backoff. The slot is released while sleeping."""
+        tokens = estimate_tokens(prompt, max_tokens)
+        for attempt in range(1, self._retry.max_attempts + 1):
+            try:
+                async with self._admission.slot(priority, tokens):
+                    completion = await self._hedged_create(
+                        prompt, model, max_tokens, temperature, tokens, response_format
+                    )
+                self._breaker.record_success()
+                return completion
+            except Exception as exc:
+                if not is_transient(exc):
+                    self._counters["errors"] += 1
+                    return None
+                self._breaker.record_failure()
+                if attempt == self._retry.max_attempts or not self._breaker.allow():
+                    self._counters["errors"] += 1
+                    return None
+                self._counters["retries"] += 1
+                call.retries += 1
+                await asyncio.sleep(self._retry.delay(attempt, exc))
         return None
 
-    def complete_json(self, prompt: str, max_tokens: int = 1000) -> dict[str, Any] | None:
+    async def _hedged_create(
+        self,
+        prompt: str,
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        tokens: int,
+        response_format: dict[str, str] | None,
+    ) -> Completion:
+        """Send a duplicate request if the first is slower than the observed p95.
+
+        The hedge only goes out when admission has idle capacity, so it never adds to
+        an existing queue. Whichever request succeeds first wins; the other is cancelled.
+        """
+        primary = asyncio.ensure_future(
+            self._create(prompt, model, max_tokens, temperature, response_format)
+        )
+        hedge: asyncio.Future[Completion] | None = None
+        try:
+            if self._hedging and len(self._latency) >= self._hedge_min_samples:
+                done, _ = await asyncio.wait({primary}, timeout=self._latency.percentile(0.95))
+                if not done and self._admission.try_acquire(tokens):
+                    self._counters["hedges"] += 1
+                    hedge = asyncio.ensure_future(
+                        self._create(prompt, model, max_tokens, temperature, response_format)
+                    )
+            if hedge is None:
+                return await primary
+            pending: set[asyncio.Future[Completion]] = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._counters["hedge_wins"] += 1
+                        return task.result()
+            raise primary.exception()  # both failed
+        finally:
+            primary.cancel()
+            if hedge is not None:
+                hedge.cancel()
+                self._admission.release()
+
+    async def _create(
+        self,
+        prompt: str,
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        response_format: dict[str, str] | None = None,
+    ) -> Completion:
+        """Single upstream chat completion. Raises on API errors."""
+        assert self._backend is not None
+        started = time.monotonic()
+        completion = await self._backend.create(
+            model=model,
+            prompt=prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            response_format=response_format,
+        )
+        self._latency.record(time.monotonic() - started)
+        return completion
+
+    def _params(
+        self,
+        route: str | None,
+        max_tokens: int | None,
+        timeout: float | None,
+        temperature: float,
+        default_max_tokens: int,
+    ) -> dict[str, Any]:
+        """Model, max_tokens, temperature and timeout for one call.
+
+        A named route (see ``Settings.llm_route``) supplies all four; explicit
+        ``max_tokens``/``timeout`` arguments still win. Without a route the call uses the
+        default model and the method's own temperature.
+        """
+        if route:
+            r = self._settings.llm_route(route)
+            return {
+                "model": r.model or self._model,
+                "max_tokens": max_tokens or r.max_tokens,
+                "temperature": r.temperature,
+                "timeout": timeout or r.timeout,
+            }
+        return {
+            "model": self._model,
+            "max_tokens": max_tokens or default_max_tokens,
+            "temperature": temperature,
+            "timeout": timeout,
+        }
+
+    def complete(
+        self,
+        prompt: str,
+        max_tokens: int | None = None,
+        priority: Priority | None = None,
+        timeout: float | None = None,
+        route: str | None = None,
+    ) -> str | None:
+        """Run completion and return content or None if unavailable."""
+        if not self._backend:
+            return None
+        priority = current_priority() if priority is None else priority
+        params = self._params(route, max_tokens, timeout, temperature=0, default_max_tokens=1000)
+        return _recorded(self._run(self._complete(
+            prompt, priority=priority, **params,
+        )))
+
+    def complete_json(
+        self,
+        prompt: str,
+        max_tokens: int | None = None,
+        priority: Priority | None = None,
+        timeout: float | None = None,
+        route: str | None = None,
+    ) -> dict[str, Any] | None:
         """Run completion with JSON response format. Returns parsed dict or None."""
-        if not self._client:
+        if not self._backend:
             return None
-        try:
-            resp = self._client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=max_tokens,
-                temperature=0,
-                response_format={"type": "json_object"},
-            )
-            if resp.choices and resp.choices[0].message.content:
-                return json.loads(resp.choices[0].message.content)
-        except Exception:
-            pass
-        return None
+        priority = current_priority() if priority is None else priority
+        params = self._params(route, max_tokens, timeout, temperature=0, default_max_tokens=1000)
+        return _parse_json(_recorded(self._run(self._complete(
+            prompt, priority=priority, **params, response_format=JSON_FORMAT,
+        ))))
 
-    def complete_text(self, prompt: str, max_tokens: int = 600) -> str | None:
+    def complete_text(
+        self,
+        prompt: str,
+        max_tokens: int | None = None,
+        priority: Priority | None = None,
+        timeout: float | None = None,
+        route: str | None = None,
+    ) -> str | None:
         """Run completion and return plain text content. Used for chat responses."""
-        if not self._client:
+        if not self._backend:
+            return None
+        priority = current_priority() if priority is None else priority
+        params = self._params(route, max_tokens, timeout, temperature=0.3, default_max_tokens=600)
+        return _strip(_recorded(self._run(self._complete(
+            prompt, priority=priority, **params,
+        ))))
+
+    async def acomplete(
+        self,
+        prompt: str,
+        max_tokens: int | None = None,
+        priority: Priority | None = None,
+        timeout: float | None = None,
+        route: str | None = None,
+    ) -> str | None:
+        """Async counterpart of ``complete``."""
+        if not self._backend:
+            return None
+        priority = current_priority() if priority is None else priority
+        params = self._params(route, max_tokens, timeout, temperature=0, default_max_tokens=1000)
+        return _recorded(await self._arun(self._complete(
+            prompt, priority=priority, **params,
+        )))
+
+    async def acomplete_json(
+        self,
+        prompt: str,
+        max_tokens: int | None = None,
+        priority: Priority | None = None,
+        timeout: float | None = None,
+        route: str | None = None,
+    ) -> dict[str, Any] | None:
+        """Async counterpart of ``complete_json``."""
+        if not self._backend:
+            return None
+        priority = current_priority() if priority is None else priority
+        params = self._params(route, max_tokens, timeout, temperature=0, default_max_tokens=1000)
+        return _parse_json(_recorded(await self._arun(self._complete(
+            prompt, priority=priority, **params, response_format=JSON_FORMAT,
+        ))))
+
+    async def acomplete_text(
+        self,
+        prompt: str,
+        max_tokens: int | None = None,
+        priority: Priority | None = None,
+        timeout: float | None = None,
+        route: str | None = None,
+    ) -> str | None:
+        """Async counterpart of ``complete_text``."""
+        if not self._backend:
             return None
+        priority = current_priority() if priority is None else priority
+        params = self._params(route, max_tokens, timeout, temperature=0.3, default_max_tokens=600)
+        return _strip(_recorded(await self._arun(self._complete(
+            prompt, priority=priority, **params,
+        ))))
+
+    async def astream_text(
+        self,
+        prompt: str,
+        max_tokens: int | None = None,
+        priority: Priority | None = None,
+        timeout: float | None = None,
+        route: str | None = None,
+    ) -> AsyncIterator[str]:
+        """Stream a plain-text completion as content deltas. Yields nothing if unavailable.
+
+        The upstream stream runs on the service loop; deltas are handed to the caller's
+        loop through a queue, so this can be consumed from any event loop. The call's
+        usage is recorded into the caller's usage scopes when the stream ends.
+        """
+        if not self._backend:
+            return
+        priority = current_priority() if priority is None else priority
+        params = self._params(route, max_tokens, timeout, temperature=0.3, default_max_tokens=600)
+        caller = asyncio.get_running_loop()
+        queue: asyncio.Queue[str | None] = asyncio.Queue()
+        call = LLMCall(model=params["model"])
+
+        async def produce() -> None:
+            try:
+                async for delta in self._stream(prompt, call=call, priority=priority, **params):
+                    caller.call_soon_threadsafe(queue.put_nowait, delta)
+            finally:
+                caller.call_soon_threadsafe(queue.put_nowait, None)
+
+        future = asyncio.run_coroutine_threadsafe(produce(), self._ensure_loop())
         try:
-            resp = self._client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=max_tokens,
-                temperature=0.3,
-            )
-            if resp.choices and resp.choices[0].message.content:
-                return resp.choices[0].message.content.strip()
-        except Exception:
-            pass
+            while (delta := await queue.get()) is not None:
+                yield delta
+        finally:
+            future.cancel()
+            record(call)
+
+    async def _stream(
+        self,
+        prompt: str,
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        priority: Priority,
+        timeout: float | None,
+        call: LLMCall,
+    ) -> AsyncIterator[str]:
+        """Upstream token stream on the service loop.
+
+        Transient failures are retried only until the first delta has been sent; after
+        that a failure just ends the stream. The admission slot is held while streaming.
+        ``call`` gets the usage the server reports, or counted tokens if it reports none.
+        """
+        if not self._breaker.allow():
+            return
+        started = time.monotonic()
+        tokens = estimate_tokens(prompt, max_tokens)
+        usage = Completion(content=None, model=model)
+        parts: list[str] = []
+        emitted = False
+        try:
+            async with asyncio.timeout(timeout or self._timeout):
+                for attempt in range(1, self._retry.max_attempts + 1):
+                    try:
+                        async with self._admission.slot(priority, tokens):
+                            async for delta in self._backend.stream(
+                                model=model,
+                                prompt=prompt,
+                                max_tokens=max_tokens,
+                                temperature=temperature,
+                                usage=usage,
+                            ):
+                                emitted = True
+                                parts.append(delta)
+                                yield delta
+                        self._breaker.record_success()
+                        return
+                    except Exception as exc:
+                        if not is_transient(exc):
+                            self._counters["errors"] += 1
+                            return
+                        self._breaker.record_failure()
+                        if emitted or attempt == self._retry.max_attempts or not self._breaker.allow():
+                            self._counters["errors"] += 1
+                            return
+                        self._counters["retries"] += 1
+                        call.retries += 1
+                        await asyncio.sleep(self._retry.delay(attempt, exc))
+        except TimeoutError:
+            self._counters["deadline_exceeded"] += 1
+            self._breaker.record_failure()
+        finally:
+            call.model = usage.model
+            call.latency_ms = round((time.monotonic() - started) * 1000, 1)
+            if usage.prompt_tokens or usage.completion_tokens:
+                call.prompt_tokens, call.completion_tokens = usage.prompt_tokens, usage.completion_tokens
+            elif parts:
+                call.prompt_tokens = count_tokens(prompt)
+                call.completion_tokens = count_tokens("".join(parts))
+
+
+def _recorded(result: tuple[str | None, LLMCall]) -> str | None:
+    """Record the call into the caller's usage scopes (runs in the caller's context)."""
+    content, call = result
+    record(call)
+    return content
+
+
+def _parse_json(content: str | None) -> dict[str, Any] | None:
+    if not content:
+        return None
+    try:
+        return json.loads(content)
+    except ValueError:
         return None
+
+
+def _strip(content: str | None) -> str | None:
+    return content.strip() if content else None
+
+
+def _is_complete(content: str, response_format: dict[str, str] | None) -> bool:
+    """Never cache a JSON-mode response that does not parse (e.g. truncated)."""
+    if response_format and response_format.get("type") == "json_object":
+        try:
+            json.loads(content)
+        except ValueError:
+            return False
+    return True
+
+
+@lru_cache
+def get_llm_service() -> LLMService:
+    """Process-wide LLM service (one client, one connection pool)."""
+    return LLMService()
+
+
+async def shutdown_llm_service() -> None:
+    """Release the shared client. Called from the application lifespan."""
+    if get_llm_service.cache_info().currsize:
+        await get_llm_service().aclose()
+        get_llm_service.cache_clear()
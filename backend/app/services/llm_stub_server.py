@@ -0,0 +1,89 @@
+"""Local OpenAI-compatible stub server backed by ``FakeBackend``.
+
+Run it in its own process and point the API at it for offline load tests:
+
+    uvicorn app.services.llm_stub_server:app --port 8001 --workers 2
+    LLM_BACKEND=http LLM_BASE_URL=http://localhost:8001/v1 uvicorn app.main:app
+
+Latency, error rate and token counts come from the ``LLM_FAKE_*`` settings.
+"""
+
+import json
+import time
+import uuid
+from collections.abc import AsyncIterator
+from typing import Any
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.config import get_settings
+from app.services.llm_backends import FakeBackend
+from app.services.llm_resilience import TransientError
+
+app = FastAPI(title="LendSynthetix LLM stub")
+_backend = FakeBackend.from_settings(get_settings())
+
+
+class ChatCompletionRequest(BaseModel):
+    model: str
+    messages: list[dict[str, Any]]
+    max_tokens: int = 1000
+    temperature: float = 0.0
+    response_format: dict[str, str] | None = None
+    stream: bool = False
+
+
+def _prompt(req: ChatCompletionRequest) -> str:
+    return "\n".join(str(m.get("content", "")) for m in req.messages)
+
+
+@app.post("/v1/chat/completions", response_model=None)
+async def chat_completions(req: ChatCompletionRequest) -> dict[str, Any] | StreamingResponse:
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    created = int(time.time())
+    prompt = _prompt(req)
+
+    if req.stream:
+        async def chunks() -> AsyncIterator[str]:
+            async for delta in _backend.stream(
+                model=req.model, prompt=prompt, max_tokens=req.max_tokens,
+                temperature=req.temperature,
+            ):
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": req.model,
+                    "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    try:
+        completion = await _backend.create(
+            model=req.model, prompt=prompt, max_tokens=req.max_tokens,
+            temperature=req.temperature, response_format=req.response_format,
+        )
+    except TransientError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": completion.model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": completion.content},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": completion.prompt_tokens,
+            "completion_tokens": completion.completion_tokens,
+            "total_tokens": completion.prompt_tokens + completion.completion_tokens,
+        },
+    }
@@ -0,0 +1,73 @@
+"""LLM usage accounting - per-call token, latency and retry records.
+
+``LLMService`` records one ``LLMCall`` per completion into every active
+``usage_scope`` of the calling context, so an agent can collect the calls behind one
+memo while the workflow around it collects the calls for the whole loan.
+"""
+
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class LLMCall:
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms: float = 0.0  # end to end, including queueing and retries
+    cache_hit: bool = False
+    retries: int = 0
+    coalesced: bool = False  # served by an identical request already in flight
+
+
+_scopes: ContextVar[tuple[list[LLMCall], ...]] = ContextVar("llm_usage_scopes", default=())
+
+
+@contextmanager
+def usage_scope() -> Iterator[list[LLMCall]]:
+    """Collect every LLM call made in this context (including nested scopes)."""
+    calls: list[LLMCall] = []
+    token = _scopes.set((*_scopes.get(), calls))
+    try:
+        yield calls
+    finally:
+        _scopes.reset(token)
+
+
+def record(call: LLMCall) -> None:
+    for calls in _scopes.get():
+        calls.append(call)
+
+
+# Additive fields of a usage summary; everything else is descriptive.
+USAGE_FIELDS = (
+    "calls", "prompt_tokens", "completion_tokens", "latency_ms", "cache_hits", "retries", "coalesced",
+)
+
+
+def summarize(calls: Iterable[LLMCall]) -> dict[str, Any] | None:
+    """Roll calls up into the dict stored in audit details. None if no calls were made."""
+    calls = list(calls)
+    if not calls:
+        return None
+    return {
+        "calls": len(calls),
+        "model": calls[-1].model,
+        "prompt_tokens": sum(c.prompt_tokens for c in calls),
+        "completion_tokens": sum(c.completion_tokens for c in calls),
+        "latency_ms": round(sum(c.latency_ms for c in calls), 1),
+        "cache_hits": sum(1 for c in calls if c.cache_hit),
+        "retries": sum(c.retries for c in calls),
+        "coalesced": sum(1 for c in calls if c.coalesced),
+    }
+
+
+def merge(total: dict[str, Any], usage: dict[str, Any] | None) -> dict[str, Any]:
+    """Add one summary into a running total (in place) and return it."""
+    if usage:
+        for field in USAGE_FIELDS:
+            total[field] = round(total.get(field, 0) + usage.get(field, 0), 1)
+    return total
@@ -0,0 +1,166 @@
+"""Prompt budgeting - pack prompt sections by priority into a token budget.
+
+Sections are measured in tokens (tiktoken when installed, otherwise ~4 chars per
+token) and admitted most-important first; the prompt is then rendered in the
+original section order. Whatever did not fit is reported, so callers can audit it.
+"""
+
+import math
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any
+
+try:  # optional dependency: exact counts for OpenAI models
+    import tiktoken
+
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:  # pragma: no cover - depends on environment
+    _ENCODING = None
+
+
+def count_tokens(text: str) -> int:
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Keep the first ``max_tokens`` tokens of ``text``."""
+    if max_tokens <= 0:
+        return ""
+    if _ENCODING is not None:
+        tokens = _ENCODING.encode(text)
+        return text if len(tokens) <= max_tokens else _ENCODING.decode(tokens[:max_tokens])
+    return text[: max_tokens * 4]
+
+
+class SectionPriority(IntEnum):
+    """Lower value is packed first. INSTRUCTIONS are always kept."""
+
+    INSTRUCTIONS = 0
+    FINANCIALS = 1
+    LATEST_MEMOS = 2
+    DOCUMENT = 3
+    OLDER_MEMOS = 4
+
+
+@dataclass
+class _Section:
+    name: str
+    text: str
+    priority: int
+    truncate: bool
+    header: str | None
+    tokens: int = 0
+    included: str | None = None
+
+
+@dataclass
+class BuiltPrompt:
+    text: str
+    tokens: int
+    budget: int
+    dropped: list[str] = field(default_factory=list)
+    truncated: list[str] = field(default_factory=list)
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "tokens": self.tokens,
+            "budget": self.budget,
+            "dropped": self.dropped,
+            "truncated": self.truncated,
+        }
+
+
+class PromptBuilder:
+    """Collects prompt sections and packs them into ``budget`` tokens."""
+
+    def __init__(self, budget: int) -> None:
+        self._budget = budget
+        self._sections: list[_Section] = []
+
+    def add(
+        self,
+        name: str,
+        text: str,
+        priority: int,
+        truncate: bool = False,
+        header: str | None = None,
+    ) -> "PromptBuilder":
+        """Add a section. Consecutive included sections sharing a ``header`` render as
+        one block under it; a header whose sections were all dropped is omitted.
+        """
+        self._sections.append(_Section(name, text, int(priority), truncate, header))
+        return self
+
+    def build(self) -> BuiltPrompt:
+        for section in self._sections:
+            section.tokens = count_tokens(section.text)
+        headers = {s.header for s in self._sections if s.header}
+        remaining = self._budget - sum(count_tokens(h) for h in headers)
+        dropped: list[str] = []
+        truncated: list[str] = []
+
+        # Stable sort: equal priorities keep insertion order.
+        for section in sorted(self._sections, key=lambda s: s.priority):
+            if section.priority == SectionPriority.INSTRUCTIONS or section.tokens <= remaining:
+                section.included = section.text
+                remaining -= section.tokens
+            elif section.truncate and remaining > 0:
+                section.included = truncate_tokens(section.text, remaining)
+                remaining = 0
+                truncated.append(section.name)
+            else:
+                dropped.append(section.name)
+
+        text = self._render()
+        return BuiltPrompt(
+            text=text,
+            tokens=count_tokens(text),
+            budget=self._budget,
+            dropped=dropped,
+            truncated=truncated,
+        )
+
+    def _render(self) -> str:
+        blocks: list[str] = []
+        current_header: str | None = None
+        for section in self._sections:
+            if section.included is None:
+                continue
+            if section.header and section.header == current_header:
+                blocks[-1] += "\n" + section.included
+                continue
+            current_header = section.header
+            blocks.append(
+                f"{section.header}\n{section.included}" if section.header else section.included
+            )
+        return "\n\n".join(blocks)
+
+
+def add_memos(
+    builder: PromptBuilder,
+    memos: list[dict[str, Any]],
+    header: str,
+    line: Callable[[dict[str, Any]], str],
+) -> None:
+    """Add a debate transcript: each agent's latest memo outranks its older ones. A
+    summary entry (see ``app.orchestration.transcript``) is added as written."""
+    latest = {m["agent"]: i for i, m in enumerate(memos)}
+    for i, memo in enumerate(memos):
+        if memo.get("summary"):
+            builder.add(
+                "memo:summary",
+                f"Earlier rounds (summary):\n{memo['memo']}",
+                SectionPriority.OLDER_MEMOS,
+                header=header,
+            )
+            continue
+        is_latest = latest[memo["agent"]] == i
+        builder.add(
+            f"memo:{memo.get('round', '?')}:{memo['agent']}",
+            line(memo),
+            SectionPriority.LATEST_MEMOS if is_latest else SectionPriority.OLDER_MEMOS,
+            header=header,
+        )
@@ -0,0 +1,70 @@
+"""Usage service - aggregates LLM usage recorded in the audit trail."""
+
+import uuid
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app.models.audit_log import AuditLog
+from app.services.llm_usage import merge
+
+# Audit events whose details carry a "usage" summary. PANEL_REVIEW holds the usage
+# of a combined initial review; its per-agent AGENT_MEMO entries carry none.
+USAGE_EVENTS = ("AGENT_MEMO", "PANEL_REVIEW", "EXTRACTION")
+
+SUMMARY_WINDOW = timedelta(days=30)  # get_usage_summary default
+SUMMARY_PAGE_ROWS = 1000
+
+
+def aggregate_usage(entries: Iterable[Any]) -> dict[str, Any]:
+    """Roll usage up in total, by agent, by WorkflowState and by debate round (0 = initial).
+
+    ``entries`` are AuditLog rows, or any rows with ``event_type`` and ``details``."""
+    total: dict[str, Any] = {}
+    by_agent: dict[str, dict[str, Any]] = {}
+    by_state: dict[str, dict[str, Any]] = {}
+    by_round: dict[str, dict[str, Any]] = {}
+    for entry in entries:
+        details = entry.details or {}
+        usage = details.get("usage")
+        if not usage:
+            continue
+        merge(total, usage)
+        merge(by_agent.setdefault(details.get("agent", "unknown"), {}), usage)
+        merge(by_state.setdefault(details.get("state", "unknown"), {}), usage)
+        if entry.event_type in ("AGENT_MEMO", "PANEL_REVIEW"):
+            merge(by_round.setdefault(str(details.get("round", 0)), {}), usage)
+    return {"total": total, "by_agent": by_agent, "by_state": by_state, "by_round": by_round}
+
+
+def get_loan_usage(db: Session, loan_id: uuid.UUID) -> dict[str, Any]:
+    entries = (
+        db.query(AuditLog)
+        .filter(AuditLog.loan_id == loan_id, AuditLog.event_type.in_(USAGE_EVENTS))
+        .all()
+    )
+    return {"loan_id": str(loan_id), **aggregate_usage(entries)}
+
+
+def get_usage_summary(db: Session, since: datetime | None = None) -> dict[str, Any]:
+    """Usage across loans since ``since`` (default: the last 30 days), for spotting which
+    agent/state dominates cost. Rows are read in pages, only the columns needed."""
+    if since is None:
+        since = datetime.now(timezone.utc) - SUMMARY_WINDOW
+    loans: set[uuid.UUID] = set()
+
+    def rows() -> Iterable[Any]:
+        query = (
+            db.query(AuditLog.loan_id, AuditLog.event_type, AuditLog.details)
+            .filter(AuditLog.event_type.in_(USAGE_EVENTS), AuditLog.timestamp >= since)
+            .yield_per(SUMMARY_PAGE_ROWS)
+        )
+        for row in query:
+            if (row.details or {}).get("usage"):
+                loans.add(row.loan_id)
+            yield row
+
+    usage = aggregate_usage(rows())
+    return {"since": since.isoformat(), "loans": len(loans), **usage}
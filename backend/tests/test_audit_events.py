@@ -0,0 +1,81 @@
+"""
+Audit event tests (per-loan seq numbering, write buffering, live delivery, catch-up history).
+Run: pytest tests/test_audit_events.py -v
+"""
+
+import asyncio
+import threading
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.audit import AuditEvent, EventBus, WriteBuffer, get_event_bus, write_audit
+from app.models import AgentMemo, AuditLog, Base, LoanApplication
+
+
+def _db_with_loans(n: int):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    loans = [
+        LoanApplication(company_name=f"Co {i}", industry="Retail", requested_amount=1e6)
+        for i in range(n)
+    ]
+    db.add_all(loans)
+    db.flush()
+    return db, loans
+
+
+def test_seq_numbers_each_loans_entries_and_publishes():
+    db, (loan, other) = _db_with_loans(2)
+
+    assert [write_audit(db, loan.id, "STEP").seq for _ in range(3)] == [1, 2, 3]
+    assert write_audit(db, other.id, "STEP").seq == 1
+    assert [e.seq for e in get_event_bus().recent(loan.id, after=1)] == [2, 3]
+
+
+def test_buffer_writes_nothing_until_flush_and_continues_seq():
+    db, (loan,) = _db_with_loans(1)
+    write_audit(db, loan.id, "EXTRACTION")
+
+    out = WriteBuffer(db)
+    memo = out.memo(loan.id, "Sales", "memo", 70.0)
+    entry = out.audit(loan.id, "AGENT_MEMO", {"memo_id": str(memo.id)})
+    assert entry.seq == 2 and memo.seq == 1
+    assert db.query(AgentMemo).count() == 0 and db.query(AuditLog).count() == 1
+    assert get_event_bus().recent(loan.id, after=1)[0].seq == 2  # published already
+
+    out.flush()
+    assert db.get(AgentMemo, memo.id).content == "memo"
+    assert [e.seq for e in db.query(AuditLog).order_by(AuditLog.seq)] == [1, 2]
+
+
+def test_subscriber_receives_events_published_from_other_threads():
+    bus = EventBus()
+    loan_id = uuid.uuid4()
+
+    def publish():
+        bus.publish(AuditEvent(loan_id, 1, "STATE_TRANSITION", {"to": "DEBATE"}))
+        bus.publish(AuditEvent(loan_id, 2, "AGENT_MEMO", {"agent": "Sales"}))
+        bus.publish(AuditEvent(loan_id, 3, "WORKFLOW_COMPLETE", {"status": "Approved"}))
+
+    async def consume():
+        with bus.subscribe(loan_id) as sub:
+            threading.Thread(target=publish).start()
+            return [await asyncio.wait_for(sub.get(), 5) for _ in range(3)]
+
+    events = asyncio.run(consume())
+    assert [e.seq for e in events] == [1, 2, 3]
+    assert [e.terminal for e in events] == [False, False, True]
+
+
+def test_recent_history_is_bounded():
+    bus = EventBus(history=2, max_loans=1)
+    first, second = uuid.uuid4(), uuid.uuid4()
+    for seq in (1, 2, 3):
+        bus.publish(AuditEvent(first, seq, "STEP", None))
+    assert [e.seq for e in bus.recent(first)] == [2, 3]
+
+    bus.publish(AuditEvent(second, 1, "STEP", None))
+    assert bus.recent(first) == []  # least recently active loan dropped
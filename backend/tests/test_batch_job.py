@@ -0,0 +1,70 @@
+"""
+Batch re-evaluation tests (local file-based backend, resume after interruption).
+Run: pytest tests/test_batch_job.py -v
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.batch import BatchJob, LocalBatchBackend
+from app.models import AgentMemo, AuditLog, Base, LoanApplication
+from app.services.llm_backends import FakeBackend
+from app.services.usage_service import get_usage_summary
+
+
+def _db_with_loans(n: int):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    for i in range(n):
+        db.add(LoanApplication(
+            company_name=f"Co {i}", industry="Retail", requested_amount=1e6,
+            extracted_financials={"revenue": 5e6 + i, "debt": 1e6, "dscr": 1.4},
+            workflow_state="FINALIZED",
+        ))
+    db.commit()
+    return db
+
+
+def _job(tmp_path):
+    backend = LocalBatchBackend(tmp_path / "local", FakeBackend(median_latency_ms=0))
+    return BatchJob(tmp_path / "job", backend)
+
+
+def test_batch_merges_one_memo_per_loan_and_agent(tmp_path):
+    db = _db_with_loans(4)
+    summary = _job(tmp_path).run(db, poll_seconds=0)
+
+    assert summary["merged"] == 12 and summary["failed"] == []
+    assert db.query(AgentMemo).count() == 12
+    entry = db.query(AuditLog).filter(AuditLog.event_type == "AGENT_MEMO").first()
+    assert entry.details["batch_id"] == summary["batch_id"]
+    assert entry.details["usage"]["completion_tokens"] > 0
+
+
+def test_usage_summary_covers_only_its_window(tmp_path):
+    db = _db_with_loans(2)
+    _job(tmp_path).run(db, poll_seconds=0)
+
+    recent = get_usage_summary(db)
+    assert recent["loans"] == 2 and set(recent["by_agent"]) == {"Sales", "Risk", "Compliance"}
+    assert recent["total"]["completion_tokens"] > 0
+    later = get_usage_summary(db, since=datetime.now(timezone.utc) + timedelta(hours=1))
+    assert later["loans"] == 0 and later["total"] == {}
+
+
+def test_interrupted_job_resumes_without_duplicates(tmp_path):
+    db = _db_with_loans(3)
+    job = _job(tmp_path)
+    job.prepare(db)
+    job.submit()  # "crash" here
+
+    resumed = _job(tmp_path)
+    assert resumed.manifest["stage"] == "submitted"
+    assert resumed.run(db, poll_seconds=0)["merged"] == 9
+
+    again = _job(tmp_path).merge(db)  # re-running a finished merge is a no-op
+    assert again["merged"] == 0 and again["already_merged"] == 9
+    assert db.query(AgentMemo).count() == 9
@@ -0,0 +1,110 @@
+"""
+Debate convergence tests (numeric consensus ends the debate without the moderator).
+Run: pytest tests/test_debate_convergence.py -v
+"""
+
+from app.agents.schemas import AgentResult
+from app.models.loan_application import LoanApplication
+from app.orchestration.workflow import WorkflowContext, run_graph
+
+
+class Agents:
+    """Scripted scores per round (0 = initial review); counts moderator calls."""
+
+    def __init__(self, rounds: list[dict[str, float]], consensus: bool = False) -> None:
+        self.rounds = rounds
+        self.consensus = consensus
+        self.moderator_calls = 0
+        self.rebuttals: dict[str, int] = {}
+
+    def _result(self, agent_type: str, debate_round: int) -> AgentResult:
+        score = self.rounds[min(debate_round, len(self.rounds) - 1)][agent_type]
+        return AgentResult(memo=f"{agent_type} memo", score=score)
+
+    async def review(self, agent_type, financials):
+        return self._result(agent_type, 0)
+
+    async def rebut(self, agent_type, financials, transcript):
+        self.rebuttals[agent_type] = self.rebuttals.get(agent_type, 0) + 1
+        return self._result(agent_type, self.rebuttals[agent_type])
+
+    async def moderate(self, financials, transcript):
+        self.moderator_calls += 1
+        return AgentResult(memo="Moderator memo", score=50), self.consensus
+
+
+class Audits:
+    def __init__(self) -> None:
+        self.events: list[tuple[str, dict]] = []
+
+    def audit(self, event_type, details=None):
+        self.events.append((event_type, details or {}))
+
+    def record(self, *args, **kwargs):
+        pass
+
+    def checkpoint(self):
+        pass
+
+    def of(self, event_type):
+        return [d for e, d in self.events if e == event_type]
+
+
+def _run(agents, **thresholds):
+    loan = LoanApplication(extracted_financials={"revenue": 1}, workflow_state="INGESTED")
+    audits = Audits()
+    run_graph(WorkflowContext(loan=loan, agents=agents, recorder=audits, **thresholds))
+    return loan, audits
+
+
+def test_spread_under_threshold_skips_moderator_and_later_rounds():
+    agents = Agents([
+        {"Sales": 85, "Risk": 40, "Compliance": 90},
+        {"Sales": 75, "Risk": 60, "Compliance": 90},
+    ])
+    loan, audits = _run(agents, converge_spread=20)
+
+    assert agents.moderator_calls == 0
+    assert audits.of("CONSENSUS_REACHED") == [
+        {"round": 1, "method": "numeric", "reason": "spread", "spread": 15, "movement": 20},
+    ]
+    assert [(d["stage"], d["round"]) for d in audits.of("STAGE_SKIPPED")] == [
+        ("Moderator", 1), ("Debate", 2),
+    ]
+    assert audits.of("FINAL_SCORE_CALC")[0]["formula"] == "0.4*sales - 0.4*risk"
+    assert loan.final_score == 6.0  # round-1 rebuttals, not the initial reviews
+
+
+def test_close_scores_must_also_stop_moving_with_epsilon():
+    agents = Agents([
+        {"Sales": 85, "Risk": 40, "Compliance": 90},
+        {"Sales": 70, "Risk": 55, "Compliance": 90},
+        {"Sales": 71, "Risk": 55, "Compliance": 90},
+    ])
+    loan, audits = _run(agents, converge_spread=20, converge_epsilon=2)
+
+    assert agents.moderator_calls == 1  # round 1 moved by 15; round 2 by 1
+    assert audits.of("CONSENSUS_REACHED")[0]["reason"] == "stable"
+    assert [(d["stage"], d["round"]) for d in audits.of("STAGE_SKIPPED")] == [("Moderator", 2)]
+    # the round-1 moderator still weighs in on the round-2 scores
+    assert audits.of("FINAL_SCORE_CALC")[0]["moderator"] == 50
+
+
+def test_stable_scores_far_apart_are_a_deadlock_for_the_moderator():
+    agents = Agents([
+        {"Sales": 85, "Risk": 40, "Compliance": 90},
+        {"Sales": 80, "Risk": 45, "Compliance": 90},
+        {"Sales": 81, "Risk": 45, "Compliance": 90},
+    ])
+    _, audits = _run(agents, converge_spread=20, converge_epsilon=2)
+
+    assert agents.moderator_calls == 2  # round 2 moved by 1, but the spread is 36
+    assert audits.of("CONSENSUS_REACHED") == [] and audits.of("STAGE_SKIPPED") == []
+
+
+def test_convergence_is_off_by_default():
+    agents = Agents([{"Sales": 85, "Risk": 40, "Compliance": 90}])
+    _, audits = _run(agents)
+
+    assert agents.moderator_calls == 2
+    assert audits.of("STAGE_SKIPPED") == []
@@ -0,0 +1,176 @@
+"""
+Upload workflow job tests (worker pool, job states, history eviction, scheduling).
+Run: pytest tests/test_job_service.py -v
+"""
+
+import threading
+import time
+
+import pytest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models import Base, LoanApplication
+from app.services.job_service import JobRunner, LoanBusy
+
+
+def _session_factory():
+    """In-memory database shared by the test and the runner's worker threads."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def _loan_id(factory):
+    db = factory()
+    loan = LoanApplication(
+        company_name="Co", industry="Retail", requested_amount=1e6,
+        extracted_financials={}, workflow_state="INGESTED",
+    )
+    db.add(loan)
+    db.commit()
+    loan_id = loan.id
+    db.close()
+    return loan_id
+
+
+def _wait(jobs, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not all(j.done for j in jobs):
+        assert time.monotonic() < deadline, "jobs did not finish"
+        time.sleep(0.005)
+
+
+def _finalize(loan, db):
+    loan.workflow_state = "FINALIZED"
+    db.commit()
+
+
+def test_job_runs_workflow_in_its_own_session():
+    factory = _session_factory()
+    loan_id = _loan_id(factory)
+    runner = JobRunner(2, 10, session_factory=factory, workflow=_finalize)
+
+    job = runner.submit(loan_id)
+    runner.shutdown()
+
+    assert job.state == "succeeded" and job.error is None
+    assert job.timings()["run_seconds"] is not None
+    assert factory().get(LoanApplication, loan_id).workflow_state == "FINALIZED"
+
+
+def test_failed_workflow_reports_error():
+    factory = _session_factory()
+    loan_id = _loan_id(factory)
+
+    def boom(loan, db):
+        raise RuntimeError("LLM down")
+
+    runner = JobRunner(1, 10, session_factory=factory, workflow=boom)
+    job = runner.submit(loan_id)
+    runner.shutdown()
+
+    assert job.state == "failed" and job.error == "LLM down"
+
+
+def test_history_evicts_only_finished_jobs():
+    factory = _session_factory()
+    release = threading.Event()
+    runner = JobRunner(1, 2, session_factory=factory, workflow=lambda loan, db: release.wait(5))
+
+    pending = [runner.submit(_loan_id(factory)) for _ in range(3)]  # one running, two queued
+    assert all(runner.get(j.id) for j in pending)  # over history, but none finished
+
+    release.set()
+    _wait(pending)
+    runner._evict()
+    assert [runner.get(j.id) for j in pending] == [None, pending[1], pending[2]]
+
+
+def test_double_resume_is_refused_until_the_job_finishes():
+    factory = _session_factory()
+    loan_id = _loan_id(factory)
+    release = threading.Event()
+    runner = JobRunner(2, 10, session_factory=factory, workflow=lambda loan, db: release.wait(5))
+
+    first = runner.submit(loan_id)
+    with pytest.raises(LoanBusy) as busy:
+        runner.submit(loan_id)  # e.g. a second resume while the first still runs
+    assert busy.value.job is first and runner.stats()["running"] == 1
+
+    release.set()
+    runner.shutdown()
+    assert first.done and runner.stats()["classes"]["standard"]["dispatched"] == 1
+
+
+def _recording_runner(factory, workers, **kwargs):
+    """Runner whose workflows log which loan started, in order, and wait for ``release``."""
+    release, order = threading.Event(), []
+
+    def workflow(loan, db):
+        order.append(loan.id)
+        release.wait(5)
+
+    return JobRunner(workers, 100, session_factory=factory, workflow=workflow, **kwargs), release, order
+
+
+def test_interactive_jobs_jump_the_bulk_queue_and_caps_hold():
+    factory = _session_factory()
+    bulk = [_loan_id(factory) for _ in range(4)]
+    live = _loan_id(factory)
+    runner, release, order = _recording_runner(factory, 2, caps={"bulk": 1})
+
+    jobs = [runner.submit(loan_id, "bulk", "backfill") for loan_id in bulk]
+    jobs.append(runner.submit(live, "interactive", "rm"))
+    stats = runner.stats()["classes"]
+    assert stats["bulk"]["running"] == 1 and stats["bulk"]["queued"] == 3  # capped
+    assert stats["interactive"]["running"] == 1  # took the free worker at once
+
+    deadline = time.monotonic() + 5
+    while len(order) < 2:  # both dispatched jobs have started their workflows
+        assert time.monotonic() < deadline, "jobs did not start"
+        time.sleep(0.005)
+    release.set()
+    _wait(jobs)
+    assert order[:2] in ([bulk[0], live], [live, bulk[0]]) and order[2:] == bulk[1:]
+    stats = runner.stats()["classes"]
+    assert stats["bulk"]["dispatched"] == 4 and stats["bulk"]["max_wait_seconds"] > 0
+
+
+def test_sources_share_a_class_by_weight():
+    factory = _session_factory()
+    loans = {s: [_loan_id(factory) for _ in range(4)] for s in ("a", "b", "c")}
+    runner, release, order = _recording_runner(factory, 1, weights={"c": 2.0})
+
+    jobs = [  # all queued behind a's first job, which holds the worker
+        runner.submit(loan_id, "standard", source)
+        for source in ("a", "b", "c") for loan_id in loans[source]
+    ]
+    release.set()
+    _wait(jobs)
+
+    source_of = {loan_id: s for s, ids in loans.items() for loan_id in ids}
+    assert "".join(source_of[loan_id] for loan_id in order) == "acabccabcabb"  # c at twice the rate
+
+
+def test_shutdown_finishes_running_jobs_and_leaves_queued_ones():
+    factory = _session_factory()
+    runner, release, order = _recording_runner(factory, 1)
+    running, *queued = [runner.submit(_loan_id(factory)) for _ in range(3)]
+
+    closing = threading.Thread(target=runner.shutdown)
+    closing.start()
+    while not runner._closed:
+        time.sleep(0.005)
+    release.set()
+    closing.join(5)
+
+    assert not closing.is_alive() and running.state == "succeeded"
+    assert [j.state for j in queued] == ["queued", "queued"]  # loans stay resumable
+    assert order == [running.loan_id]
+    with pytest.raises(RuntimeError, match="shut down"):
+        runner.submit(queued[0].loan_id)
@@ -0,0 +1,75 @@
+"""
+LLM admission control tests (in-flight limit, priority order, token budgets, stats).
+Run: pytest tests/test_llm_admission.py -v
+"""
+
+import asyncio
+
+from app.services.llm_admission import AdmissionController, Priority, TokenBucket
+
+
+def test_in_flight_limit_and_priority_order():
+    async def scenario() -> list[str]:
+        ctl = AdmissionController(max_in_flight=1, requests_per_minute=1000, tokens_per_minute=10**6)
+        order: list[str] = []
+
+        async def call(name: str, priority: Priority) -> None:
+            async with ctl.slot(priority, tokens=10):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        first = asyncio.create_task(call("first", Priority.WORKFLOW))
+        await asyncio.sleep(0)  # first holds the only slot
+        waiters = [
+            asyncio.create_task(call("bulk", Priority.BULK)),
+            asyncio.create_task(call("workflow", Priority.WORKFLOW)),
+            asyncio.create_task(call("chat", Priority.INTERACTIVE)),
+        ]
+        await asyncio.sleep(0)
+        assert ctl.stats()["queue_depth"] == {"interactive": 1, "workflow": 1, "bulk": 1}
+        await asyncio.gather(first, *waiters)
+        assert ctl.stats()["in_flight"] == 0
+        return order
+
+    assert asyncio.run(scenario()) == ["first", "chat", "workflow", "bulk"]
+
+
+def test_request_budget_delays_admission():
+    async def scenario() -> float:
+        # 600 RPM refills one request every 0.1s; the bucket starts full.
+        ctl = AdmissionController(max_in_flight=10, requests_per_minute=600, tokens_per_minute=10**6)
+        for _ in range(600):
+            await ctl.acquire(Priority.BULK, tokens=1)
+            ctl.release()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await ctl.acquire(Priority.BULK, tokens=1)
+        ctl.release()
+        return loop.time() - started
+
+    assert asyncio.run(scenario()) >= 0.05
+
+
+def test_cancelled_waiter_is_dropped():
+    async def scenario() -> dict:
+        ctl = AdmissionController(max_in_flight=1, requests_per_minute=1000, tokens_per_minute=10**6)
+        await ctl.acquire(Priority.WORKFLOW, tokens=1)
+        waiter = asyncio.create_task(ctl.acquire(Priority.BULK, tokens=1))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        ctl.release()
+        return ctl.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["in_flight"] == 0
+    assert stats["queue_depth"]["bulk"] == 0
+
+
+def test_reading_available_leaves_the_bucket_untouched():
+    bucket = TokenBucket(per_minute=60)
+    bucket.wait_time(1)
+    bucket.take(30)
+    state = (bucket._tokens, bucket._updated)
+    assert 30 <= bucket.available <= 31
+    assert (bucket._tokens, bucket._updated) == state  # no write to race the service loop
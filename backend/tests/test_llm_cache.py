@@ -0,0 +1,73 @@
+"""
+LLM response cache tests (memory LRU + SQLite tier).
+Run: pytest tests/test_llm_cache.py -v
+"""
+
+import asyncio
+import threading
+
+from app.services.llm_cache import LLMCache
+
+
+def test_key_depends_on_every_input():
+    cache = LLMCache(path=None)
+    base = cache.key("gpt-4o-mini", "prompt", 800, {"type": "json_object"})
+    assert base == cache.key("gpt-4o-mini", "prompt", 800, {"type": "json_object"})
+    assert base != cache.key("gpt-4o", "prompt", 800, {"type": "json_object"})
+    assert base != cache.key("gpt-4o-mini", "prompt!", 800, {"type": "json_object"})
+    assert base != cache.key("gpt-4o-mini", "prompt", 600, {"type": "json_object"})
+    assert base != cache.key("gpt-4o-mini", "prompt", 800, None)
+    assert base != LLMCache(path=None, namespace="v2").key(
+        "gpt-4o-mini", "prompt", 800, {"type": "json_object"}
+    )
+
+
+def test_memory_tier_is_bounded_lru():
+    cache = LLMCache(path=None, max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"  # a is now most recent
+    cache.set("c", "3")  # evicts b
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["memory_hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_disk_tier_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    writer = LLMCache(path=path)
+    writer.set("k", '{"score": 70}')
+    reader = LLMCache(path=path)  # e.g. another uvicorn worker
+    assert reader.get("k") == '{"score": 70}'
+    assert reader.stats()["disk_hits"] == 1
+    assert reader.get("k") == '{"score": 70}'
+    assert reader.stats()["memory_hits"] == 1
+
+
+def test_expired_entries_miss(tmp_path):
+    cache = LLMCache(path=str(tmp_path / "cache.sqlite3"), ttl_seconds=-1)
+    cache.set("k", "v")
+    assert cache.get("k") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_async_disk_tier_runs_off_the_event_loop(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = LLMCache(path=path)
+    loop_thread, disk_threads = threading.get_ident(), []
+    set_disk, get_disk = cache._set_disk, cache._get_disk
+    cache._set_disk = lambda *a: (disk_threads.append(threading.get_ident()), set_disk(*a))[1]
+    cache._get_disk = lambda *a: (disk_threads.append(threading.get_ident()), get_disk(*a))[1]
+
+    async def scenario():
+        await cache.aset("k", "v")
+        assert await cache.aget("k") == "v"  # memory tier: no thread
+        cache._memory.clear()
+        return await cache.aget("k")  # cold memory: disk lookup in a thread
+
+    assert asyncio.run(scenario()) == "v"
+    assert len(disk_threads) == 2 and loop_thread not in disk_threads
@@ -0,0 +1,76 @@
+"""
+LLM extraction tests (relevance windows, page markers, field targeting, fallback merge).
+Run: pytest tests/test_llm_extraction.py -v
+"""
+
+import json
+
+from app.extraction.extractor import extract
+from app.extraction.llm_extractor import build_prompt
+from app.extraction.windowing import find_windows
+from app.ingestion.pdf_parser import PAGE_BREAK
+
+COVER = "Annual Report and Accounts\nPrepared for the board of directors.\n" + "Lorem ipsum dolor. " * 150
+
+
+def _long_statement() -> str:
+    pages = [COVER] * 120
+    pages[57] = COVER + "\nTotal revenue for the year: $42.1M\nTotal debt: $9.8M\n"
+    pages[88] = "Debt service coverage ratio (DSCR): 1.42\nFacility secured by a pledged property."
+    pages[101] = "No offshore entities; AML checks completed."
+    return PAGE_BREAK.join(pages)
+
+
+def test_windows_carry_page_numbers():
+    windows = find_windows(_long_statement(), radius=100)
+    assert [w.page for w in windows] == [58, 89, 102]
+    assert "42.1M" in windows[0].text
+
+
+def test_terms_without_figures_are_ignored():
+    assert find_windows("Revenue grew strongly this year.\n" * 10) == []
+
+
+def test_prompt_sends_windows_not_document_head():
+    text = _long_statement()
+    prompt = build_prompt(text)
+    assert "[Page 58]" in prompt.text and "[Page 102]" in prompt.text
+    assert "Annual Report and Accounts" not in prompt.text.split("Relevant excerpts:")[1][:40]
+    assert prompt.tokens < len(text) // 4 // 10
+
+
+def test_prompt_asks_only_for_missing_fields():
+    prompt = build_prompt("DSCR: 1.3 and revenue of $4M", fields=["dscr"]).text
+    assert '"dscr"' in prompt
+    assert '"revenue"' not in prompt and '"compliance_keywords"' not in prompt
+
+
+class _FakeLLM:
+    """Answers the extraction prompt with fixed fields and keeps the prompt."""
+
+    available = True
+
+    def __init__(self, answer: dict) -> None:
+        self.answer = answer
+        self.prompts: list[str] = []
+
+    def complete(self, prompt: str, max_tokens: int, route: str) -> str:
+        self.prompts.append(prompt)
+        return json.dumps(self.answer)
+
+
+def test_fallback_merges_llm_keywords_when_regex_finds_none():
+    llm = _FakeLLM({"revenue": 4e6, "compliance_keywords": ["sanctions"], "collateral_present": True})
+    result = extract("Revenue of four million; the director is on a watch list.", llm)
+
+    assert '"compliance_keywords"' in llm.prompts[0] and '"collateral_present"' in llm.prompts[0]
+    assert result.revenue == 4e6
+    assert result.compliance_keywords == ["sanctions"] and result.collateral_present
+
+
+def test_fallback_keeps_regex_keywords():
+    llm = _FakeLLM({"dscr": 1.2, "compliance_keywords": ["sanctions"]})
+    result = extract("Revenue: $4M. Total debt: $1M. Offshore holding company.", llm)
+
+    assert '"compliance_keywords"' not in llm.prompts[0]
+    assert result.compliance_keywords == ["offshore"]
@@ -0,0 +1,44 @@
+"""
+LLM resilience tests (retry backoff, circuit breaker).
+Run: pytest tests/test_llm_resilience.py -v
+"""
+
+import time
+
+from app.services.llm_resilience import CircuitBreaker, LatencyTracker, RetryPolicy
+
+
+def test_backoff_is_bounded_and_jittered():
+    policy = RetryPolicy(max_attempts=5, base_delay=0.5, max_delay=2.0)
+    for attempt in range(1, 6):
+        delay = policy.delay(attempt)
+        assert 0 <= delay <= min(2.0, 0.5 * 2 ** (attempt - 1))
+
+
+def test_breaker_opens_then_half_opens():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()  # the probe
+    assert breaker.state == "half_open"
+    assert not breaker.allow()  # everyone else still fails fast
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.stats()["trips"] == 2
+
+
+def test_latency_percentile():
+    tracker = LatencyTracker(window=100)
+    for ms in range(1, 101):
+        tracker.record(ms / 1000)
+    assert tracker.percentile(0.95) == 0.096
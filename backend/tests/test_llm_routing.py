@@ -0,0 +1,21 @@
+"""
+LLM routing table tests (per-call-site overrides, debate escalation).
+Run: pytest tests/test_llm_routing.py -v
+"""
+
+from app.config import LLMRoute, Settings
+
+
+def test_override_fields_merge_over_defaults():
+    settings = Settings(llm_routes={"chat": LLMRoute(model="gpt-4o", max_tokens=300)})
+    chat = settings.llm_route("chat")
+    assert (chat.model, chat.max_tokens, chat.temperature) == ("gpt-4o", 300, 0.3)
+    assert settings.llm_route("sales.initial").max_tokens == 800
+
+
+def test_debate_model_escalates_only_debate_routes():
+    settings = Settings(llm_debate_model="gpt-4o")
+    assert settings.llm_route("risk.debate").model == "gpt-4o"
+    assert settings.llm_route("moderator").model == "gpt-4o"
+    assert settings.llm_route("risk.initial").model is None
+    assert settings.llm_route("extraction").model is None
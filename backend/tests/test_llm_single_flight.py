@@ -0,0 +1,66 @@
+"""
+LLM single-flight tests (identical in-flight requests share one upstream call).
+Run: pytest tests/test_llm_single_flight.py -v
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.llm_admission import Priority
+from app.services.llm_backends import FakeBackend
+from app.services.llm_service import LLMService
+from app.services.llm_usage import usage_scope
+
+
+class CountingBackend(FakeBackend):
+    def __init__(self) -> None:
+        super().__init__(median_latency_ms=150, latency_sigma=0.0)
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        return await super().create(**kwargs)
+
+
+def _service() -> tuple[LLMService, CountingBackend]:
+    svc = LLMService()
+    backend = CountingBackend()
+    svc._backend = backend
+    return svc, backend
+
+
+def test_threads_and_event_loop_share_one_call():
+    svc, backend = _service()
+    prompt = 'Sales agent. Return {"memo": "", "score": 0, "flags": []}'
+
+    async def from_loop():
+        return await svc.acomplete_json(prompt)
+
+    with ThreadPoolExecutor(4) as pool:
+        threaded = [pool.submit(svc.complete_json, prompt) for _ in range(3)]
+        looped = asyncio.run(from_loop())
+        results = [f.result() for f in threaded] + [looped]
+
+    assert backend.calls == 1
+    assert all(r == results[0] for r in results)
+    assert svc.stats()["coalesced"] == 3
+    asyncio.run(svc.aclose())
+
+
+def test_followers_record_no_tokens_and_urgent_callers_do_not_wait_on_bulk():
+    svc, backend = _service()
+
+    async def scenario():
+        with usage_scope() as calls:
+            bulk = asyncio.create_task(svc.acomplete("same prompt", priority=Priority.BULK))
+            await asyncio.sleep(0.02)
+            follower = asyncio.create_task(svc.acomplete("same prompt", priority=Priority.BULK))
+            urgent = asyncio.create_task(svc.acomplete("same prompt", priority=Priority.INTERACTIVE))
+            await asyncio.gather(bulk, follower, urgent)
+        return calls
+
+    calls = asyncio.run(scenario())
+    assert backend.calls == 2  # bulk leader + interactive caller
+    assert [c.coalesced for c in calls].count(True) == 1
+    assert all(c.prompt_tokens == 0 for c in calls if c.coalesced)
+    asyncio.run(svc.aclose())
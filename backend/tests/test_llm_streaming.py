@@ -0,0 +1,45 @@
+"""
+LLM streaming tests (streamed completions are recorded like every other call).
+Run: pytest tests/test_llm_streaming.py -v
+"""
+
+import asyncio
+
+from app.services.llm_backends import FakeBackend
+from app.services.llm_service import LLMService
+from app.services.llm_usage import usage_scope
+
+
+class SilentUsageBackend(FakeBackend):
+    """Streams like FakeBackend but, like some servers, reports no usage."""
+
+    def stream(self, *, usage=None, **kwargs):
+        return super().stream(**kwargs)
+
+
+def _stream(backend):
+    svc = LLMService()
+    svc._backend = backend
+
+    async def scenario():
+        with usage_scope() as calls:
+            reply = "".join([d async for d in svc.astream_text("Tell me about the loan", max_tokens=40)])
+        return reply, calls
+
+    reply, calls = asyncio.run(scenario())
+    asyncio.run(svc.aclose())
+    return reply, calls
+
+
+def test_stream_records_reported_usage():
+    backend = FakeBackend(median_latency_ms=5, latency_sigma=0.0)
+    reply, calls = _stream(backend)
+    assert reply and len(calls) == 1
+    assert calls[0].prompt_tokens > 0 and calls[0].completion_tokens > 0
+    assert calls[0].latency_ms > 0
+
+
+def test_stream_counts_tokens_when_server_reports_none():
+    reply, calls = _stream(SilentUsageBackend(median_latency_ms=5, latency_sigma=0.0))
+    assert reply and len(calls) == 1
+    assert calls[0].completion_tokens > 0
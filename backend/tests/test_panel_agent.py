@@ -0,0 +1,28 @@
+"""
+Combined initial review tests (prompt shape, validation fallback).
+Run: pytest tests/test_panel_agent.py -v
+"""
+
+from app.agents.panel_agent import PanelAgent
+
+REVIEW = {"memo": "Solid coverage.", "score": 70, "flags": []}
+
+
+def test_prompt_shares_one_copy_of_financials():
+    prompt = PanelAgent(llm=None)._build_prompt({"revenue": 12_500_000}).text
+    assert prompt.count("12500000") == 1
+    assert "Sales agent:" in prompt and "Compliance agent:" in prompt
+    assert '{"memo": "<your memo text>"' not in prompt  # per-agent output formats removed
+
+
+def test_valid_response_yields_three_results():
+    results = PanelAgent(llm=None)._validate({"sales": REVIEW, "risk": REVIEW, "compliance": REVIEW})
+    assert set(results) == {"sales", "risk", "compliance"}
+    assert results["risk"].score == 70
+
+
+def test_invalid_response_signals_fallback():
+    panel = PanelAgent(llm=None)
+    assert panel._validate(None) is None
+    assert panel._validate({"sales": REVIEW, "risk": REVIEW}) is None
+    assert panel._validate({"sales": REVIEW, "risk": REVIEW, "compliance": {"score": 140}}) is None
@@ -0,0 +1,56 @@
+"""
+Prompt budget tests (priority packing, memo dropping, truncation).
+Run: pytest tests/test_prompt_budget.py -v
+"""
+
+from app.agents.sales_agent import SalesAgent
+from app.extraction.llm_extractor import build_prompt
+from app.services.prompt_budget import PromptBuilder, SectionPriority, add_memos, count_tokens
+
+
+def _memos(rounds: int) -> list[dict]:
+    return [
+        {"agent": agent, "round": r, "score": 50, "memo": f"round {r} {agent} " + "word " * 200}
+        for r in range(rounds)
+        for agent in ("Sales", "Risk", "Compliance")
+    ]
+
+
+def test_everything_fits_renders_in_order():
+    prompt = (
+        PromptBuilder(1000)
+        .add("a", "first", SectionPriority.INSTRUCTIONS)
+        .add("b", "second", SectionPriority.OLDER_MEMOS, header="Memos:")
+        .add("c", "third", SectionPriority.LATEST_MEMOS, header="Memos:")
+        .build()
+    )
+    assert prompt.text == "first\n\nMemos:\nsecond\nthird"
+    assert prompt.dropped == [] and prompt.truncated == []
+
+
+def test_older_memos_dropped_before_latest():
+    builder = PromptBuilder(900)
+    builder.add("instructions", "Evaluate.", SectionPriority.INSTRUCTIONS)
+    add_memos(builder, _memos(3), "Prior agent memos:", lambda m: m["memo"])
+    prompt = builder.build()
+
+    assert prompt.tokens <= 900
+    assert set(prompt.dropped) >= {"memo:0:Sales", "memo:0:Risk", "memo:0:Compliance"}
+    assert not any(name.startswith("memo:2:") for name in prompt.dropped)
+    assert "round 2 Compliance" in prompt.text
+
+
+def test_agent_debate_prompt_reports_drops():
+    agent = SalesAgent(llm=None, prompt_budget=1200)
+    prompt = agent.build_prompt({"revenue": 1_000_000}, _memos(3))
+    assert prompt.dropped
+    assert prompt.report()["budget"] == 1200
+    assert prompt.text.endswith("Return JSON only.")
+
+
+def test_extraction_document_truncated_to_budget():
+    text = "Revenue was strong. " * 5000
+    prompt = build_prompt(text, budget=1000)
+    assert prompt.truncated == ["document"]
+    assert prompt.text.startswith("Extract")
+    assert count_tokens(prompt.text) <= 1000 + 5
@@ -0,0 +1,53 @@
+"""
+Debate transcript compaction tests (latest memos in full, bounded summary).
+Run: pytest tests/test_transcript.py -v
+"""
+
+from app.agents import ModeratorAgent, SalesAgent
+from app.orchestration.transcript import compact, latest_per_agent, summarize_rounds
+
+AGENTS = ("Sales", "Risk", "Compliance")
+
+
+def _transcript(rounds: int) -> list[dict]:
+    memos = [
+        {"round": 0, "agent": a, "score": 50 + i, "memo": f"{a} opening argument " * 30, "flags": []}
+        for i, a in enumerate(AGENTS)
+    ]
+    for r in range(1, rounds + 1):
+        for i, a in enumerate(AGENTS + ("Moderator",)):
+            memos.append({
+                "round": r, "agent": a, "score": 50 + r + i,
+                "memo": f"{a} round {r} rebuttal " * 30, "flags": ["aml"] if a == "Risk" else [],
+            })
+    return memos
+
+
+def test_latest_memo_per_agent_in_full_and_older_ones_summarized():
+    memos = _transcript(2)
+    summary = summarize_rounds(memos, budget=400)
+    view = compact(summary, memos)
+
+    assert view[0] is summary and summary["memos"] == len(memos) - 4
+    assert [m["agent"] for m in view[1:]] == ["Sales", "Risk", "Compliance", "Moderator"]
+    assert all(m["round"] == 2 for m in view[1:])
+    assert summary["memo"].startswith("Score history: Sales 50 -> 51 -> 52")
+    assert "Round 1 - Risk (52)" in summary["memo"] and "[flags: aml]" in summary["memo"]
+    assert summarize_rounds(latest_per_agent(memos), budget=400) is None
+
+
+def test_prompt_size_stays_flat_as_rounds_grow():
+    agent, moderator = SalesAgent(llm=None, prompt_budget=100_000), ModeratorAgent(llm=None)
+
+    def tokens(rounds):
+        memos = _transcript(rounds)
+        view = compact(summarize_rounds(memos, budget=400), memos)
+        return (
+            agent.build_prompt({"revenue": 1}, view).tokens,
+            moderator._build_consensus_prompt({"revenue": 1}, view).tokens,
+        )
+
+    assert tokens(8)[0] - tokens(2)[0] <= 400
+    assert tokens(8)[1] - tokens(2)[1] <= 400
+    full = agent.build_prompt({"revenue": 1}, _transcript(8)).tokens
+    assert tokens(8)[0] < full / 3
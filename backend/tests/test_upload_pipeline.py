@@ -3,7 +3,8 @@ End-to-end integration test: PDF upload → extraction → agents → decision.
 
 Uses the real pipeline with no mocks.
 Runs standalone — no external server or Postgres required.
-Uses FastAPI TestClient + in-memory SQLite.
+Uses FastAPI TestClient + a throwaway SQLite file (the upload workflow
+runs on a worker thread, so the database must allow a concurrent reader).
 
 Usage:
   cd backend
@@ -15,14 +16,17 @@ Usage:
 import json
 import os
 import sys
+import tempfile
 import textwrap
+import time
 from pathlib import Path
 
 # ---------------------------------------------------------------------------
 # 1. Force DATABASE_URL to SQLite BEFORE any app code is imported.
 #    This ensures app.config.get_settings() picks up the override.
 # ---------------------------------------------------------------------------
-os.environ["DATABASE_URL"] = "sqlite:///file::memory:?cache=shared&uri=true"
+_DB_PATH = Path(tempfile.mkdtemp()) / "test_upload_pipeline.db"
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_PATH}"
 
 # ---------------------------------------------------------------------------
 # 2. SQLite compatibility shims for PostgreSQL-specific column types.
@@ -45,13 +49,13 @@ def _compile_jsonb_sqlite(type_, compiler, **kw):
 
 # ---------------------------------------------------------------------------
 # 3. Now safe to import the app. The database module will create an engine
-#    pointing at our in-memory SQLite thanks to the env override.
+#    pointing at our throwaway SQLite thanks to the env override.
 # ---------------------------------------------------------------------------
 from app.models.base import Base
 from app.models.database import engine, get_db, SessionLocal
 from app.main import app as fastapi_app
 
-# Create all tables in the in-memory SQLite database
+# Create all tables in the throwaway SQLite database
 Base.metadata.create_all(bind=engine)
 
 # Enable SQLite foreign-key enforcement
@@ -117,7 +121,7 @@ def upload_pdf(pdf_path: Path) -> dict:
             files={"file": (pdf_path.name, f, "application/pdf")},
         )
 
-    if resp.status_code != 200:
+    if resp.status_code != 202:
         print(f"✗ Upload failed (HTTP {resp.status_code})")
         print(resp.text[:1000])
         sys.exit(1)
@@ -125,6 +129,31 @@ def upload_pdf(pdf_path: Path) -> dict:
     return resp.json()
 
 
+def wait_for_job(accepted: dict, timeout: float = 120.0) -> dict:
+    """Poll the job status URL until the workflow finishes; return the loan detail."""
+    print(f"   Job:       {accepted['job_id']}  (polling {accepted['status_url']})")
+    deadline = time.monotonic() + timeout
+    while True:
+        resp = client.get(accepted["status_url"])
+        assert resp.status_code == 200, f"GET {accepted['status_url']} failed: {resp.status_code}"
+        job = resp.json()
+        if job["state"] in ("succeeded", "failed"):
+            break
+        if time.monotonic() > deadline:
+            print(f"✗ Job still {job['state']} after {timeout:.0f}s")
+            sys.exit(1)
+        time.sleep(0.2)
+
+    if job["state"] != "succeeded":
+        print(f"✗ Workflow failed: {job['error']}")
+        sys.exit(1)
+    print(f"   Finished:  {job['workflow_state']} in {job['timings']['run_seconds']}s")
+
+    resp = client.get(f"/api/loans/{accepted['loan_id']}")
+    assert resp.status_code == 200, f"GET /api/loans/{{id}} failed: {resp.status_code}"
+    return {"loan_id": accepted["loan_id"], **resp.json()}
+
+
 def print_results(data: dict) -> None:
     """Pretty-print the pipeline output."""
     print("\n✓ Pipeline complete\n")
@@ -192,11 +221,49 @@ def main():
         print("No PDF argument provided — generating a sample PDF …")
         pdf_path = create_sample_pdf()
 
-    data = upload_pdf(pdf_path)
+    accepted = upload_pdf(pdf_path)
+    assert accepted["workflow_state"] == "INGESTED"
+    data = wait_for_job(accepted)
     print_results(data)
 
     loan_id = data["loan_id"]
 
+    # ── Test GET /api/jobs/?ids= ──
+    print(DIVIDER)
+    print("TEST: GET /api/jobs/?ids=")
+    print(DIVIDER)
+    resp = client.get(
+        "/api/jobs/",
+        params={"ids": [accepted["job_id"], "00000000-0000-0000-0000-000000000000"]},
+    )
+    assert resp.status_code == 200, f"GET /api/jobs/ failed: {resp.status_code}"
+    jobs = resp.json()
+    assert [j["job_id"] for j in jobs] == [accepted["job_id"]]
+    assert jobs[0]["workflow_state"] == data["workflow_state"]
+    print(f"  ✓ Bulk status returned {len(jobs)} job(s), unknown id omitted")
+    print()
+
+    # ── Test GET /api/loans/:id/events ──
+    print(DIVIDER)
+    print("TEST: GET /api/loans/:id/events (SSE)")
+    print(DIVIDER)
+    resp = client.get(f"/api/loans/{loan_id}/events")
+    assert resp.status_code == 200, f"GET /api/loans/{{id}}/events failed: {resp.status_code}"
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = [
+        dict(line.split(": ", 1) for line in block.splitlines())
+        for block in resp.text.strip().split("\n\n")
+    ]
+    seqs = [int(e["id"]) for e in events]
+    assert seqs == list(range(1, len(seqs) + 1))
+    kinds = [e["event"] for e in events]
+    assert kinds[0] == "EXTRACTION" and "AGENT_MEMO" in kinds
+    assert kinds[-1] == "WORKFLOW_COMPLETE"
+    resp = client.get(f"/api/loans/{loan_id}/events", headers={"Last-Event-ID": str(seqs[-3])})
+    assert resp.text.count("id: ") == 2
+    print(f"  ✓ Replayed {len(events)} events; resume after id {seqs[-3]} sent 2")
+    print()
+
     # ── Test GET /api/loans/ ──
     print(DIVIDER)
     print("TEST: GET /api/loans/")
@@ -242,11 +309,13 @@ def main():
 
     # ── Test 404 for unknown loan ──
     print(DIVIDER)
-    print("TEST: GET /api/loans/:id (404)")
+    print("TEST: GET /api/loans/:id, /api/jobs/:id (404)")
     print(DIVIDER)
     resp = client.get("/api/loans/00000000-0000-0000-0000-000000000000")
     assert resp.status_code == 404
-    print("  ✓ Returns 404 for unknown loan")
+    resp = client.get("/api/jobs/00000000-0000-0000-0000-000000000000")
+    assert resp.status_code == 404
+    print("  ✓ Returns 404 for unknown loan and job")
     print()
 
     print("=" * 60)
@@ -0,0 +1,166 @@
+"""
+Workflow checkpoint tests (resume after a crash replays recorded agent results, and
+live subscribers see the failure).
+Run: pytest tests/test_workflow_checkpoint.py -v
+"""
+
+import asyncio
+from collections import Counter
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.agents.schemas import AgentResult
+from app.audit import get_event_bus
+from app.models import AgentMemo, AuditLog, Base, LoanApplication
+from app.orchestration import orchestrator, run_workflow
+from app.services.job_service import JobRunner
+
+SCORES = {"Sales": 85, "Risk": 40, "Compliance": 90}  # Sales/Risk spread forces a debate
+
+
+@pytest.fixture
+def agents(monkeypatch):
+    """Deterministic agents; ``fail`` holds agent names whose calls raise (every
+    attempt, so stage retries cannot mask the crash), or "<agent> rebuttal" to fail
+    only its debate calls, or "<agent> outage" to return the placeholder result of a
+    failed LLM call instead."""
+    calls: Counter = Counter()
+    fail: set[str] = set()
+
+    def fake(name):
+        async def aevaluate(self, financials, prior_memos=None):
+            calls[name] += 1
+            if name in fail or (prior_memos is not None and f"{name} rebuttal" in fail):
+                raise RuntimeError(f"{name} crashed")
+            if f"{name} outage" in fail:
+                return AgentResult(memo=f"{name} review unavailable.", score=50, fallback=True)
+            return AgentResult(memo=f"{name} memo", score=SCORES[name])
+        return aevaluate
+
+    async def consensus(self, financials, all_memos):
+        calls["Moderator"] += 1
+        if "Moderator" in fail:
+            raise RuntimeError("Moderator crashed")
+        return AgentResult(memo="Moderator memo", score=60), True
+
+    monkeypatch.setattr(orchestrator, "get_llm_service", lambda: None)
+    for name in SCORES:
+        monkeypatch.setattr(getattr(orchestrator, f"{name}Agent"), "aevaluate", fake(name))
+    monkeypatch.setattr(orchestrator.ModeratorAgent, "aevaluate_consensus", consensus)
+    return calls, fail
+
+
+def _db_with_loan(engine=None):
+    engine = engine or create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    loan = LoanApplication(
+        company_name="Co", industry="Retail", requested_amount=1e6,
+        extracted_financials={"revenue": 5e6}, workflow_state="INGESTED",
+    )
+    db.add(loan)
+    db.commit()
+    return db, loan
+
+
+def test_crash_in_debate_resumes_with_only_the_missing_call(agents):
+    calls, fail = agents
+    db, loan = _db_with_loan()
+    fail.add("Moderator")
+    with pytest.raises(RuntimeError):
+        run_workflow(loan, db)
+    db.rollback()
+    assert loan.workflow_state == "DEBATE"
+    assert db.query(AgentMemo).count() == 6  # initial reviews and round-1 rebuttals
+    assert calls["Moderator"] == 2  # the stage was retried once
+
+    calls.clear()
+    fail.clear()
+    run_workflow(loan, db)
+    assert calls == {"Moderator": 1}
+    assert loan.workflow_state == "FINALIZED" and loan.final_score == 15.5
+    assert db.query(AgentMemo).count() == 7
+
+
+def test_partial_initial_review_failure_retries_only_the_failed_agent(agents):
+    calls, fail = agents
+    db, loan = _db_with_loan()
+    fail.add("Risk")
+    with pytest.raises(RuntimeError, match="Risk crashed"):
+        run_workflow(loan, db)
+    db.rollback()
+    assert sorted(m.agent_type for m in db.query(AgentMemo)) == ["Compliance", "Sales"]
+
+    calls.clear()
+    fail.clear()
+    run_workflow(loan, db)
+    assert calls["Sales"] == 1 and calls["Risk"] == 2  # Sales rebuts; Risk reviews, then rebuts
+    assert loan.workflow_state == "FINALIZED"
+
+
+def test_resume_redoes_placeholder_results_from_an_llm_outage(agents):
+    calls, fail = agents
+    db, loan = _db_with_loan()
+    fail.update({"Risk outage", "Moderator"})
+    with pytest.raises(RuntimeError):
+        run_workflow(loan, db)
+    db.rollback()
+    fallbacks = db.query(AuditLog).filter(AuditLog.event_type == "AGENT_MEMO").all()
+    assert [e.details["agent"] for e in fallbacks if e.details.get("fallback")] == ["Risk", "Risk"]
+
+    calls.clear()
+    fail.clear()
+    run_workflow(loan, db)
+    assert calls == {"Risk": 1, "Moderator": 1}  # the rebuttal again; the debate kept the review
+    assert loan.workflow_state == "FINALIZED"
+
+
+def test_resume_in_debate_keeps_placeholder_reviews_instead_of_vetoing(agents, monkeypatch):
+    calls, fail = agents
+    db, loan = _db_with_loan()
+    fail.update({"Compliance outage", "Moderator"})
+    with pytest.raises(RuntimeError):
+        run_workflow(loan, db)
+    db.rollback()
+    assert loan.workflow_state == "DEBATE"
+
+    calls.clear()
+    fail.clear()
+    monkeypatch.setitem(SCORES, "Compliance", 10)  # a redone review would veto
+    run_workflow(loan, db)
+    assert "AUTO_REJECT" not in [e.event_type for e in db.query(AuditLog)]
+    assert calls == {"Compliance": 1, "Moderator": 1}  # round-1 rebuttal redone, not the review
+    assert loan.workflow_state == "FINALIZED"
+
+
+def test_subscriber_receives_failure_after_debate_stage_raises(agents):
+    _, fail = agents
+    fail.add("Sales rebuttal")
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    db, loan = _db_with_loan(engine)
+    loan_id = loan.id
+    runner = JobRunner(1, 10, session_factory=sessionmaker(bind=engine))
+
+    async def follow():
+        # Drop already-seen seqs like the SSE endpoint does.
+        events, last = [], 0
+        with get_event_bus().subscribe(loan_id) as sub:
+            runner.submit(loan_id)
+            while not events or not events[-1].terminal:
+                event = await asyncio.wait_for(sub.get(), 5)
+                if event.seq > last:
+                    last = event.seq
+                    events.append(event)
+        return events
+
+    events = asyncio.run(follow())
+    runner.shutdown()
+    assert "DEBATE_ROUND_START" in [e.event_type for e in events]
+    assert events[-1].event_type == "WORKFLOW_FAILED"
+    failed = db.query(AuditLog).filter_by(loan_id=loan_id, event_type="WORKFLOW_FAILED").one()
+    assert failed.seq == events[-1].seq
@@ -0,0 +1,110 @@
+"""
+Stage-graph engine tests (scheduling, skips, transitions, retries).
+Run: pytest tests/test_workflow_engine.py -v
+"""
+
+import asyncio
+
+import pytest
+
+from app.orchestration.engine import InvalidTransition, Stage, StageGraph
+from app.orchestration.states import WorkflowState
+
+
+def _run(graph, state=WorkflowState.INGESTED, on_transition=None):
+    return asyncio.run(graph.run({}, state, on_transition))
+
+
+def test_independent_stages_run_concurrently():
+    running, peak = 0, 0
+
+    def worker(key):
+        async def run(**_):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            return {key: key}
+        return run
+
+    async def start():
+        return {"doc": 1}
+
+    async def join(a, b):
+        return {"out": a + b}
+
+    graph = StageGraph([
+        Stage("start", start, outputs=("doc",)),
+        Stage("a", worker("a"), inputs=("doc",), outputs=("a",)),
+        Stage("b", worker("b"), inputs=("doc",), outputs=("b",)),
+        Stage("join", join, inputs=("a", "b"), outputs=("out",)),
+    ])
+    values, _ = _run(graph)
+    assert values["out"] == "ab" and peak == 2
+
+
+def test_skipped_stage_outputs_none_and_transitions_follow_state_order():
+    transitions = []
+
+    async def review():
+        return {"score": 10}
+
+    async def debate(score):
+        return {"debate": "held"}
+
+    async def decide(score, debate):
+        return {"decision": debate or "no debate"}
+
+    graph = StageGraph([
+        Stage("review", review, outputs=("score",), state=WorkflowState.INITIAL_REVIEW),
+        Stage(
+            "debate", debate, inputs=("score",), outputs=("debate",),
+            state=WorkflowState.DEBATE, when=lambda score: score > 20,
+        ),
+        Stage(
+            "decide", decide, inputs=("score", "debate"), outputs=("decision",),
+            state=WorkflowState.CONSENSUS,
+        ),
+    ])
+    values, state = _run(graph, on_transition=lambda f, t, stage, v: transitions.append((f, t)))
+    assert values["debate"] is None and values["decision"] == "no debate"
+    assert state == WorkflowState.CONSENSUS
+    assert transitions == [
+        (WorkflowState.INGESTED, WorkflowState.INITIAL_REVIEW),
+        (WorkflowState.INITIAL_REVIEW, WorkflowState.CONSENSUS),
+    ]
+
+
+def test_invalid_transition_and_graph_validation():
+    async def jump():
+        return {}
+
+    with pytest.raises(InvalidTransition):
+        _run(StageGraph([Stage("jump", jump, state=WorkflowState.DEBATE)]))
+    with pytest.raises(ValueError, match="cyclic"):
+        StageGraph([Stage("a", jump, inputs=("b",), outputs=("a",)),
+                    Stage("b", jump, inputs=("a",), outputs=("b",))])
+    with pytest.raises(ValueError, match="produced twice"):
+        StageGraph([Stage("a", jump, outputs=("x",)), Stage("b", jump, outputs=("x",))])
+
+
+def test_retries_then_times_out():
+    attempts = 0
+
+    async def flaky():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise RuntimeError("transient")
+        return {"ok": True}
+
+    values, _ = _run(StageGraph([Stage("flaky", flaky, outputs=("ok",), retries=1)]))
+    assert values["ok"] and attempts == 2
+
+    async def slow():
+        await asyncio.sleep(1)
+        return {}
+
+    with pytest.raises(TimeoutError, match="slow"):
+        _run(StageGraph([Stage("slow", slow, timeout=0.01, retries=1)]))
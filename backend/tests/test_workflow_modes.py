@@ -0,0 +1,229 @@
+"""
+Workflow mode tests (combined and staged initial review, simultaneous debate).
+Run: pytest tests/test_workflow_modes.py -v
+"""
+
+import asyncio
+from collections import Counter
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.agents.schemas import AgentResult, PanelResult
+from app.config import get_settings
+from app.models import AgentMemo, AuditLog, Base, LoanApplication
+from app.orchestration import orchestrator, run_workflow
+
+
+class Agents:
+    """Deterministic agents behind the LLM agent classes. ``scores`` and ``fail`` (agent
+    names whose calls raise) can be changed between runs; ``panel_valid`` False makes
+    the combined review fail validation, ``delay`` slows an agent's initial review and
+    ``flaky`` holds agents whose next rebuttal raises once. Debate calls are logged in
+    start/end order with the transcript each rebuttal saw."""
+
+    def __init__(self) -> None:
+        self.scores = {"Sales": 70, "Risk": 60, "Compliance": 90}  # no debate
+        self.fail: set[str] = set()
+        self.panel_valid = True
+        self.delay: dict[str, float] = {}
+        self.flaky: set[str] = set()
+        self.calls: Counter = Counter()
+        self.log: list[tuple[str, str, int]] = []  # (event, agent, round)
+        self.seen: dict[tuple[str, int], list[dict]] = {}
+        self.running = self.peak = 0
+
+    def evaluate(self, name):
+        async def aevaluate(agent, financials, prior_memos=None):
+            self.calls[name] += 1
+            if name in self.fail:
+                raise RuntimeError(f"{name} crashed")
+            if prior_memos is not None and name in self.flaky:
+                self.flaky.discard(name)
+                raise RuntimeError(f"{name} rebuttal crashed")
+            if prior_memos is not None:
+                debate_round = self.calls[name] - 1  # the first call is the initial review
+                self.seen[name, debate_round] = prior_memos
+                self.log.append(("start", name, debate_round))
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+                await asyncio.sleep(0.01)
+                self.running -= 1
+                self.log.append(("end", name, debate_round))
+            else:
+                await asyncio.sleep(self.delay.get(name, 0))
+            return AgentResult(memo=f"{name} memo", score=self.scores[name])
+        return aevaluate
+
+    def panel(self):
+        async def aevaluate(agent, financials):
+            self.calls["Panel"] += 1
+            if not self.panel_valid:
+                return PanelResult(results=None)
+            return PanelResult(results={
+                name.lower(): AgentResult(memo=f"{name} memo", score=score)
+                for name, score in self.scores.items()
+            })
+        return aevaluate
+
+    def consensus(self):
+        async def aevaluate_consensus(agent, financials, all_memos):
+            self.calls["Moderator"] += 1
+            self.log.append(("moderate", "Moderator", self.calls["Moderator"]))
+            return AgentResult(memo="Moderator memo", score=50), False
+        return aevaluate_consensus
+
+
+@pytest.fixture
+def agents(monkeypatch):
+    agents = Agents()
+    monkeypatch.setattr(orchestrator, "get_llm_service", lambda: None)
+    for name in agents.scores:
+        monkeypatch.setattr(getattr(orchestrator, f"{name}Agent"), "aevaluate", agents.evaluate(name))
+    monkeypatch.setattr(orchestrator.PanelAgent, "aevaluate", agents.panel())
+    monkeypatch.setattr(orchestrator.ModeratorAgent, "aevaluate_consensus", agents.consensus())
+    return agents
+
+
+@pytest.fixture
+def mode(monkeypatch):
+    """Run the workflow with the given settings overrides."""
+    def set_mode(**overrides):
+        settings = get_settings().model_copy(update=overrides)
+        monkeypatch.setattr(orchestrator, "get_settings", lambda: settings)
+    return set_mode
+
+
+def _db_with_loan(compliance_flag: bool = False):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    loan = LoanApplication(
+        company_name="Co", industry="Retail", requested_amount=1e6,
+        extracted_financials={"revenue": 5e6}, workflow_state="INGESTED",
+        compliance_flag=compliance_flag,
+    )
+    db.add(loan)
+    db.commit()
+    return db, loan
+
+
+def _skipped(db):
+    entries = db.query(AuditLog).filter(AuditLog.event_type == "STAGE_SKIPPED").order_by(AuditLog.seq)
+    return [(e.details["stage"], e.details["reason"]) for e in entries]
+
+
+def _memo_audits(db):
+    entries = db.query(AuditLog).filter(AuditLog.event_type == "AGENT_MEMO").order_by(AuditLog.seq)
+    return [(e.details["agent"], e.details.get("combined", False)) for e in entries]
+
+
+def test_combined_review_records_three_memos_from_one_call(agents, mode):
+    mode(initial_review_mode="combined")
+    db, loan = _db_with_loan()
+    run_workflow(loan, db)
+
+    assert agents.calls == {"Panel": 1}
+    assert _memo_audits(db) == [("Sales", True), ("Risk", True), ("Compliance", True)]
+    assert db.query(AgentMemo).count() == 3
+    assert loan.workflow_state == "FINALIZED" and loan.final_score == 4.0
+
+
+def test_combined_review_falls_back_to_per_agent_calls(agents, mode):
+    mode(initial_review_mode="combined")
+    agents.panel_valid = False
+    db, loan = _db_with_loan()
+    run_workflow(loan, db)
+
+    assert agents.calls == {"Panel": 1, "Sales": 1, "Risk": 1, "Compliance": 1}
+    panel = db.query(AuditLog).filter(AuditLog.event_type == "PANEL_REVIEW").one()
+    assert panel.details["valid"] is False
+    assert _memo_audits(db) == [("Sales", False), ("Risk", False), ("Compliance", False)]
+    assert loan.final_score == 4.0
+
+
+def test_concurrent_reviews_are_recorded_in_agent_order(agents):
+    agents.delay.update(Sales=0.03, Risk=0.01)  # finish Compliance, Risk, Sales
+    db, loan = _db_with_loan()
+    run_workflow(loan, db)
+
+    assert _memo_audits(db) == [("Sales", False), ("Risk", False), ("Compliance", False)]
+    memos = db.query(AgentMemo).order_by(AgentMemo.seq)
+    assert [m.agent_type for m in memos] == ["Sales", "Risk", "Compliance"]
+
+
+def test_staged_compliance_veto_skips_sales_and_risk(agents, mode):
+    mode(initial_review_mode="staged")
+    agents.scores["Compliance"] = 20
+    db, loan = _db_with_loan()
+    run_workflow(loan, db)
+
+    assert agents.calls == {"Compliance": 1}
+    assert _skipped(db) == [("Sales", "compliance_veto"), ("Risk", "compliance_veto")]
+    assert loan.status == "Rejected" and loan.workflow_state == "FINALIZED"
+
+
+def test_staged_keyword_veto_skips_every_agent(agents, mode):
+    mode(initial_review_mode="staged")
+    db, loan = _db_with_loan(compliance_flag=True)
+    run_workflow(loan, db)
+
+    assert agents.calls == {}
+    assert _skipped(db) == [
+        ("Compliance", "keyword_flag"), ("Sales", "keyword_flag"), ("Risk", "keyword_flag"),
+    ]
+    assert loan.status == "Rejected"
+
+
+def test_staged_without_veto_runs_all_three(agents, mode):
+    mode(initial_review_mode="staged")
+    db, loan = _db_with_loan()
+    run_workflow(loan, db)
+
+    assert agents.calls == {"Compliance": 1, "Sales": 1, "Risk": 1}
+    assert _skipped(db) == []
+    assert loan.status == "Rejected" and loan.final_score == 4.0  # 0.4*70 - 0.4*60
+
+
+def test_staged_resume_replays_recorded_reviews(agents, mode):
+    mode(initial_review_mode="staged")
+    agents.fail.add("Risk")
+    db, loan = _db_with_loan()
+    with pytest.raises(RuntimeError, match="Risk crashed"):
+        run_workflow(loan, db)
+    db.rollback()
+    assert sorted(m.agent_type for m in db.query(AgentMemo)) == ["Compliance", "Sales"]
+
+    agents.calls.clear()
+    agents.fail.clear()
+    run_workflow(loan, db)
+    assert agents.calls == {"Risk": 1}
+    assert loan.workflow_state == "FINALIZED" and db.query(AgentMemo).count() == 3
+
+
+def test_simultaneous_rebuttals_run_together_on_earlier_rounds_only(agents, mode):
+    mode(debate_mode="simultaneous")
+    agents.scores.update(Sales=85, Risk=40)  # spread forces a debate; no consensus
+    db, loan = _db_with_loan()
+    run_workflow(loan, db)
+
+    assert agents.peak == 3 and agents.calls["Moderator"] == 2
+    for debate_round in (1, 2):
+        in_round = [(e, a) for e, a, r in agents.log if r == debate_round]
+        assert [e for e, _ in in_round] == ["start"] * 3 + ["end"] * 3 + ["moderate"]
+        for name in agents.scores:
+            rounds = {m["round"] for m in agents.seen[name, debate_round] if not m.get("summary")}
+            assert max(rounds) == debate_round - 1  # no peer rebuttals from this round
+    assert loan.workflow_state == "FINALIZED"
+
+
+def test_retried_debate_stage_starts_its_round_once(agents):
+    agents.scores.update(Sales=85, Risk=40)
+    agents.flaky.add("Sales")  # round 1 fails before any rebuttal is recorded; it retries
+    db, loan = _db_with_loan()
+    run_workflow(loan, db)
+
+    starts = db.query(AuditLog).filter(AuditLog.event_type == "DEBATE_ROUND_START")
+    assert [e.details["round"] for e in starts.order_by(AuditLog.seq)] == [1, 2]
+    assert loan.workflow_state == "FINALIZED"
@@ -1,14 +1,33 @@
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
+const JOB_POLL_MS = 1000;
+
+export async function getJob(id: string) {
+  const res = await fetch(`${API_BASE}/api/jobs/${id}`);
+  if (!res.ok) throw new Error(await res.text());
+  return res.json();
+}
+
+// The upload returns 202 once the loan is created; the workflow runs as a job.
+// Poll it and resolve with the finished loan, as the upload used to return.
 export async function uploadPdf(file: File) {
   const form = new FormData();
   form.append("file", file);
+  // Uploads are scheduled as interactive, ahead of standard and bulk workflows.
   const res = await fetch(`${API_BASE}/api/ingest/upload`, {
     method: "POST",
     body: form,
   });
   if (!res.ok) throw new Error(await res.text());
-  return res.json();
+  const { loan_id, job_id } = await res.json();
+
+  let job = await getJob(job_id);
+  while (job.state === "queued" || job.state === "running") {
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_MS));
+    job = await getJob(job_id);
+  }
+  if (job.state === "failed") throw new Error(`Workflow failed: ${job.error}`);
+  return { loan_id, ...(await getLoan(loan_id)) };
 }
 
 export async function getLoan(id: string) {